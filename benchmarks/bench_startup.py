@@ -0,0 +1,184 @@
+"""
+Cold-Start Benchmark
+====================
+Measures how quickly a new replica can take traffic:
+
+- Import time: `import main` in fresh interpreters (median of --runs), plus
+  the slowest top-level packages from `python -X importtime`.
+- Startup time: launches `uvicorn main:app` against the local Airtable/Twilio
+  stand-ins (seeded with --clients Clients) and reports the time until
+  GET / answers (listening) and until GET /ready turns 200 (warmed up), with
+  the per-step warm-up timings.
+- First request: latency of the first webhook after /ready versus the
+  following ones, to confirm the first one is not cold.
+- With --snapshot: boots a second time from the directory snapshot the first
+  boot wrote (DIRECTORY_SNAPSHOT_PATH) and compares time-to-ready and the
+  Airtable requests spent warming up.
+
+Exits non-zero if --max-import-ms or --max-ready-ms is exceeded.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--clients 500] [--airtable-latency-ms 150]
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+from datetime import datetime, timedelta, timezone
+import urllib.request
+from urllib.parse import urlencode
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+from benchmarks import bench_webhooks  # sets offline credentials/limits
+from benchmarks.soak import seed_tables, start_stand_ins
+
+def measure_import(runs: int) -> dict:
+    """
+    Median wall time of `import main` and the slowest top-level packages
+    (summed self time of all their modules).
+    """
+    code = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+    times = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+        times.append(float(output.stdout.strip().splitlines()[-1]) * 1000)
+
+    trace = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    packages = {}
+    for line in trace.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue   # header line
+        top = name.strip().split(".")[0]
+        packages[top] = packages.get(top, 0) + int(self_us) / 1000
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:8]
+    return {
+        "import_ms_median": round(statistics.median(times), 1),
+        "import_ms_runs": [round(t, 1) for t in times],
+        "slowest_packages_ms": {name: round(ms, 1) for name, ms in slowest},
+    }
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _get(url: str):
+    try:
+        with urllib.request.urlopen(url, timeout=2) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+    except (urllib.error.URLError, ConnectionError, socket.timeout):
+        return None, None
+
+def _post_form(url: str, form: dict) -> float:
+    start = time.perf_counter()
+    request = urllib.request.Request(url, data=urlencode(form).encode(), method="POST")
+    try:
+        urllib.request.urlopen(request, timeout=30).close()
+    except urllib.error.HTTPError:
+        pass   # /intercept answers 403 to stop Twilio's default routing
+    return (time.perf_counter() - start) * 1000
+
+def measure_startup(args, airtable, twilio, extra_env: dict) -> dict:
+    airtable.calls.reset()
+    port = _free_port()
+    env = dict(os.environ, AIRTABLE_API_URL=airtable.url, TWILIO_API_URL=twilio.url, PYTHONUNBUFFERED="1", **extra_env)
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        listening_ms = ready_ms = None
+        readiness = None
+        deadline = started + args.timeout
+        while time.perf_counter() < deadline:
+            if listening_ms is None and _get(base_url + "/")[0] == 200:
+                listening_ms = (time.perf_counter() - started) * 1000
+            if listening_ms is not None:
+                status, body = _get(base_url + "/ready")
+                if status == 200:
+                    ready_ms = (time.perf_counter() - started) * 1000
+                    readiness = json.loads(body)
+                    break
+            time.sleep(0.01)
+        if ready_ms is None:
+            return {"listening_ms": listening_ms, "ready_ms": None, "error": "timed out waiting for /ready"}
+        warm_up_calls = airtable.calls.snapshot()
+
+        # First webhooks after /ready: a warm replica answers the first like the rest
+        latencies = [
+            _post_form(base_url + "/intercept", bench_webhooks.SCENARIOS["sitter_reply"](i))
+            for i in range(args.first_requests)
+        ]
+        return {
+            "listening_ms": round(listening_ms, 1),
+            "ready_ms": round(ready_ms, 1),
+            "warm_up_steps_s": readiness.get("steps"),
+            "warm_up_airtable_requests": sum(count for op, count in warm_up_calls.items() if op.endswith(".list")),
+            "first_request_ms": round(latencies[0], 1),
+            "next_requests_ms_median": round(statistics.median(latencies[1:]), 1) if len(latencies) > 1 else None,
+        }
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+def main(args) -> int:
+    result = {"import": measure_import(args.runs)}
+
+    airtable, twilio = start_stand_ins(args)
+    # Backdated, as in a real base: the restart should only see later edits
+    an_hour_ago = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat(timespec="milliseconds")
+    airtable.seed(seed_tables(bench_webhooks, args.clients), modified=an_hour_ago.replace("+00:00", "Z"))
+    with tempfile.TemporaryDirectory() as tmp:
+        extra_env = {"DIRECTORY_SNAPSHOT_PATH": os.path.join(tmp, "directory.snap")} if args.snapshot else {}
+        result["startup"] = measure_startup(args, airtable, twilio, extra_env)
+        if args.snapshot:
+            result["startup_from_snapshot"] = measure_startup(args, airtable, twilio, extra_env)
+    airtable.shutdown()
+    twilio.shutdown()
+    print(json.dumps(result, indent=2))
+
+    failures = []
+    if args.max_import_ms and result["import"]["import_ms_median"] > args.max_import_ms:
+        failures.append(f"import {result['import']['import_ms_median']}ms > {args.max_import_ms}ms")
+    ready_ms = result["startup"].get("ready_ms")
+    if ready_ms is None or (args.max_ready_ms and ready_ms > args.max_ready_ms):
+        failures.append(f"ready {ready_ms}ms > {args.max_ready_ms}ms")
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure import time and time-to-ready.")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters for the import measurement")
+    parser.add_argument("--clients", type=int, default=500, help="Clients seeded into the Airtable stand-in")
+    parser.add_argument("--first-requests", type=int, default=5, help="webhooks sent once ready")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds to wait for /ready")
+    parser.add_argument("--snapshot", action="store_true", help="also measure a warm restart from the directory snapshot")
+    parser.add_argument("--max-import-ms", type=float, default=0, help="fail above this median import time")
+    parser.add_argument("--max-ready-ms", type=float, default=0, help="fail above this time-to-ready")
+    parser.add_argument("--airtable-latency-ms", type=float, default=150)
+    parser.add_argument("--twilio-latency-ms", type=float, default=200)
+    parser.add_argument("--latency-dist", default="lognormal")
+    parser.add_argument("--jitter", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--penalty-seconds", type=float, default=30)
+    parser.add_argument("--no-airtable-quota", action="store_true")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,215 @@
+"""
+Webhook Hot-Path Benchmark
+==========================
+Drives the real FastAPI app (`main.app`) in-process with fake Airtable and
+Twilio backends that inject latency, and reports per scenario:
+
+- p50 / p95 / p99 latency and requests/second
+- external calls per request (Airtable reads, Airtable writes, Twilio)
+
+Scenarios:
+- inbound_first_contact: new Client texts a Sitter (client create + pool assignment)
+- inbound_repeat:        known Client with a pool number texts their Sitter
+- sitter_reply:          Sitter replies to a Client's pool number
+- unknown_sender:        two numbers nobody knows (spam / misdial)
+
+With --replica the finders answer from the local SQLite read replica
+(synced once before the run) instead of Airtable formula queries.
+
+The run fails (exit code 1) if any scenario exceeds its budget in
+benchmarks/budgets.json (calls per request or p95 latency).
+
+Usage:
+    python benchmarks/bench_webhooks.py [--requests 100] [--concurrency 4]
+        [--airtable-latency-ms 20] [--twilio-latency-ms 40] [--replica] [--output bench_output.txt]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Offline configuration: dummy credentials, admission/pacing limits out of the way
+for key, value in {
+    "TWILIO_ACCOUNT_SID": "ACbench", "TWILIO_AUTH_TOKEN": "bench",
+    "TWILIO_PROXY_SERVICE_SID": "KSbench", "TWILIO_MESSAGING_SERVICE_SID": "MGbench",
+    "AIRTABLE_BASE_ID": "appBench", "AIRTABLE_API_KEY": "patBench",
+    "WEBHOOK_SENDER_RATE": "1000000", "WEBHOOK_SENDER_BURST": "1000000",
+    "WEBHOOK_RECIPIENT_RATE": "1000000", "WEBHOOK_RECIPIENT_BURST": "1000000",
+    "WEBHOOK_MAX_IN_FLIGHT": "1000000", "SMS_PER_NUMBER_MPS": "1000000",
+}.items():
+    os.environ.setdefault(key, value)
+
+from simulators import install_fakes
+from simulators.asgi_client import request
+from simulators.fake_airtable import CallCounter, FakeBase, Latency
+from simulators.fake_twilio import FakeTwilioClient
+
+BUDGETS_PATH = os.path.join(os.path.dirname(__file__), "budgets.json")
+
+SITTER_PHONE = "+15550001000"
+SITTER_ENTRY = "+15550002000"
+
+def seed(base: FakeBase, n: int):
+    """
+    Creates one Sitter, `n` Clients with pool numbers and `n` Ready pool numbers.
+    """
+    from config import settings
+    base.table(settings.AIRTABLE_SITTERS_TABLE).seed({
+        "Full Name": "Bench Sitter", "phone-number": SITTER_PHONE, "twilio-number": SITTER_ENTRY, "Status": "Active"
+    })
+    clients = base.table(settings.AIRTABLE_CLIENTS_TABLE)
+    inventory = base.table(settings.AIRTABLE_NUMBER_INVENTORY_TABLE)
+    for i in range(n):
+        pool_number = f"+1555200{i:04d}"
+        clients.seed({
+            "Name": f"Client {i}", "phone-number": f"+1555100{i:04d}",
+            "twilio-number": pool_number, "Linked-Sitter": "Bench Sitter",
+        })
+        inventory.seed({"phone-number": pool_number, "Lifecycle": "Pool", "Status": "Assigned"})
+        inventory.seed({"phone-number": f"+1555400{i:04d}", "Lifecycle": "Pool", "Status": "Ready"})
+
+SCENARIOS = {
+    "inbound_first_contact": lambda i: {"From": f"+1555300{i:04d}", "To": SITTER_ENTRY, "Body": "Hi, first message"},
+    "inbound_repeat": lambda i: {"From": f"+1555100{i:04d}", "To": SITTER_ENTRY, "Body": "Another message"},
+    "sitter_reply": lambda i: {"From": SITTER_PHONE, "To": f"+1555200{i:04d}", "Body": "On my way"},
+    "unknown_sender": lambda i: {"From": f"+1999000{i:04d}", "To": f"+1888000{i:04d}", "Body": "spam"},
+}
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+async def run_scenario(app, calls: CallCounter, name: str, n: int, concurrency: int) -> dict:
+    make_payload = SCENARIOS[name]
+    latencies = []
+    statuses = {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await request(app, "POST", "/intercept", form=make_payload(i))
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    calls.reset()
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n)))
+    elapsed = time.perf_counter() - started
+    # Replies go out after the webhook answers; count their Twilio/Airtable calls too
+    from services.sms_scheduler import scheduler
+    await asyncio.to_thread(scheduler.wait_idle, 60)
+    counts = calls.snapshot()
+
+    def per_request(predicate):
+        return sum(v for k, v in counts.items() if predicate(k)) / n
+
+    return {
+        "requests": n,
+        "statuses": statuses,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "rps": n / elapsed,
+        "airtable_reads": per_request(lambda k: k.startswith("airtable.") and k.endswith((".list", ".get"))),
+        "airtable_writes": per_request(lambda k: k.startswith("airtable.") and not k.endswith((".list", ".get"))),
+        "twilio_calls": per_request(lambda k: k.startswith("twilio.")),
+        "calls_per_request": per_request(lambda k: True),
+        "breakdown": {k: v / n for k, v in sorted(counts.items())},
+    }
+
+def check_budgets(results: dict, budgets: dict) -> list:
+    failures = []
+    for name, result in results.items():
+        budget = budgets.get(name, {})
+        if "max_calls_per_request" in budget and result["calls_per_request"] > budget["max_calls_per_request"]:
+            failures.append(f"{name}: {result['calls_per_request']:.2f} calls/request > budget {budget['max_calls_per_request']}")
+        if "max_p95_ms" in budget and result["p95_ms"] > budget["max_p95_ms"]:
+            failures.append(f"{name}: p95 {result['p95_ms']:.1f}ms > budget {budget['max_p95_ms']}ms")
+    return failures
+
+def format_report(results: dict, args) -> str:
+    lines = [
+        f"Webhook benchmark: {args.requests} requests/scenario, concurrency {args.concurrency}, "
+        f"Airtable ~{args.airtable_latency_ms}ms, Twilio ~{args.twilio_latency_ms}ms",
+        "",
+        f"{'scenario':<24}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}{'AT rd':>8}{'AT wr':>8}{'Twilio':>8}{'total':>8}",
+    ]
+    for name, r in results.items():
+        lines.append(
+            f"{name:<24}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}{r['rps']:>9.1f}"
+            f"{r['airtable_reads']:>8.2f}{r['airtable_writes']:>8.2f}{r['twilio_calls']:>8.2f}{r['calls_per_request']:>8.2f}"
+        )
+    if args.verbose:
+        for name, r in results.items():
+            lines.append("")
+            lines.append(f"{name} calls/request:")
+            lines.extend(f"  {k:<40}{v:>8.2f}" for k, v in r["breakdown"].items())
+    return "\n".join(lines)
+
+async def main(args) -> int:
+    calls = CallCounter()
+    base = FakeBase(Latency(args.airtable_latency_ms), calls)
+    twilio_client = FakeTwilioClient(Latency(args.twilio_latency_ms), calls)
+
+    import main as service
+    from utils.logger import logger
+    if not args.verbose:
+        logger.setLevel(logging.WARNING)
+    install_fakes(base, twilio_client)
+    seed(base, args.requests)
+
+    # Warm state the way a running replica would have it
+    from services.directory import directory
+    directory.refresh()
+    if args.replica:
+        from services.replica import replica
+        replica.path = ":memory:"
+        replica.sync()
+
+    results = {}
+    for name in (args.scenarios or SCENARIOS):
+        results[name] = await run_scenario(service.app, calls, name, args.requests, args.concurrency)
+
+    report = format_report(results, args)
+    print(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    with open(args.budgets) as f:
+        budgets = json.load(f)
+    failures = check_budgets(results, budgets)
+    if failures:
+        print("\nBUDGET REGRESSIONS:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("\nAll scenarios within budget.")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the webhook hot path with fake backends.")
+    parser.add_argument("--requests", type=int, default=100, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--airtable-latency-ms", type=float, default=20.0)
+    parser.add_argument("--twilio-latency-ms", type=float, default=40.0)
+    parser.add_argument("--scenarios", nargs="*", choices=list(SCENARIOS))
+    parser.add_argument("--replica", action="store_true", help="answer lookups from the local read replica")
+    parser.add_argument("--budgets", default=BUDGETS_PATH)
+    parser.add_argument("--output", help="also write the report to this file")
+    parser.add_argument("--json", help="write raw results as JSON")
+    parser.add_argument("-v", "--verbose", action="store_true", help="per-call breakdown")
+    sys.exit(asyncio.run(main(parser.parse_args())))
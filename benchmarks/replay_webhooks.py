@@ -0,0 +1,207 @@
+"""
+Webhook Replay
+==============
+Fires a captured webhook stream (see `utils/webhook_capture.py`) back at the
+service, preserving the original arrival pattern: bursts of first contacts,
+long back-and-forth chats, quiet periods.
+
+Modes:
+- In-process (default): starts the Airtable/Twilio stand-in servers, seeds the
+  Airtable stand-in from --seed and replays into `main.app`.
+- --target http://host:port: replays against a running test instance (which
+  should itself point at stand-in backends via AIRTABLE_API_URL/TWILIO_API_URL).
+
+Speed: --speed 1 (real time), --speed 10, or --speed max (as fast as
+--concurrency allows).
+
+Reports latency percentiles, response statuses, and how far behind schedule
+the replay fell (when the service cannot keep up with the traffic).
+
+Seed for the stand-in Airtable, pseudonymized with the same
+WEBHOOK_CAPTURE_SALT as the capture:
+    python benchmarks/replay_webhooks.py --export-seed seed.json
+
+Usage:
+    python benchmarks/replay_webhooks.py webhooks.jsonl --seed seed.json --speed 10
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import urlencode
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+def load_capture(path: str) -> list:
+    """
+    Reads captured webhooks ({"t", "p", "e", "d"}) in arrival order.
+    """
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def export_seed(path: str):
+    """
+    Writes the live Sitters/Clients/Number Inventory tables, pseudonymized the
+    same way captured webhooks are, as seed data for the Airtable stand-in.
+    """
+    from config import settings
+    from services import airtable_client
+    from utils.webhook_capture import redact
+
+    tables = {
+        settings.AIRTABLE_SITTERS_TABLE: airtable_client.sitters_table,
+        settings.AIRTABLE_CLIENTS_TABLE: airtable_client.clients_table,
+        settings.AIRTABLE_NUMBER_INVENTORY_TABLE: airtable_client.inventory_table,
+    }
+    seed = {
+        name: [{"id": r["id"], "fields": redact(r["fields"])} for r in table.all()]
+        for name, table in tables.items()
+    }
+    with open(path, "w") as f:
+        json.dump(seed, f)
+    print(f"Wrote {sum(len(rows) for rows in seed.values())} records to {path}")
+
+def http_sender(target: str):
+    """
+    Returns an async send(event) posting to a running instance.
+    """
+    def send(event):
+        if event["e"] == "json":
+            data, content_type = json.dumps(event["d"]).encode(), "application/json"
+        else:
+            data, content_type = urlencode(event["d"]).encode(), "application/x-www-form-urlencoded"
+        request = urllib.request.Request(
+            target.rstrip("/") + event["p"], data=data, method="POST", headers={"Content-Type": content_type}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    async def send_async(event):
+        return await asyncio.to_thread(send, event)
+    return send_async
+
+def in_process_sender(app):
+    """
+    Returns an async send(event) calling the ASGI app directly.
+    """
+    from simulators.asgi_client import request
+
+    async def send(event):
+        if event["e"] == "json":
+            response = await request(app, "POST", event["p"], json_body=event["d"])
+        else:
+            response = await request(app, "POST", event["p"], form=event["d"])
+        return response.status_code
+    return send
+
+async def replay(events: list, send, speed: float, concurrency: int) -> dict:
+    from benchmarks.bench_webhooks import percentile
+
+    latencies, lags, statuses = [], [], {}
+    semaphore = asyncio.Semaphore(concurrency)
+    first_t = events[0]["t"]
+    started = time.perf_counter()
+
+    async def one(event, due):
+        async with semaphore:
+            begin = time.perf_counter()
+            lags.append(max(0.0, begin - due))
+            status = await send(event)
+            latencies.append(time.perf_counter() - begin)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    tasks = []
+    for event in events:
+        if speed:
+            due = started + (event["t"] - first_t) / speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        else:
+            due = time.perf_counter()
+        tasks.append(asyncio.create_task(one(event, due)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "elapsed_s": elapsed,
+        "rps": len(latencies) / elapsed if elapsed else 0,
+        "statuses": statuses,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "schedule_lag_p95_ms": percentile(lags, 95) * 1000,
+    }
+
+def main(args) -> int:
+    if args.export_seed:
+        export_seed(args.export_seed)
+        return 0
+
+    events = [e for e in load_capture(args.capture) if not args.path or e["p"] == args.path]
+    if not events:
+        print("No webhooks to replay.")
+        return 1
+    speed = 0.0 if args.speed == "max" else float(args.speed)
+
+    stand_ins = None
+    if args.target:
+        send = http_sender(args.target)
+    else:
+        from benchmarks.soak import start_stand_ins
+        stand_ins = start_stand_ins(args)
+        airtable, twilio = stand_ins
+        os.environ["AIRTABLE_API_URL"] = airtable.url
+        os.environ["TWILIO_API_URL"] = twilio.url
+        os.environ["WEBHOOK_CAPTURE_PATH"] = ""  # don't capture the replay itself
+        import benchmarks.bench_webhooks  # offline credentials/limits
+        if args.seed:
+            with open(args.seed) as f:
+                airtable.seed(json.load(f))
+
+        import main as service
+        from services.directory import directory
+        from utils.logger import logger
+        logger.setLevel(logging.WARNING)
+        logging.getLogger("twilio.http_client").setLevel(logging.WARNING)
+        directory.refresh()
+        airtable.calls.reset()
+        send = in_process_sender(service.app)
+
+    result = asyncio.run(replay(events, send, speed, args.concurrency))
+    if stand_ins:
+        result["airtable"] = stand_ins[0].stats()
+        result["twilio"] = stand_ins[1].stats()
+    print(json.dumps(result, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay captured webhooks.")
+    parser.add_argument("capture", nargs="?", help="capture file (WEBHOOK_CAPTURE_PATH output)")
+    parser.add_argument("--speed", default="1", help="1, 10, ... or 'max'")
+    parser.add_argument("--concurrency", type=int, default=50, help="max requests in flight")
+    parser.add_argument("--path", help="only replay webhooks for this path, e.g. /intercept")
+    parser.add_argument("--target", help="base URL of a running test instance")
+    parser.add_argument("--seed", help="Airtable stand-in seed (see --export-seed)")
+    parser.add_argument("--export-seed", metavar="OUT", help="write a pseudonymized seed from live Airtable and exit")
+    parser.add_argument("--airtable-latency-ms", type=float, default=150)
+    parser.add_argument("--twilio-latency-ms", type=float, default=200)
+    parser.add_argument("--latency-dist", default="lognormal")
+    parser.add_argument("--jitter", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--penalty-seconds", type=float, default=30)
+    parser.add_argument("--no-airtable-quota", action="store_true")
+    args = parser.parse_args()
+    if not args.capture and not args.export_seed:
+        parser.error("a capture file is required")
+    sys.exit(main(args))
@@ -0,0 +1,128 @@
+"""
+Soak Test Against Local Stand-In Servers
+========================================
+Runs the whole service (real pyairtable and Twilio SDK clients, real HTTP)
+against the local Airtable and Twilio stand-in servers, at a steady webhook
+rate for a fixed duration, and reports:
+
+- latency percentiles and response status counts for the webhooks
+- what the stand-ins saw: requests per operation, 429s and 5xx responses
+
+Usage:
+    python benchmarks/soak.py --duration 60 --rate 5 --airtable-latency-ms 150 \\
+        --twilio-latency-ms 200 --error-rate 0.01
+
+The stand-ins enforce Airtable's real quotas by default (5 req/s per base,
+30 second lockout); pass --no-airtable-quota to disable that.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from simulators.airtable_server import AirtableServer
+from simulators.fake_airtable import Latency
+from simulators.stand_in import Faults
+from simulators.twilio_server import TwilioServer
+
+def start_stand_ins(args):
+    airtable = AirtableServer(
+        ("127.0.0.1", 0),
+        Faults(Latency(args.airtable_latency_ms, args.jitter, args.latency_dist), args.error_rate),
+        base_rate=0 if args.no_airtable_quota else 5,
+        token_rate=0 if args.no_airtable_quota else 50,
+        penalty_seconds=args.penalty_seconds,
+    )
+    twilio = TwilioServer(
+        ("127.0.0.1", 0),
+        Faults(Latency(args.twilio_latency_ms, args.jitter, args.latency_dist), args.error_rate),
+    )
+    airtable.start()
+    twilio.start()
+    return airtable, twilio
+
+async def soak(app, args) -> dict:
+    from benchmarks.bench_webhooks import SCENARIOS, percentile
+    from simulators.asgi_client import request
+
+    mix = [name for name in SCENARIOS for _ in range(args.weights.get(name, 1))]
+    latencies, statuses, tasks = [], {}, []
+
+    async def one(i):
+        name = random.choice(mix)
+        start = time.perf_counter()
+        response = await request(app, "POST", "/intercept", form=SCENARIOS[name](i % args.clients))
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    i = 0
+    while time.perf_counter() - started < args.duration:
+        tasks.append(asyncio.create_task(one(i)))
+        i += 1
+        await asyncio.sleep(1.0 / args.rate)
+    await asyncio.gather(*tasks)
+
+    return {
+        "requests": len(latencies),
+        "statuses": statuses,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies) * 1000,
+    }
+
+def main(args) -> int:
+    airtable, twilio = start_stand_ins(args)
+    os.environ["AIRTABLE_API_URL"] = airtable.url
+    os.environ["TWILIO_API_URL"] = twilio.url
+    from benchmarks import bench_webhooks  # sets offline credentials/limits
+
+    airtable.seed(seed_tables(bench_webhooks, args.clients))
+
+    import main as service
+    from services.directory import directory
+    from utils.logger import logger
+    logger.setLevel(logging.WARNING)
+    logging.getLogger("twilio.http_client").setLevel(logging.WARNING)
+    directory.refresh()
+    airtable.calls.reset()
+    airtable.responses.reset()
+
+    result = asyncio.run(soak(service.app, args))
+    result["airtable"] = airtable.stats()
+    result["twilio"] = twilio.stats()
+    print(json.dumps(result, indent=2))
+    return 0
+
+def seed_tables(bench_webhooks, n: int) -> dict:
+    """
+    Builds the same fixture as the in-process benchmark, as stand-in seed data.
+    """
+    from simulators.fake_airtable import FakeBase
+    base = FakeBase()
+    bench_webhooks.seed(base, n)
+    return {name: [r["fields"] for r in table.records.values()] for name, table in base.tables.items()}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Soak the service against local stand-in servers.")
+    parser.add_argument("--duration", type=float, default=60, help="seconds of traffic")
+    parser.add_argument("--rate", type=float, default=5, help="webhooks per second")
+    parser.add_argument("--clients", type=int, default=200, help="distinct client numbers")
+    parser.add_argument("--weights", type=json.loads, default={"inbound_repeat": 6, "sitter_reply": 3},
+                        help='scenario mix as JSON, e.g. \'{"inbound_repeat": 6}\' (others weigh 1)')
+    parser.add_argument("--airtable-latency-ms", type=float, default=150)
+    parser.add_argument("--twilio-latency-ms", type=float, default=200)
+    parser.add_argument("--latency-dist", choices=Latency.DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--jitter", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of an injected 5xx")
+    parser.add_argument("--penalty-seconds", type=float, default=30)
+    parser.add_argument("--no-airtable-quota", action="store_true")
+    sys.exit(main(parser.parse_args()))
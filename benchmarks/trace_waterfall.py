@@ -0,0 +1,67 @@
+"""
+Trace Waterfall
+===============
+Prints the slowest traces from a trace file (TRACE_EXPORT_PATH, or the OTLP
+collector stand-in's output) as indented waterfalls: each span's offset from
+the start of the request, its duration and a bar on a shared time axis.
+
+Usage:
+    python benchmarks/trace_waterfall.py traces.jsonl --top 5
+    python benchmarks/trace_waterfall.py traces.jsonl --message-sid SM0123...
+"""
+
+import argparse
+import json
+import sys
+
+BAR_WIDTH = 40
+
+def load_traces(path: str) -> list:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def format_waterfall(trace: dict) -> str:
+    """
+    Renders one trace dict (see `utils.tracing.trace_to_dict`).
+    """
+    total = trace["duration_ms"] or 1.0
+    depth = {}
+    lines = [f"{trace['name']}  {trace['duration_ms']:.1f} ms  trace={trace['trace_id']}"]
+    sid = trace["attributes"].get("twilio.message_sid")
+    if sid:
+        lines[0] += f"  MessageSid={sid}"
+
+    for span in trace["spans"]:
+        level = depth.get(span["parent_id"], -1) + 1
+        depth[span["span_id"]] = level
+        start = int(span["offset_ms"] / total * BAR_WIDTH)
+        width = max(1, int(span["duration_ms"] / total * BAR_WIDTH))
+        bar = " " * start + "#" * min(width, BAR_WIDTH - start)
+        outcome = span["attributes"].get("outcome")
+        flag = " !" if span["error"] else f" ({outcome})" if outcome and outcome != "ok" else ""
+        label = ("  " * level + span["name"] + flag)[:48]
+        lines.append(f"  {label:<48} {span['offset_ms']:>8.1f} {span['duration_ms']:>8.1f}  |{bar:<{BAR_WIDTH}}|")
+    return "\n".join(lines)
+
+def main(args) -> int:
+    traces = load_traces(args.traces)
+    if args.message_sid:
+        traces = [t for t in traces if t["attributes"].get("twilio.message_sid") == args.message_sid]
+    if args.path:
+        traces = [t for t in traces if t["name"].endswith(args.path)]
+    if not traces:
+        print("No matching traces.")
+        return 1
+    traces.sort(key=lambda t: t["duration_ms"], reverse=True)
+    for trace in traces[:args.top]:
+        print(format_waterfall(trace))
+        print()
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show trace waterfalls, slowest first.")
+    parser.add_argument("traces", help="JSON lines trace file")
+    parser.add_argument("--top", type=int, default=3)
+    parser.add_argument("--message-sid", help="only the trace for this Twilio MessageSid")
+    parser.add_argument("--path", help="only traces for this route, e.g. /intercept")
+    sys.exit(main(parser.parse_args()))
@@ -15,6 +15,75 @@ class Settings(BaseSettings):
     AIRTABLE_NUMBER_INVENTORY_TABLE: str = "Number Inventory"
     AIRTABLE_AUDIT_LOG_TABLE: str = "Audit Log"
 
+    # API endpoints (point these at local stand-in servers for soak tests)
+    AIRTABLE_API_URL: str = "https://api.airtable.com"
+    TWILIO_API_URL: str = ""
+
+    # Airtable allows 5 requests/second per base; bulk pipelines pace themselves to this
+    AIRTABLE_REQUESTS_PER_SECOND: float = 5.0
+
+    # In-memory phone directory (known sitter/client/pool numbers)
+    DIRECTORY_REFRESH_SECONDS: int = 300
+    NEGATIVE_CACHE_TTL_SECONDS: int = 300
+    DIRECTORY_SNAPSHOT_PATH: str = ""
+    DIRECTORY_SNAPSHOT_MAX_AGE_SECONDS: int = 86400
+
+    # Local SQLite read replica of Sitters/Clients/Number Inventory for lookups (disabled unless a path is set)
+    AIRTABLE_REPLICA_PATH: str = ""
+    REPLICA_SYNC_SECONDS: int = 30
+    REPLICA_FULL_SYNC_SECONDS: int = 3600
+
+    # Exact-match phone lookups on stored 'phone-key'/'twilio-key' fields (enable after the backfill)
+    AIRTABLE_PHONE_KEY_FIELDS: bool = False
+
+    # Client Twilio-Error-Count increments are coalesced in memory and written this often
+    ERROR_COUNT_FLUSH_SECONDS: float = 10.0
+
+    # Messages archival: rows older than MESSAGE_ARCHIVE_AFTER_DAYS move to gzip JSONL files (disabled unless a directory is set)
+    MESSAGE_ARCHIVE_DIR: str = ""
+    MESSAGE_ARCHIVE_AFTER_DAYS: int = 90
+    MESSAGE_ARCHIVE_INTERVAL_SECONDS: int = 3600
+    MESSAGE_ARCHIVE_MAX_PER_RUN: int = 2000
+
+    # In-memory ring buffer of recent events behind /debug/events
+    EVENT_BUFFER_SIZE: int = 2000
+    EVENT_STREAM_HEARTBEAT_SECONDS: float = 15.0
+
+    # Proxy session reaper (disabled unless an interval is set)
+    SESSION_REAPER_INTERVAL_SECONDS: int = 0
+    SESSION_REAPER_CONCURRENCY: int = 8
+
+    # Routine audit events are counted and written as one rollup row per event type this often
+    AUDIT_ROLLUP_SECONDS: int = 300
+
+    # Webhook admission control (per-From / per-To token buckets + global in-flight cap)
+    WEBHOOK_SENDER_RATE: float = 1.0
+    WEBHOOK_SENDER_BURST: int = 10
+    WEBHOOK_RECIPIENT_RATE: float = 5.0
+    WEBHOOK_RECIPIENT_BURST: int = 30
+    WEBHOOK_MAX_IN_FLIGHT: int = 50
+
+    # Outbound SMS pacing (Twilio long codes handle ~1 message/second each)
+    SMS_PER_NUMBER_MPS: float = 1.0
+    SMS_MAX_RETRIES: int = 5
+    SMS_RETRY_BACKOFF_SECONDS: float = 1.0
+
+    # Webhook capture for replay (disabled unless a path is set)
+    WEBHOOK_CAPTURE_PATH: str = ""
+    WEBHOOK_CAPTURE_SALT: str = ""
+
+    # Per-webhook trace spans (disabled unless an export target is set)
+    TRACE_EXPORT_PATH: str = ""
+    TRACE_OTLP_ENDPOINT: str = ""
+    TRACE_SAMPLE_RATE: float = 1.0
+
+    # Sampling profiler: captured requests (sampled or slow) and admin sessions
+    PROFILE_REQUEST_SAMPLE_RATE: float = 0.0
+    PROFILE_SLOW_REQUEST_MS: float = 0.0
+    PROFILE_INTERVAL_MS: float = 10.0
+    PROFILE_OUTPUT_DIR: str = "profiles"
+    PROFILER_ADMIN_TOKEN: str = ""
+
     class Config:
         env_file = ".env"
 
@@ -1,30 +1,94 @@
-from fastapi import FastAPI
-from config import settings
-from routers import sessions, intercept, numbers
-from utils.logger import log_info
+import time
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+from routers import sessions, intercept, numbers, clients, broadcast, debug, profiler as profiler_admin
+from services.startup import readiness
+from services.audit import audit_rollup
+from utils import metrics, tracing, profiler
+from utils.events import recent_events
 
 app = FastAPI(title="Phone Masking Service")
 
+# Longest the shutdown waits for queued outbound SMS
+SMS_SHUTDOWN_WAIT_SECONDS = 20
+
 # Register Routers
 app.include_router(sessions.router)
 app.include_router(intercept.router)
 app.include_router(numbers.router)
+app.include_router(clients.router)
+app.include_router(broadcast.router)
+app.include_router(debug.router)
+app.include_router(profiler_admin.router)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status_code = 500
+    # Webhooks (all POST) get a trace; metric scrapes and debug reads do not
+    if request.method == "POST":
+        trace = tracing.start_trace(f"POST {request.url.path}", force=profiler.request_profiling_enabled())
+        profile = profiler.profile_request(trace)
+    else:
+        trace = profile = tracing.NOOP_SPAN
+    with profile, trace:
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            # Label by route template, not raw path, to keep the series bounded
+            route = request.scope.get("route")
+            elapsed = time.perf_counter() - start
+            metrics.http_request_duration.observe(
+                elapsed,
+                route=getattr(route, "path", "unmatched"), method=request.method, status=str(status_code),
+            )
+            if request.method == "POST":
+                # Webhook timings go into the periodic audit rollup, not one row each
+                description = f"POST {getattr(route, 'path', 'unmatched')} {status_code}"
+                audit_rollup.record("WEBHOOK", description, elapsed * 1000)
+                recent_events.record("WEBHOOK", description, {"duration_ms": round(elapsed * 1000, 1)})
+            trace.set_attribute("http.status_code", status_code)
 
 @app.on_event("startup")
 async def startup_event():
-    log_info("Starting Phone Masking Service")
-    log_info(f"Loaded configuration for environment: {settings.AIRTABLE_BASE_ID}")
-    
-    # Start Automated Deallocation Worker in background
-    from services.deallocate_worker import async_run_worker
+    # Directory load and SDK warm-up run in the background; /ready turns true
+    # when they finish, then the deallocation worker and directory refresher start
+    from services.startup import async_warm_up
+    import asyncio
+    asyncio.create_task(async_warm_up())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Send the SMS webhooks queued (they no longer wait for it), then write the
+    # error count increments and audit rollups still held in memory
+    from services.sms_scheduler import scheduler
+    from services.error_counts import error_counts
+    from services.audit import audit_rollup
     import asyncio
-    asyncio.create_task(async_run_worker())
-    log_info("Automated 14-day deallocation worker queued in background.")
+    await asyncio.to_thread(scheduler.wait_idle, SMS_SHUTDOWN_WAIT_SECONDS)
+    await asyncio.to_thread(error_counts.flush)
+    await asyncio.to_thread(audit_rollup.flush)
 
 @app.get("/")
 async def root():
     return {"message": "Phone Masking Service is running"}
 
+@app.get("/ready")
+async def ready():
+    status = readiness.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/debug/sms-queues")
+async def debug_sms_queues():
+    from services.sms_scheduler import scheduler
+    return scheduler.queue_depths()
+
 @app.get("/debug/sitters")
 async def debug_sitters():
     from services.airtable_client import sitters_table
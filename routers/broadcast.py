@@ -0,0 +1,47 @@
+"""
+Broadcast Router
+================
+This script lets a Sitter send the same notice (e.g. a schedule change) to all of their Clients.
+
+Endpoints:
+- POST /broadcast: Queues one message per linked Client and returns immediately.
+  Delivery continues in the background, paced per sending number.
+"""
+
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from services.broadcast import prepare_broadcast, deliver_broadcast
+from utils.logger import log_info
+from utils.request_parser import parse_incoming_payload
+
+router = APIRouter()
+
+@router.post("/broadcast")
+async def broadcast(request: Request, background_tasks: BackgroundTasks):
+    """
+    Sends a message from a Sitter to every Client linked to them.
+
+    Accepts JSON, form or query params: {"sitter_id": "rec123", "body": "..."}
+
+    Returns:
+        202 with the number of Clients the message was queued for.
+    """
+    payload = await parse_incoming_payload(request, required_fields=["sitter_id", "body"])
+    sitter_id = str(payload["sitter_id"]).strip()
+    body = payload["body"]
+
+    sitter, clients = await run_in_threadpool(prepare_broadcast, sitter_id)
+    if not sitter:
+        raise HTTPException(status_code=404, detail=f"Sitter {sitter_id} not found.")
+    if not sitter["fields"].get("twilio-number"):
+        raise HTTPException(status_code=422, detail=f"Sitter {sitter_id} has no entry point number (twilio-number).")
+
+    log_info(f"Broadcast queued for sitter {sitter_id} to {len(clients)} client(s)")
+    if clients:
+        background_tasks.add_task(deliver_broadcast, sitter, clients, body)
+
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"status": "queued", "sitter_id": sitter_id, "recipients": len(clients)}
+    )
@@ -0,0 +1,112 @@
+"""
+Clients Router
+==============
+This script handles bulk ingestion of Client records from Time To Pet (via Zapier).
+
+Key Functionality:
+- Accepts arrays of clients in a single request.
+- Normalizes every phone number to E.164 so it matches the numbers Twilio reports.
+- Writes the whole batch 10 records per request, matching existing Clients by
+  national phone key (see `batch_upsert_clients`) instead of a search + write
+  per client.
+
+Endpoints:
+- POST /clients/bulk-upsert: Creates or updates many Clients at once.
+"""
+
+import asyncio
+from fastapi import APIRouter, HTTPException, Request
+from services.airtable_client import batch_upsert_clients, log_event
+from utils.logger import log_info
+from utils.request_parser import parse_incoming_payload
+from utils.phone import e164_batch
+
+router = APIRouter()
+
+# Accepted input keys (Zapier field names vary between Zaps) -> Airtable field
+FIELD_ALIASES = {
+    "Name": ["name", "Name", "full_name", "fullName"],
+    "Email": ["email", "Email"],
+    "Preferred Contact Method": ["preferred_contact_method", "Preferred Contact Method"],
+}
+PHONE_ALIASES = ["phone", "phone_number", "phone-number", "phoneNumber", "Phone"]
+
+def _raw_phone(client):
+    if not isinstance(client, dict):
+        return None
+    return next((client.get(key) for key in PHONE_ALIASES if client.get(key)), None)
+
+def _client_to_fields(client: dict, raw_phone, phone: str):
+    """
+    Maps one inbound client object to Airtable fields.
+
+    Args:
+        client (dict): The inbound client object.
+        raw_phone: Its phone number as sent.
+        phone (str): The same number in E.164 (None if invalid).
+
+    Returns:
+        dict: Airtable fields, or None if the phone number is missing/invalid.
+    """
+    if not phone:
+        return None
+
+    fields = {"phone-number": phone, "Client Phone (raw)": str(raw_phone).strip()}
+    for airtable_field, aliases in FIELD_ALIASES.items():
+        value = next((client.get(key) for key in aliases if client.get(key)), None)
+        if value:
+            fields[airtable_field] = value
+    return fields
+
+@router.post("/clients/bulk-upsert")
+async def bulk_upsert_clients(request: Request):
+    """
+    Creates or updates many Client records in one call.
+
+    Accepts a JSON body of {"clients": [{"phone": "...", "name": "...", "email": "..."}]}
+    (a bare JSON array is also accepted). Entries are de-duplicated by normalized
+    phone number, the last occurrence wins.
+
+    'Last Active' is intentionally not touched: a roster sync is not client
+    activity and must not reset the 14-day deallocation timer.
+
+    Returns:
+        dict: Counts of created/updated records plus skipped and failed phones.
+    """
+    try:
+        data = await request.json()
+    except Exception:
+        data = await parse_incoming_payload(request, required_fields=[])
+
+    clients = data.get("clients") if isinstance(data, dict) else data
+    if not isinstance(clients, list) or not clients:
+        raise HTTPException(status_code=422, detail="clients must be a non-empty array.")
+
+    by_phone = {}
+    skipped = []
+    raw_phones = [_raw_phone(client) for client in clients]
+    for client, raw_phone, phone in zip(clients, raw_phones, e164_batch(raw_phones)):
+        fields = _client_to_fields(client, raw_phone, phone)
+        if not fields:
+            skipped.append(client)
+            continue
+        by_phone[fields["phone-number"]] = fields
+
+    log_info(f"Bulk client upsert: {len(clients)} received, {len(by_phone)} unique valid phone(s)")
+
+    summary = await asyncio.to_thread(batch_upsert_clients, list(by_phone.values()))
+
+    log_event(
+        "CLIENT_SYNC",
+        f"Bulk upserted {summary['created'] + summary['updated']} client(s)",
+        f"Created: {summary['created']}, Updated: {summary['updated']}, Skipped: {len(skipped)}, Failed: {len(summary['failed'])}"
+    )
+
+    return {
+        "status": "success" if not summary["failed"] else "partial",
+        "received": len(clients),
+        "created": summary["created"],
+        "updated": summary["updated"],
+        "skipped": skipped,
+        "failed": summary["failed"]
+    }
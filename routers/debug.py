@@ -0,0 +1,77 @@
+"""
+Debug Router
+============
+Live view of recent routing decisions and events, served from the in-process
+ring buffer (see `utils/events.py`). No Airtable reads.
+
+Events include phone numbers and message text, so every endpoint requires
+the `X-Admin-Token` header (PROFILER_ADMIN_TOKEN) and answers 404 when no
+token is configured, like the profiler endpoints.
+
+Endpoints:
+- GET /debug/events: Recent events, newest first. Page back with
+  `?before=<next_before>`; filter with `?type=ERROR` (or WEBHOOK, INFO, ...).
+- GET /debug/events/stream: Server-sent events, one `data:` JSON line per event
+  as it is recorded. Starts with the events after `?after=<id>` (or the
+  `Last-Event-ID` header a reconnecting EventSource sends), otherwise with new
+  events only. A `gap` event reports events that left the buffer before they
+  could be sent.
+"""
+
+import json
+from fastapi import APIRouter, Depends, Header, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from config import settings
+from routers.profiler import require_admin_token
+from utils.events import recent_events
+
+router = APIRouter(prefix="/debug/events", dependencies=[Depends(require_admin_token)])
+
+@router.get("")
+async def list_events(
+    before: Optional[int] = Query(None, ge=1),
+    limit: int = Query(50, ge=1, le=500),
+    type: Optional[str] = Query(None),
+):
+    events = recent_events.page(before, limit, type)
+    return {
+        "events": events,
+        "latest": recent_events.last_id,
+        "next_before": events[-1]["id"] if len(events) == limit else None,
+    }
+
+def _sse(event: dict) -> str:
+    return f"id: {event['id']}\ndata: {json.dumps(event)}\n\n"
+
+async def _stream(request: Request, cursor: int):
+    # Tells EventSource how long to wait before reconnecting
+    yield "retry: 2000\n\n"
+    while not await request.is_disconnected():
+        events, missed = recent_events.since(cursor)
+        if missed:
+            yield f"event: gap\ndata: {json.dumps({'missed': missed})}\n\n"
+        for event in events:
+            yield _sse(event)
+            cursor = event["id"]
+        if not await recent_events.wait(cursor, settings.EVENT_STREAM_HEARTBEAT_SECONDS):
+            # Keeps proxies from closing an idle stream
+            yield ": heartbeat\n\n"
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    after: Optional[int] = Query(None, ge=0),
+    last_event_id: Optional[str] = Header(None),
+):
+    cursor = after
+    if cursor is None and last_event_id and last_event_id.isdigit():
+        cursor = int(last_event_id)
+    if cursor is None or cursor > recent_events.last_id:
+        # A cursor ahead of the buffer comes from before a restart: ids start over
+        cursor = recent_events.last_id if cursor is None else 0
+    return StreamingResponse(
+        _stream(request, cursor),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
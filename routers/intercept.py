@@ -17,7 +17,8 @@ Key Functionality:
   3. Manually forwards SMS from Pool Number to Client's Real Number.
 """
 
-from fastapi import APIRouter, Request, Response, status
+from fastapi import APIRouter, Depends, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from services.airtable_client import (
     find_sitter_by_twilio_number,
     find_client_by_phone,
@@ -30,14 +31,24 @@ from services.airtable_client import (
     save_message,
     update_message_status,
     log_event,
-    update_client_last_active
+    update_client_last_active,
+    track_lookup_errors,
+    failed_lookups,
+    client_setup_locks,
+    pool_allocation_lock
 )
-from services.twilio_proxy import send_sms
-from utils.logger import log_info, log_error
+from services.sms_scheduler import queue_sms
+from services.unit_of_work import unit_of_work
+from services.directory import directory
+from utils.logger import log_info, log_error, logger
 from utils.request_parser import parse_incoming_payload
+from utils.admission import webhook_admission
 from utils.formatters import format_display_name
+from utils.phone import e164, national_key
+from utils import tracing
 
-router = APIRouter()
+# Per-sender/per-recipient rate limits and a global in-flight cap shed floods cheaply
+router = APIRouter(dependencies=[Depends(webhook_admission)])
 
 @router.post("/intercept")
 async def intercept(request: Request):
@@ -48,11 +59,33 @@ async def intercept(request: Request):
     Body = payload.get("Body", "")
     
     # Normalize
-    if From and not From.startswith("+"): From = f"+{From}"
-    if To and not To.startswith("+"): To = f"+{To}"
+    From = e164(From) or From
+    To = e164(To) or To
+
+    # Neither number is a known Sitter/Client/pool number: drop without any Airtable work
+    with tracing.span("directory_check"):
+        rejected = directory.should_reject(From, To)
+    if rejected:
+        logger.info(f"Intercept: unknown numbers {From} -> {To}. Ignored.")
+        return {"status": "ignored"}
 
     log_info(f"Intercept Triggered: {From} -> {To} | Body: {Body}")
 
+    # Routing makes blocking Airtable/Twilio calls; run it off the event loop so
+    # concurrent webhooks overlap (and identical lookups coalesce)
+    return await run_in_threadpool(_route_message_in_unit_of_work, From, To, Body)
+
+def _route_message_in_unit_of_work(From: str, To: str, Body: str):
+    # All Client field changes made while routing are merged into one update per record
+    with tracing.span("route_message"), unit_of_work(), track_lookup_errors():
+        return route_message(From, To, Body)
+
+def route_message(From: str, To: str, Body: str):
+    """
+    Routes one normalized message between a Sitter and a Client.
+    
+    Returns the response Twilio should receive (200/403/500 or an "ignored" status).
+    """
     # ==============================================================================
     # 1. CHECK IF SITTER IS SENDER (Outbound: Sitter -> Client)
     # ==============================================================================
@@ -90,10 +123,9 @@ async def intercept(request: Request):
                     update_message_status(msg_id, "Failed (Missing Sitter Entry Point)")
                     return Response(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-                send_sms(from_number=sitter_entry_point, to_number=client_real_phone, body=Body)
-                
-                update_message_status(msg_id, "Sent")
-                log_info(f"Successfully forwarded Sitter -> Client using Sitter entry point: {sitter_entry_point}")
+                # Sent in the background; the message row is marked Sent once Twilio accepts it
+                queue_sms(from_number=sitter_entry_point, to_number=client_real_phone, body=Body, message_id=msg_id)
+                log_info(f"Queued Sitter -> Client using Sitter entry point: {sitter_entry_point}")
                 return Response(status_code=status.HTTP_200_OK)
             except Exception as e:
                 log_error("Failed to forward Sitter reply", str(e))
@@ -117,49 +149,54 @@ async def intercept(request: Request):
         
         # 2a. Find Client explicitly by Handset (From)
         log_info(f"Handset identification: querying for Sender={From}")
-        client = find_client_by_phone(From)
+        # One request per handset at a time from lookup to pool number, so
+        # concurrent first texts create and number a single Client
+        with client_setup_locks.hold(national_key(From) or From):
+            client = find_client_by_phone(From)
         
-        if client:
-            client_id = client["id"]
-            client_name = client["fields"].get("Name", "Unknown")
-            client_pool_num = client["fields"].get("twilio-number")
-            log_info(f"Existing Client found: {client_name}. Checking assigned number...")
-        else:
-            # Not found? Create one to get an ID
-            log_info(f"Client {From} not found. Creating record...")
-            client, _ = create_or_update_client(From)
-            client_id = client["id"]
-            client_name = client["fields"].get("Name", "Unknown")
-            client_pool_num = None
-            log_info(f"Created new Client record: {client_id}")
+            if client:
+                client_id = client["id"]
+                client_name = client["fields"].get("Name", "Unknown")
+                client_pool_num = client["fields"].get("twilio-number")
+                log_info(f"Existing Client found: {client_name}. Checking assigned number...")
+            else:
+                # Not found? Create one to get an ID
+                log_info(f"Client {From} not found. Creating record...")
+                client, _ = create_or_update_client(From)
+                client_id = client["id"]
+                client_name = client["fields"].get("Name", "Unknown")
+                client_pool_num = None
+                log_info(f"Created new Client record: {client_id}")
         
-        # 2b. Assign Pool Number if missing
-        assigned_number = client_pool_num
-        is_new_assignment = False
-        if not assigned_number:
-            log_info(f"Client {From} has no pool number. Fetching from inventory...")
-            pool_record = get_ready_pool_number()
+            # 2b. Assign Pool Number if missing
+            assigned_number = client_pool_num
+            is_new_assignment = False
+            if not assigned_number:
+                log_info(f"Client {From} has no pool number. Fetching from inventory...")
+                # Pick and assign as one step, so two Clients never get the same number
+                with pool_allocation_lock:
+                    pool_record = get_ready_pool_number()
             
-            if pool_record:
-                new_pool_num = pool_record["fields"].get("phone-number")
-                pool_record_id = pool_record["id"]
+                    if pool_record:
+                        new_pool_num = pool_record["fields"].get("phone-number")
+                        pool_record_id = pool_record["id"]
                 
-                if assign_pool_number_to_client(client_id, pool_record_id, new_pool_num):
-                    assigned_number = new_pool_num
-                    is_new_assignment = True
-                    log_info(f"Assigned new Pool Number {assigned_number} to Client {client_id}")
-                    log_event("NUMBER_ASSIGNED", f"Assigned {assigned_number} to Client {client_name}", f"Client ID: {client_id}")
-                else:
-                    log_error("Failed to assign available pool number.")
-                    log_event("ASSIGNMENT_ERROR", "Failed to update Client with Pool Number", f"Client ID: {client_id}")
-            else:
-                log_error("CRITICAL: No Ready pool numbers available in Inventory!")
-                log_event("POOL_EXHAUSTED", "No Ready numbers found in Inventory", f"Client: {From}")
-                # Fallback? We can't forward without a masked number.
-                # Increment error count so worker might retry later if pool fills up?
-                increment_client_error_count(client_id)
-                return Response(status_code=status.HTTP_403_FORBIDDEN)
-        
+                        if assign_pool_number_to_client(client_id, pool_record_id, new_pool_num):
+                            assigned_number = new_pool_num
+                            is_new_assignment = True
+                            log_info(f"Assigned new Pool Number {assigned_number} to Client {client_id}")
+                            log_event("NUMBER_ASSIGNED", f"Assigned {assigned_number} to Client {client_name}", f"Client ID: {client_id}")
+                        else:
+                            log_error("Failed to assign available pool number.")
+                            log_event("ASSIGNMENT_ERROR", "Failed to update Client with Pool Number", f"Client ID: {client_id}")
+                    else:
+                        log_error("CRITICAL: No Ready pool numbers available in Inventory!")
+                        log_event("POOL_EXHAUSTED", "No Ready numbers found in Inventory", f"Client: {From}")
+                        # Fallback? We can't forward without a masked number.
+                        # Increment error count so worker might retry later if pool fills up?
+                        increment_client_error_count(client_id)
+                        return Response(status_code=status.HTTP_403_FORBIDDEN)
+
         # 2c. Link Sitter
         sitter_name = sitter_recipient["fields"].get("Full Name", "Unknown Sitter")
         sitter_real_phone = sitter_recipient["fields"].get("phone-number")
@@ -196,23 +233,31 @@ async def intercept(request: Request):
         # We save the *Forwarded* version so retry worker just executes it blindly
         msg_id = save_message("Manual", assigned_number, sitter_real_phone, modified_body)
         
+        def forward_failed(error: Exception):
+            # Message Status stays 'Pending' (from save_message default), so Worker will retry
+            log_event("FORWARD_ERROR", f"Failed to forward message from {From}", str(error))
+            increment_client_error_count(client_id)
+
         try:
-            # Send FROM Assigned Pool Number TO Sitter's REAL Number
-            send_sms(from_number=assigned_number, to_number=sitter_real_phone, body=modified_body)
-            log_info(f"Forwarded Client -> Sitter: {modified_body} to {sitter_real_phone}")
-            
-            update_message_status(msg_id, "Sent")
+            # Send FROM Assigned Pool Number TO Sitter's REAL Number, in the background
+            queue_sms(
+                from_number=assigned_number, to_number=sitter_real_phone, body=modified_body,
+                message_id=msg_id, on_failure=forward_failed,
+            )
+            log_info(f"Queued Client -> Sitter: {modified_body} to {sitter_real_phone}")
             
             # Return 403 to stop Twilio from processing further
             return Response(status_code=status.HTTP_403_FORBIDDEN)
             
         except Exception as e:
             log_error(f"Failed to forward Client message", str(e))
-            log_event("FORWARD_ERROR", f"Failed to forward message from {From}", str(e))
-            increment_client_error_count(client_id)
-            # Message Status stays 'Pending' (from save_message default), so Worker will retry
+            forward_failed(e)
             return Response(status_code=status.HTTP_403_FORBIDDEN)
 
     # Fallback if neither Sitter nor Client logic matched
     log_info("Intercept: Message did not match Sitter routing rules.")
+    # A lookup that failed (Airtable error, 429) proves nothing about the numbers
+    if not failed_lookups():
+        directory.mark_unknown(From)
+        directory.mark_unknown(To)
     return {"status": "ignored"}
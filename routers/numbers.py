@@ -11,19 +11,30 @@ Key Functionality:
 
 Endpoints:
 - POST /attach-number: Manually triggers a number rotation for a specific Sitter.
+- POST /attach-numbers: Rotates numbers for many Sitters at once (onboarding waves).
 """
 
+import asyncio
 from fastapi import APIRouter, HTTPException, Body, Query, Request
 from pydantic import BaseModel, field_validator
 from typing import Optional
-from services.number_pool import get_next_available_number, assign_number_to_sitter, move_old_number_to_standby
-from services.twilio_proxy import update_proxy_number
-from services.airtable_client import find_sitter_by_twilio_number, find_number_assigned_to_sitter, log_event, inventory_table
+from services.number_pool import get_next_available_number, assign_number_to_sitter, move_old_number_to_standby, plan_bulk_assignment
+from services.airtable_client import (
+    find_number_assigned_to_sitter,
+    log_event,
+    inventory_table,
+    get_inventory_snapshot,
+    batch_update_inventory
+)
+from services.directory import directory
 from utils.logger import log_info, log_error
 from utils.request_parser import parse_incoming_payload
 
 router = APIRouter()
 
+# Upper bound on simultaneous Twilio Proxy attach calls during a bulk rotation
+PROXY_ATTACH_CONCURRENCY = 5
+
 class AttachNumberRequest(BaseModel):
     sitter_id: str
     
@@ -112,8 +123,8 @@ async def attach_number(
     if not new_number_record:
         # Get diagnostic info to help user
         try:
-            from services.airtable_client import inventory_table
-            all_records = inventory_table.all(max_records=10)
+            from services import airtable_schema
+            all_records = inventory_table.all(fields=airtable_schema.fields("inventory", "lookup"), max_records=10)
             if not all_records:
                 detail = "Number Inventory table is empty. Please add phone numbers to the 'Number Inventory' table in Airtable."
             else:
@@ -154,6 +165,9 @@ async def attach_number(
         assign_number_to_sitter(sitter_id, new_number_id, raise_on_error=True)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to assign number: {str(e)}")
+    
+    # Make the new entry point routable before the next directory refresh
+    directory.add(new_number)
 
     # ---------------------------------------------------------
     # 3.5. Add Number to Twilio Proxy Service
@@ -192,3 +206,143 @@ async def attach_number(
     log_event("NUMBER_ROTATION", f"Assigned {new_number} to sitter {sitter_id}")
     
     return {"status": "success", "new_number": new_number}
+
+
+def _parse_sitter_ids(value) -> list:
+    """
+    Accepts a list of IDs or a comma/newline separated string (Zapier line items).
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.replace("\n", ",").split(",")
+    return [str(v).strip() for v in value if v and str(v).strip()]
+
+@router.post("/attach-numbers")
+async def attach_numbers(request: Request):
+    """
+    Assigns new phone numbers to many Sitters in one call.
+    
+    The Number Inventory table is read once and numbers are handed out from
+    that snapshot, so no two Sitters in the batch receive the same number.
+    Proxy attachments run concurrently and all inventory writes are batched
+    (10 records per Airtable request).
+    
+    Accepts:
+    - JSON body: {"sitter_ids": ["rec1", "rec2"]}
+    - Form/query: sitter_ids=rec1,rec2
+    
+    Returns:
+        dict: Overall status plus one result entry per Sitter.
+    """
+    payload = await parse_incoming_payload(request, required_fields=[])
+    sitter_ids = _parse_sitter_ids(
+        payload.get("sitter_ids") or payload.get("sitterIds") or payload.get("ids")
+    )
+    
+    if not sitter_ids:
+        raise HTTPException(status_code=422, detail="sitter_ids is required (list or comma-separated string).")
+    
+    log_info(f"Bulk attaching numbers for {len(sitter_ids)} sitter(s)")
+
+    # ---------------------------------------------------------
+    # 1. Single Inventory Scan + Collision-Free Plan
+    # ---------------------------------------------------------
+    try:
+        snapshot = await asyncio.to_thread(get_inventory_snapshot)
+    except Exception as e:
+        log_error("Failed to read Number Inventory for bulk attach", str(e))
+        raise HTTPException(status_code=500, detail=f"Failed to read Number Inventory: {str(e)}")
+    
+    assignments, unserved = plan_bulk_assignment(sitter_ids, snapshot)
+    
+    results = {}
+    for sid in unserved:
+        results[sid] = {"sitter_id": sid, "status": "failed", "error": "No unassigned numbers left in inventory"}
+
+    # ---------------------------------------------------------
+    # 2. Reserve New Numbers (batched)
+    # ---------------------------------------------------------
+    failed_reservations = await asyncio.to_thread(batch_update_inventory, [
+        {"id": a["new_record"]["id"], "fields": {"Assigned Sitter": [a["sitter_id"]]}}
+        for a in assignments
+    ])
+    
+    reserved = []
+    for a in assignments:
+        if a["new_record"]["id"] in failed_reservations:
+            results[a["sitter_id"]] = {"sitter_id": a["sitter_id"], "status": "failed", "error": "Failed to assign number"}
+        else:
+            reserved.append(a)
+            directory.add(a["new_record"]["fields"].get("phone-number"))
+
+    # ---------------------------------------------------------
+    # 3. Attach to Twilio Proxy (bounded concurrency)
+    # ---------------------------------------------------------
+    from services.twilio_proxy import add_number_to_proxy_service
+    semaphore = asyncio.Semaphore(PROXY_ATTACH_CONCURRENCY)
+    
+    async def attach(number: str):
+        async with semaphore:
+            try:
+                return await asyncio.to_thread(add_number_to_proxy_service, number), None
+            except Exception as e:
+                # Don't fail the Sitter, Zap 3 will retry attachment if needed
+                return None, str(e)
+    
+    attach_outcomes = await asyncio.gather(
+        *(attach(a["new_record"]["fields"].get("phone-number")) for a in reserved)
+    )
+
+    # ---------------------------------------------------------
+    # 4. Record Proxy SIDs + Release Old Numbers (batched)
+    # ---------------------------------------------------------
+    followup_updates = []
+    for a, (proxy_phone_sid, _) in zip(reserved, attach_outcomes):
+        if proxy_phone_sid:
+            followup_updates.append({
+                "id": a["new_record"]["id"],
+                "fields": {"Proxy Phone SID": proxy_phone_sid, "Attach Status": "Ready"}
+            })
+        if a["old_record"]:
+            followup_updates.append({"id": a["old_record"]["id"], "fields": {"Assigned Sitter": []}})
+    
+    failed_followups = await asyncio.to_thread(batch_update_inventory, followup_updates)
+
+    # ---------------------------------------------------------
+    # 5. Per-Sitter Results + Log Event
+    # ---------------------------------------------------------
+    for a, (proxy_phone_sid, attach_error) in zip(reserved, attach_outcomes):
+        sitter_id = a["sitter_id"]
+        new_number = a["new_record"]["fields"].get("phone-number")
+        result = {"sitter_id": sitter_id, "status": "success", "new_number": new_number}
+        
+        if proxy_phone_sid:
+            result["proxy_phone_sid"] = proxy_phone_sid
+        else:
+            result["proxy_error"] = attach_error
+        
+        if a["old_record"]:
+            old_number_id = a["old_record"]["id"]
+            result["old_number"] = a["old_record"]["fields"].get("phone-number")
+            if old_number_id in failed_followups:
+                log_error(f"Failed to release old number {old_number_id} for sitter {sitter_id}")
+                result["release_error"] = "Failed to release old number"
+        
+        results[sitter_id] = result
+    
+    ordered = [results[sid] for sid in dict.fromkeys(sitter_ids) if sid in results]
+    succeeded = sum(1 for r in ordered if r["status"] == "success")
+    
+    log_event(
+        "NUMBER_ROTATION",
+        f"Bulk assigned numbers to {succeeded}/{len(ordered)} sitter(s)",
+        ", ".join(f"{r['sitter_id']}={r.get('new_number', r['status'])}" for r in ordered)
+    )
+    
+    return {
+        "status": "success" if succeeded == len(ordered) else "partial",
+        "assigned": succeeded,
+        "failed": len(ordered) - succeeded,
+        "results": ordered
+    }
@@ -0,0 +1,55 @@
+"""
+Profiler Router
+===============
+Admin endpoints for whole-process sampling sessions (see `utils/profiler.py`).
+
+Endpoints (require the `X-Admin-Token` header to match PROFILER_ADMIN_TOKEN;
+they answer 404 when no token is configured):
+- POST /admin/profiler/start: Starts sampling every thread.
+- POST /admin/profiler/stop: Stops the session and writes it to PROFILE_OUTPUT_DIR.
+- GET /admin/profiler/status: Running state, duration and sample count.
+- GET /admin/profiler/collapsed: Collapsed stacks for flamegraph.pl/speedscope.
+"""
+
+import hmac
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from config import settings
+from utils import profiler
+from utils.logger import log_info
+
+def require_admin_token(x_admin_token: str = Header(default="")):
+    if not settings.PROFILER_ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(x_admin_token, settings.PROFILER_ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token.")
+
+router = APIRouter(prefix="/admin/profiler", dependencies=[Depends(require_admin_token)])
+
+@router.post("/start")
+async def start_profiling():
+    if not profiler.start_session():
+        raise HTTPException(status_code=409, detail="A profiling session is already running.")
+    log_info("Profiling session started")
+    return profiler.session_status()
+
+@router.post("/stop")
+async def stop_profiling():
+    summary = profiler.stop_session()
+    if summary is None:
+        raise HTTPException(status_code=409, detail="No profiling session is running.")
+    log_info(f"Profiling session stopped: {summary['samples']} samples", summary.get("path") or "")
+    return summary
+
+@router.get("/status")
+async def profiling_status():
+    return profiler.session_status()
+
+@router.get("/collapsed")
+async def download_collapsed():
+    collapsed = profiler.session_collapsed()
+    if collapsed is None:
+        raise HTTPException(status_code=404, detail="No profiling session recorded yet.")
+    return PlainTextResponse(
+        collapsed, headers={"Content-Disposition": 'attachment; filename="profile.collapsed"'}
+    )
@@ -6,7 +6,8 @@ This endpoint now mirrors the manual intercept logic to ensure that
 Twilio Sessions are NO LONGER created.
 """
 
-from fastapi import APIRouter, Request, Response, status
+from fastapi import APIRouter, Depends, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from services.airtable_client import (
     create_or_update_client,
     get_ready_pool_number,
@@ -19,14 +20,24 @@ from services.airtable_client import (
     save_message,
     update_message_status,
     log_event,
-    update_client_last_active
+    update_client_last_active,
+    track_lookup_errors,
+    failed_lookups,
+    client_setup_locks,
+    pool_allocation_lock
 )
-from services.twilio_proxy import send_sms
-from utils.logger import log_info, log_error
+from services.sms_scheduler import queue_sms
+from services.unit_of_work import unit_of_work
+from services.directory import directory
+from utils.logger import log_info, log_error, logger
 from utils.request_parser import parse_incoming_payload
+from utils.admission import webhook_admission
 from utils.formatters import format_display_name
+from utils.phone import e164, national_key
+from utils import tracing
 
-router = APIRouter()
+# Per-sender/per-recipient rate limits and a global in-flight cap shed floods cheaply
+router = APIRouter(dependencies=[Depends(webhook_admission)])
 
 @router.post("/out-of-session")
 async def out_of_session(request: Request):
@@ -41,11 +52,31 @@ async def out_of_session(request: Request):
     Body = payload.get("Body", "")
     
     # Normalize
-    if From and not From.startswith("+"): From = f"+{From}"
-    if To and not To.startswith("+"): To = f"+{To}"
+    From = e164(From) or From
+    To = e164(To) or To
+
+    # Neither number is a known Sitter/Client/pool number: drop without any Airtable work
+    with tracing.span("directory_check"):
+        rejected = directory.should_reject(From, To)
+    if rejected:
+        logger.info(f"Out-of-Session: unknown numbers {From} -> {To}. Ignored.")
+        return Response(status_code=status.HTTP_404_NOT_FOUND)
 
     log_info(f"Out-of-Session Triggered: {From} -> {To}. Executing Manual Proxy Logic.")
 
+    # Routing makes blocking Airtable/Twilio calls; run it off the event loop so
+    # concurrent webhooks overlap (and identical lookups coalesce)
+    return await run_in_threadpool(_route_out_of_session_in_unit_of_work, From, To, Body)
+
+def _route_out_of_session_in_unit_of_work(From: str, To: str, Body: str):
+    # All Client field changes made while routing are merged into one update per record
+    with tracing.span("route_out_of_session"), unit_of_work(), track_lookup_errors():
+        return route_out_of_session(From, To, Body)
+
+def route_out_of_session(From: str, To: str, Body: str):
+    """
+    Routes one normalized Out-of-Session message (same rules as /intercept).
+    """
     # ==============================================================================
     # 1. CHECK IF SITTER IS SENDER (Outbound: Sitter -> Client)
     # ==============================================================================
@@ -72,9 +103,9 @@ async def out_of_session(request: Request):
                     update_message_status(msg_id, "Failed (Missing Sitter Entry Point)")
                     return Response(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-                send_sms(from_number=sitter_entry_point, to_number=client_real_phone, body=Body)
-                update_message_status(msg_id, "Sent")
-                log_info(f"Successfully forwarded Sitter -> Client (OOS) using: {sitter_entry_point}")
+                # Sent in the background; the message row is marked Sent once Twilio accepts it
+                queue_sms(from_number=sitter_entry_point, to_number=client_real_phone, body=Body, message_id=msg_id)
+                log_info(f"Queued Sitter -> Client (OOS) using: {sitter_entry_point}")
                 return Response(status_code=status.HTTP_200_OK)
             except Exception as e:
                 log_error("Failed to forward Sitter reply (OOS)", str(e))
@@ -93,47 +124,52 @@ async def out_of_session(request: Request):
         
         # 1. Find Client explicitly by Handset (From)
         log_info(f"Handset identification: querying for Sender={From}")
-        client = find_client_by_phone(From)
+        # One request per handset at a time from lookup to pool number, so
+        # concurrent first texts create and number a single Client
+        with client_setup_locks.hold(national_key(From) or From):
+            client = find_client_by_phone(From)
         
-        if client:
-            client_id = client["id"]
-            client_name = client["fields"].get("Name", "Unknown")
-            client_pool_num = client["fields"].get("twilio-number")
-            log_info(f"Existing Client found (OOS): {client_name}. Checking assigned number...")
-        else:
-            # Not found? Create one to get an ID
-            log_info(f"Client {From} not found (OOS). Creating record...")
-            client, _ = create_or_update_client(From)
-            client_id = client["id"]
-            client_name = client["fields"].get("Name", "Unknown")
-            client_pool_num = None
-            log_info(f"Created new Client record (OOS): {client_id}")
+            if client:
+                client_id = client["id"]
+                client_name = client["fields"].get("Name", "Unknown")
+                client_pool_num = client["fields"].get("twilio-number")
+                log_info(f"Existing Client found (OOS): {client_name}. Checking assigned number...")
+            else:
+                # Not found? Create one to get an ID
+                log_info(f"Client {From} not found (OOS). Creating record...")
+                client, _ = create_or_update_client(From)
+                client_id = client["id"]
+                client_name = client["fields"].get("Name", "Unknown")
+                client_pool_num = None
+                log_info(f"Created new Client record (OOS): {client_id}")
         
-        # 2. Assign Pool Number if missing
-        assigned_number = client_pool_num
-        is_new_assignment = False
-        if not assigned_number:
-            log_info(f"Client {From} has no pool number. Fetching from inventory...")
-            pool_record = get_ready_pool_number()
+            # 2. Assign Pool Number if missing
+            assigned_number = client_pool_num
+            is_new_assignment = False
+            if not assigned_number:
+                log_info(f"Client {From} has no pool number. Fetching from inventory...")
+                # Pick and assign as one step, so two Clients never get the same number
+                with pool_allocation_lock:
+                    pool_record = get_ready_pool_number()
             
-            if pool_record:
-                new_pool_num = pool_record["fields"].get("phone-number")
-                pool_record_id = pool_record["id"]
+                    if pool_record:
+                        new_pool_num = pool_record["fields"].get("phone-number")
+                        pool_record_id = pool_record["id"]
                 
-                if assign_pool_number_to_client(client_id, pool_record_id, new_pool_num):
-                    assigned_number = new_pool_num
-                    is_new_assignment = True
-                    log_info(f"Assigned new Pool Number {assigned_number} to Client {client_id}")
-                    log_event("NUMBER_ASSIGNED", f"Assigned {assigned_number} to Client {client_name}", f"Client ID: {client_id}")
-                else:
-                    log_error("Failed to assign available pool number.")
-                    log_event("ASSIGNMENT_ERROR", "Failed to update Client with Pool Number", f"Client ID: {client_id}")
-            else:
-                log_error("CRITICAL: No Ready pool numbers available!")
-                log_event("POOL_EXHAUSTED", "No Ready numbers found in Inventory (OOS)", f"Client: {From}")
-                increment_client_error_count(client_id)
-                return Response(status_code=status.HTTP_403_FORBIDDEN)
-        
+                        if assign_pool_number_to_client(client_id, pool_record_id, new_pool_num):
+                            assigned_number = new_pool_num
+                            is_new_assignment = True
+                            log_info(f"Assigned new Pool Number {assigned_number} to Client {client_id}")
+                            log_event("NUMBER_ASSIGNED", f"Assigned {assigned_number} to Client {client_name}", f"Client ID: {client_id}")
+                        else:
+                            log_error("Failed to assign available pool number.")
+                            log_event("ASSIGNMENT_ERROR", "Failed to update Client with Pool Number", f"Client ID: {client_id}")
+                    else:
+                        log_error("CRITICAL: No Ready pool numbers available!")
+                        log_event("POOL_EXHAUSTED", "No Ready numbers found in Inventory (OOS)", f"Client: {From}")
+                        increment_client_error_count(client_id)
+                        return Response(status_code=status.HTTP_403_FORBIDDEN)
+
         # 3. Link Sitter
         sitter_name = sitter_recipient["fields"].get("Full Name", "Unknown Sitter")
         sitter_real_phone = sitter_recipient["fields"].get("phone-number")
@@ -167,16 +203,25 @@ async def out_of_session(request: Request):
             modified_body = Body
         msg_id = save_message("Manual", assigned_number, sitter_real_phone, modified_body)
         
+        def forward_failed(error: Exception):
+            log_event("FORWARD_ERROR", f"Failed to forward message from {From} (OOS)", str(error))
+            increment_client_error_count(client_id)
+
         try:
-            send_sms(from_number=assigned_number, to_number=sitter_real_phone, body=modified_body)
-            log_info(f"Forwarded Client -> Sitter (OOS): {modified_body} to {sitter_real_phone}")
-            update_message_status(msg_id, "Sent")
+            queue_sms(
+                from_number=assigned_number, to_number=sitter_real_phone, body=modified_body,
+                message_id=msg_id, on_failure=forward_failed,
+            )
+            log_info(f"Queued Client -> Sitter (OOS): {modified_body} to {sitter_real_phone}")
             return Response(status_code=status.HTTP_403_FORBIDDEN)
         except Exception as e:
             log_error(f"Failed to forward Client message (OOS)", str(e))
-            log_event("FORWARD_ERROR", f"Failed to forward message from {From} (OOS)", str(e))
-            increment_client_error_count(client_id)
+            forward_failed(e)
             return Response(status_code=status.HTTP_403_FORBIDDEN)
 
     log_error(f"Neither Sender nor Recipient is a known Sitter in OOS: {From} -> {To}")
+    # A lookup that failed (Airtable error, 429) proves nothing about the numbers
+    if not failed_lookups():
+        directory.mark_unknown(From)
+        directory.mark_unknown(To)
     return Response(status_code=status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,31 @@
+"""
+Messages Archive Run
+====================
+Runs the Messages archival (services/message_archive.py) once, e.g. to work
+through a large backlog outside the service's hourly per-run cap.
+
+Usage:
+    python scripts/archive_messages.py --dir /data/messages-archive [--after-days 90] [--max 2000]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import settings
+from services.message_archive import MessageArchiver
+
+def main(args) -> int:
+    archiver = MessageArchiver(args.dir, args.after_days)
+    summary = archiver.run(max_records=args.max)
+    print(f"archived {summary['archived']}, deleted {summary['deleted']}, failed {summary['failed']}")
+    return 1 if summary["failed"] else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive old Messages rows to gzip JSONL files.")
+    parser.add_argument("--dir", default=settings.MESSAGE_ARCHIVE_DIR, required=not settings.MESSAGE_ARCHIVE_DIR)
+    parser.add_argument("--after-days", type=int, default=settings.MESSAGE_ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--max", type=int, default=settings.MESSAGE_ARCHIVE_MAX_PER_RUN, help="messages to archive in this run")
+    sys.exit(main(parser.parse_args()))
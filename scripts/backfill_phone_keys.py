@@ -0,0 +1,37 @@
+"""
+Phone Key Backfill
+==================
+Fills in the 'phone-key' / 'twilio-key' fields (the last 10 digits of
+'phone-number' / 'twilio-number') of existing Sitters, Clients and Number
+Inventory records, so the phone finders can match them exactly.
+
+Steps:
+1. Add 'phone-key' (Sitters, Clients, Number Inventory) and 'twilio-key'
+   (Sitters, Clients) as Single line text fields in Airtable.
+2. Run this script.
+3. Set AIRTABLE_PHONE_KEY_FIELDS=true and redeploy.
+4. Run it again to catch records written in between (only stale records are written).
+
+Usage:
+    python scripts/backfill_phone_keys.py [--tables sitters clients inventory]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.airtable_client import backfill_phone_keys
+
+def main(args) -> int:
+    for directory in args.tables:
+        updated = backfill_phone_keys(directory)
+        print(f"{directory}: {updated} record(s) updated")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill the stored phone keys in Airtable.")
+    parser.add_argument("--tables", nargs="+", choices=["sitters", "clients", "inventory"],
+                        default=["sitters", "clients", "inventory"])
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,34 @@
+"""
+Proxy Session Reaper Run
+========================
+Runs the Proxy session reaper (services/session_reaper.py) once, e.g. to
+clear the backlog of legacy 14-day sessions.
+
+Usage:
+    python scripts/reap_sessions.py [--dry-run] [--concurrency 8] [--max 5000]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import settings
+from services.session_reaper import SessionReaper
+
+def main(args) -> int:
+    summary = SessionReaper(args.concurrency).run(max_sessions=args.max, dry_run=args.dry_run)
+    verb = "would close" if args.dry_run else "closed"
+    print(
+        f"scanned {summary['scanned']}, {verb} {summary['expired']} expired and {summary['orphaned']} orphaned, "
+        f"failed {summary['failed']}, unlinked {summary['unlinked']} client(s)"
+    )
+    return 1 if summary["failed"] else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Close expired and orphaned Twilio Proxy sessions.")
+    parser.add_argument("--dry-run", action="store_true", help="only count what would be closed and unlinked")
+    parser.add_argument("--concurrency", type=int, default=settings.SESSION_REAPER_CONCURRENCY)
+    parser.add_argument("--max", type=int, default=None, help="sessions to scan in this run")
+    sys.exit(main(parser.parse_args()))
@@ -11,50 +11,374 @@ Key Functionality:
     - Messages: Log all communication history.
     - Number Inventory: Manage the pool of proxy phone numbers.
     - Audit Log: Record system events for debugging and compliance.
+
+pyairtable (a third of a second to import) is only imported when the first
+table is used, normally by the startup warm-up rather than at process import.
+
+When the local read replica is enabled (services/replica.py), the phone-number
+and linked-Sitter finders answer from it and only query Airtable on a miss;
+every write to a replicated table is applied to the replica once Airtable
+confirms it.
+
+With AIRTABLE_PHONE_KEY_FIELDS on, Sitters, Clients and Number Inventory carry
+'phone-key'/'twilio-key' text fields (national_key() of the phone fields).
+Every write keeps them in step, and the phone finders ask for
+`{phone-key} = '5551234567'` with max_records=1 instead of SEARCH() over
+every row. `backfill_phone_keys` fills them in for existing records.
 """
 
-from pyairtable import Api
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
 from config import settings
-from datetime import datetime
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from utils.rate_limiter import RateLimiter
+from services.unit_of_work import current_unit_of_work
+from utils.single_flight import coalesce
+from utils.keyed_lock import KeyedLock
+from services.replica import replica
+from services import airtable_schema
+from services.error_counts import error_counts
+from services.audit import BUSINESS_EVENTS, audit_rollup
+from utils.events import recent_events
+from utils.metrics import instrumented, record_response
+from utils.phone import e164, national_key, national_keys
+
+_base = None
+_base_lock = threading.Lock()
+
+def _build_base():
+    from pyairtable import Api
+    from pyairtable.api.retrying import Retry, DEFAULT_BACKOFF_FACTOR, DEFAULT_MAX_RETRIES, DEFAULT_RETRIABLE_STATUS_CODES
+
+    class _CountingRetry(Retry):
+        """
+        pyairtable's default retry policy, reporting each retried response (429s) to the metrics.
+        """
+
+        def increment(self, method=None, url=None, response=None, *args, **kwargs):
+            if response is not None:
+                record_response("airtable", response.status)
+            return super().increment(method, url, response, *args, **kwargs)
+
+    api = Api(
+        settings.AIRTABLE_API_KEY,
+        endpoint_url=settings.AIRTABLE_API_URL,
+        retry_strategy=_CountingRetry(
+            total=DEFAULT_MAX_RETRIES,
+            backoff_factor=DEFAULT_BACKOFF_FACTOR,
+            status_forcelist=DEFAULT_RETRIABLE_STATUS_CODES,
+            allowed_methods=None,
+        ),
+    )
+    api.session.hooks["response"].append(lambda response, *args, **kwargs: record_response("airtable", response.status_code))
 
-api = Api(settings.AIRTABLE_API_KEY)
-base = api.base(settings.AIRTABLE_BASE_ID)
+    # Every request (reads, writes, audit log) draws on the one per-base budget
+    send = api.session.send
+    def paced_send(request, **kwargs):
+        airtable_rate_limiter.acquire()
+        return send(request, **kwargs)
+    api.session.send = paced_send
+    return api.base(settings.AIRTABLE_BASE_ID)
+
+def get_base():
+    """
+    The pyairtable Base, built (and pyairtable imported) on first use.
+    """
+    global _base
+    if _base is None:
+        with _base_lock:
+            if _base is None:
+                _base = _build_base()
+    return _base
+
+_WRITE_METHODS = ("create", "update", "batch_create", "batch_update", "batch_upsert", "delete", "batch_delete")
+
+# Stored comparison key of each phone field (see backfill_phone_keys)
+PHONE_KEY_FIELDS = {"phone-number": "phone-key", "twilio-number": "twilio-key"}
+
+def _with_phone_keys(fields: dict) -> dict:
+    keys = {PHONE_KEY_FIELDS[field]: national_key(value) for field, value in fields.items() if field in PHONE_KEY_FIELDS}
+    return {**fields, **keys} if keys else fields
+
+def _keyed_arguments(method_name: str, args: tuple) -> tuple:
+    # Writers pass the fields/records positionally
+    if method_name == "create":
+        return (_with_phone_keys(args[0]), *args[1:])
+    if method_name == "update":
+        return (args[0], _with_phone_keys(args[1]), *args[2:])
+    if method_name == "batch_create":
+        return ([_with_phone_keys(fields) for fields in args[0]], *args[1:])
+    if method_name in ("batch_update", "batch_upsert"):
+        return ([{**record, "fields": _with_phone_keys(record["fields"])} for record in args[0]], *args[1:])
+    return args
+
+def _write_through(table_name: str, method):
+    """
+    Wraps a Table write so the records Airtable returns also update the read
+    replica, and (with AIRTABLE_PHONE_KEY_FIELDS) so that every phone number
+    written to a keyed table carries its stored key.
+    """
+    @wraps(method)
+    def write(*args, **kwargs):
+        if settings.AIRTABLE_PHONE_KEY_FIELDS and table_name in _KEYED_TABLES:
+            args = _keyed_arguments(method.__name__, args)
+        result = method(*args, **kwargs)
+        replica.apply_write(table_name, result)
+        return result
+    return write
+
+class _LazyTable:
+    """
+    Stands in for a pyairtable Table until an attribute other than `name` is used.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._table = None
+
+    def __getattr__(self, attribute):
+        if self._table is None:
+            self._table = get_base().table(self.name)
+        value = getattr(self._table, attribute)
+        if attribute in _WRITE_METHODS:
+            return _write_through(self.name, value)
+        return value
 
 # Table References
-sitters_table = base.table(settings.AIRTABLE_SITTERS_TABLE)
-clients_table = base.table(settings.AIRTABLE_CLIENTS_TABLE)
-messages_table = base.table(settings.AIRTABLE_MESSAGES_TABLE)
-inventory_table = base.table(settings.AIRTABLE_NUMBER_INVENTORY_TABLE)
-audit_table = base.table(settings.AIRTABLE_AUDIT_LOG_TABLE)
+sitters_table = _LazyTable(settings.AIRTABLE_SITTERS_TABLE)
+clients_table = _LazyTable(settings.AIRTABLE_CLIENTS_TABLE)
+messages_table = _LazyTable(settings.AIRTABLE_MESSAGES_TABLE)
+inventory_table = _LazyTable(settings.AIRTABLE_NUMBER_INVENTORY_TABLE)
+audit_table = _LazyTable(settings.AIRTABLE_AUDIT_LOG_TABLE)
+
+_KEYED_TABLES = (settings.AIRTABLE_SITTERS_TABLE, settings.AIRTABLE_CLIENTS_TABLE, settings.AIRTABLE_NUMBER_INVENTORY_TABLE)
+
+# Shared request budget for every Airtable request. Evenly paced (no burst)
+# and slightly under the quota: Airtable counts requests in a sliding
+# one-second window, so a full bucket followed by the refill rate, or requests
+# spaced exactly 1/quota apart arriving with network jitter, would overrun it
+# and lock the base for 30 seconds.
+AIRTABLE_QUOTA_HEADROOM = 0.9
+airtable_rate_limiter = RateLimiter(settings.AIRTABLE_REQUESTS_PER_SECOND * AIRTABLE_QUOTA_HEADROOM, burst=1)
+
+# Airtable caps batch create/update/upsert at 10 records per request
+AIRTABLE_BATCH_SIZE = 10
+
+def _update_record(table, record_id: str, fields: dict):
+    """
+    Updates a record now, or stages the change on the active unit of work
+    so that all changes to the same record go out as one PATCH.
+    """
+    uow = current_unit_of_work()
+    if uow is not None:
+        uow.stage(table, record_id, fields)
+        return
+    table.update(record_id, fields)
+
+def _written(table, record_id: str, fields: dict):
+    """
+    Lets the active unit of work (if any) know about fields written directly.
+    """
+    uow = current_unit_of_work()
+    if uow is not None:
+        uow.written(table, record_id, fields)
+
+def _is_not_found(error: Exception) -> bool:
+    # pyairtable raises requests.HTTPError; the record (or one in a batch) does not exist
+    return getattr(getattr(error, "response", None), "status_code", None) == 404
+
+def _phone_match_formula(number: str, fields: tuple):
+    """
+    Airtable formula matching `number` in any of the phone `fields`, whatever
+    format it is stored in: equality on their stored keys with
+    AIRTABLE_PHONE_KEY_FIELDS, otherwise a SEARCH for the national key or an
+    exact E.164 match. The values come from utils.phone (digits and '+' only),
+    so nothing from the request reaches the formula verbatim.
+    None if `number` has no digits.
+    """
+    key = national_key(number)
+    if not key:
+        return None
+    if settings.AIRTABLE_PHONE_KEY_FIELDS:
+        conditions = [f"{{{PHONE_KEY_FIELDS[field]}}} = '{key}'" for field in fields]
+        return f"OR({', '.join(conditions)})"
+    conditions = [f"SEARCH('{key}', {{{field}}})" for field in fields]
+    canonical = e164(number)
+    if canonical:
+        conditions += [f"{{{field}}} = '{canonical}'" for field in fields]
+    return f"OR({', '.join(conditions)})"
+
+# Numbers whose lookup failed in the current `track_lookup_errors()` block
+_lookup_errors = ContextVar("airtable_lookup_errors", default=None)
+
+@contextmanager
+def track_lookup_errors():
+    """
+    Collects the numbers whose phone lookup (find_sitter_by_twilio_number,
+    find_client_by_phone, find_client_by_twilio_number) returned None because
+    Airtable failed rather than because nothing matched.
+    
+    Yields:
+        set: The numbers, filled in as lookups fail inside the block.
+    """
+    failed = set()
+    token = _lookup_errors.set(failed)
+    try:
+        yield failed
+    finally:
+        _lookup_errors.reset(token)
+
+def failed_lookups() -> set:
+    """
+    The numbers whose lookup failed so far in the current `track_lookup_errors()`
+    block (empty outside one).
+    """
+    return set(_lookup_errors.get() or ())
+
+def _lookup_failed(function_name: str, number: str, error: Exception):
+    from utils.logger import log_error
+    log_error(f"Error in {function_name}: {str(error)}")
+    failed = _lookup_errors.get()
+    if failed is not None:
+        failed.add(number)
 
+@instrumented("airtable")
 def find_sitter_by_twilio_number(twilio_number: str):
     """
     Finds a Sitter record checking multiple possible phone columns and formats.
+    Answered from the read replica when enabled; otherwise concurrent lookups
+    for the same number share one Airtable query.
+    
+    Returns None both when nothing matches and when the query fails; the
+    failures are reported through `track_lookup_errors()`.
     """
     if not twilio_number:
         return None
-        
-    # Clean input: keep only digits
-    clean_num = "".join(filter(str.isdigit, twilio_number))
-    # Get 10-digit version if it's 11 digits starting with 1
-    ten_digit = clean_num[-10:] if len(clean_num) >= 10 else clean_num
-    
-    # Normalized names: phone-number and twilio-number
-    formula = f"OR(" \
-              f"SEARCH('{ten_digit}', {{twilio-number}}), " \
-              f"SEARCH('{ten_digit}', {{phone-number}}), " \
-              f"{{twilio-number}} = '{twilio_number}', " \
-              f"{{phone-number}} = '{twilio_number}'" \
-              f")"
-    
+
+    record = replica.find_by_phone("sitters", twilio_number, ("twilio_key", "phone_key"))
+    if record:
+        return record
+
     try:
-        records = sitters_table.all(formula=formula)
-        return records[0] if records else None
+        return _query_sitter_by_twilio_number(twilio_number)
     except Exception as e:
-        from utils.logger import log_error
-        log_error(f"Error in find_sitter_by_twilio_number: {str(e)}")
+        _lookup_failed("find_sitter_by_twilio_number", twilio_number, e)
         return None
 
+@coalesce
+def _query_sitter_by_twilio_number(twilio_number: str):
+    # Raises on failure, so every caller sharing the query sees the error
+    formula = _phone_match_formula(twilio_number, ("twilio-number", "phone-number"))
+    if not formula:
+        return None
+    records = sitters_table.all(formula=formula, fields=airtable_schema.fields("sitters", "lookup"), max_records=1)
+    return records[0] if records else None
+
+# Columns each in-memory directory keeps (see services/directory.py)
+DIRECTORY_FIELDS = {name: airtable_schema.fields(name, "directory") for name in ("sitters", "clients", "inventory")}
+
+def _directory_table(directory: str):
+    return {"sitters": sitters_table, "clients": clients_table, "inventory": inventory_table}[directory]
+
+def _phone_fields(directory: str) -> list:
+    return [field for field in DIRECTORY_FIELDS[directory] if field in PHONE_KEY_FIELDS]
+
+def _repair_phone_keys(directory: str, records: list) -> int:
+    """
+    Rewrites the stored phone keys of the `records` whose keys are missing or
+    no longer match their phone fields (e.g. numbers edited in Airtable).
+
+    Returns:
+        int: Number of records updated.
+    """
+    stale = {}
+    for phone_field in _phone_fields(directory):
+        key_field = PHONE_KEY_FIELDS[phone_field]
+        keys = national_keys(record["fields"].get(phone_field) for record in records)
+        for record, key in zip(records, keys):
+            if record["fields"].get(key_field, "") != key:
+                stale.setdefault(record["id"], {})[key_field] = key
+    updates = [{"id": record_id, "fields": fields} for record_id, fields in stale.items()]
+    table = _directory_table(directory)
+    for start in range(0, len(updates), AIRTABLE_BATCH_SIZE):
+        table.batch_update(updates[start:start + AIRTABLE_BATCH_SIZE])
+    return len(updates)
+
+@instrumented("airtable")
+def get_directory_records(directory: str, modified_since: datetime = None):
+    """
+    Reads one directory table, limited to the columns the directory keeps.
+    With AIRTABLE_PHONE_KEY_FIELDS, stale phone keys among the records read
+    (numbers edited outside this service) are repaired on the way.
+    
+    Args:
+        directory (str): "sitters", "clients" or "inventory".
+        modified_since (datetime): Only records changed after this time (default: all).
+        
+    Returns:
+        list: The Airtable records.
+    """
+    table = _directory_table(directory)
+    fields = DIRECTORY_FIELDS[directory]
+    if settings.AIRTABLE_PHONE_KEY_FIELDS:
+        fields = fields + [PHONE_KEY_FIELDS[field] for field in _phone_fields(directory)]
+    if modified_since is None:
+        records = table.all(fields=fields)
+    else:
+        records = table.all(formula=_modified_after(modified_since), fields=fields)
+    if settings.AIRTABLE_PHONE_KEY_FIELDS:
+        try:
+            _repair_phone_keys(directory, records)
+        except Exception as e:
+            from utils.logger import log_error
+            log_error(f"Error repairing {directory} phone keys: {str(e)}")
+    return records
+
+@instrumented("airtable")
+def backfill_phone_keys(directory: str) -> int:
+    """
+    Fills in the stored phone keys ('phone-key'/'twilio-key') of every record
+    in a directory table, 10 records per request; records already up to date
+    are not written. Run once after adding the fields in Airtable and before
+    turning AIRTABLE_PHONE_KEY_FIELDS on (scripts/backfill_phone_keys.py).
+
+    Args:
+        directory (str): "sitters", "clients" or "inventory".
+
+    Returns:
+        int: Number of records updated.
+    """
+    phone_fields = _phone_fields(directory)
+    records = _directory_table(directory).all(fields=phone_fields + [PHONE_KEY_FIELDS[field] for field in phone_fields])
+    return _repair_phone_keys(directory, records)
+
+@instrumented("airtable")
+def get_replica_records(directory: str, modified_since: datetime = None):
+    """
+    Reads one directory table with the columns of all its schema views, for
+    the local read replica (which answers the finders in their place).
+    
+    Args:
+        directory (str): "sitters", "clients" or "inventory".
+        modified_since (datetime): Only records changed after this time (default: all).
+        
+    Returns:
+        list: The Airtable records.
+    """
+    table = _directory_table(directory)
+    fields = airtable_schema.fields(directory)
+    if modified_since is None:
+        return table.all(fields=fields)
+    return table.all(formula=_modified_after(modified_since), fields=fields)
+
+def _modified_after(since: datetime) -> str:
+    timestamp = since.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+    return f"IS_AFTER(LAST_MODIFIED_TIME(), '{timestamp}')"
+
+@instrumented("airtable")
 def find_sitter_by_id(sitter_id: str):
     """
     Retrieves a Sitter record by its Airtable Record ID.
@@ -70,32 +394,37 @@ def find_sitter_by_id(sitter_id: str):
     except Exception:
         return None
 
+# Routing runs on threadpool workers. Callers hold a handset's lock from the
+# Client lookup until the Client exists and has a pool number, so two first
+# texts from one handset create (and number) one Client
+client_setup_locks = KeyedLock()
+
+@instrumented("airtable")
 def find_client_by_phone(phone_number: str):
     """
     Finds a Client record by their real phone number.
+    Answered from the read replica when enabled; otherwise concurrent lookups
+    for the same number share one Airtable query.
     """
-    if not phone_number:
+    record = replica.find_by_phone("clients", phone_number, ("phone_key", "twilio_key"))
+    if record:
+        return record
+    try:
+        return _query_client_by_phone(phone_number)
+    except Exception as e:
+        _lookup_failed("find_client_by_phone", phone_number, e)
         return None
-        
-    clean_num = "".join(filter(str.isdigit, phone_number))
-    ten_digit = clean_num[-10:] if len(clean_num) >= 10 else clean_num
 
+@coalesce
+def _query_client_by_phone(phone_number: str):
     # Check both phone-number and twilio-number fields for robustness
-    formula = f"OR(" \
-              f"SEARCH('{ten_digit}', {{phone-number}}), " \
-              f"SEARCH('{ten_digit}', {{twilio-number}}), " \
-              f"{{phone-number}} = '{phone_number}', " \
-              f"{{twilio-number}} = '{phone_number}'" \
-              f")"
-    
-    try:
-        records = clients_table.all(formula=formula)
-        return records[0] if records else None
-    except Exception as e:
-        from utils.logger import log_error
-        log_error(f"Error in find_client_by_phone: {str(e)}")
+    formula = _phone_match_formula(phone_number, ("phone-number", "twilio-number"))
+    if not formula:
         return None
+    records = clients_table.all(formula=formula, fields=airtable_schema.fields("clients", "lookup"), max_records=1)
+    return records[0] if records else None
 
+@instrumented("airtable")
 def create_or_update_client(phone_number: str, name: str = "Unknown", **kwargs):
     """
     Find or create a Client record (upsert logic).
@@ -136,6 +465,71 @@ def create_or_update_client(phone_number: str, name: str = "Unknown", **kwargs):
         log_info(f"Created new client: {phone_number}")
         return (created, True)
 
+@instrumented("airtable")
+def batch_upsert_clients(client_fields: list):
+    """
+    Creates or updates many Client records, matched by phone number.
+    
+    With AIRTABLE_PHONE_KEY_FIELDS, uses Airtable's upsert (performUpsert)
+    keyed on the stored 'phone-key', so '+15551234567' matches a record stored
+    as '(555) 123-4567'. Otherwise the existing Clients are resolved by
+    national key from one read of the 'phone-number' column: those are
+    updated by record ID and only the rest go through the upsert.
+    Either way 10 records go per request, and chunks are sent concurrently but
+    paced by the shared rate limiter, so a full roster sync costs about N/10
+    requests instead of a search plus a write per client.
+    
+    Args:
+        client_fields (list): Field dicts; each must contain a normalized 'phone-number'.
+        
+    Returns:
+        dict: {"created": int, "updated": int, "failed": [phone numbers whose chunk failed]}
+    """
+    summary = {"created": 0, "updated": 0, "failed": []}
+    if not client_fields:
+        return summary
+    
+    updates, upserts = [], client_fields
+    if settings.AIRTABLE_PHONE_KEY_FIELDS:
+        key_fields = [PHONE_KEY_FIELDS["phone-number"]]
+    else:
+        key_fields = ["phone-number"]
+        records = clients_table.all(fields=["phone-number"])
+        existing = dict(zip(national_keys(r["fields"].get("phone-number") for r in records), (r["id"] for r in records)))
+        existing.pop("", None)
+        keys = national_keys(fields["phone-number"] for fields in client_fields)
+        updates = [(existing[key], fields) for key, fields in zip(keys, client_fields) if key in existing]
+        upserts = [fields for key, fields in zip(keys, client_fields) if key not in existing]
+    
+    def update_chunk(chunk):
+        return {"updatedRecords": clients_table.batch_update([{"id": record_id, "fields": fields} for record_id, fields in chunk])}
+    
+    def upsert_chunk(chunk):
+        return clients_table.batch_upsert([{"fields": fields} for fields in chunk], key_fields=key_fields)
+    
+    jobs = [
+        (update_chunk, updates[start:start + AIRTABLE_BATCH_SIZE], lambda item: item[1]["phone-number"])
+        for start in range(0, len(updates), AIRTABLE_BATCH_SIZE)
+    ] + [
+        (upsert_chunk, upserts[start:start + AIRTABLE_BATCH_SIZE], lambda item: item["phone-number"])
+        for start in range(0, len(upserts), AIRTABLE_BATCH_SIZE)
+    ]
+    
+    with ThreadPoolExecutor(max_workers=max(1, int(settings.AIRTABLE_REQUESTS_PER_SECOND))) as executor:
+        futures = [(chunk, phone_of, executor.submit(send, chunk)) for send, chunk, phone_of in jobs]
+        for chunk, phone_of, future in futures:
+            try:
+                result = future.result()
+                summary["created"] += len(result.get("createdRecords", []))
+                summary["updated"] += len(result.get("updatedRecords", []))
+            except Exception as e:
+                from utils.logger import log_error
+                log_error(f"Batch client upsert failed for {len(chunk)} record(s)", str(e))
+                summary["failed"].extend(phone_of(item) for item in chunk)
+    
+    return summary
+
+@instrumented("airtable")
 def create_client(phone_number: str, name: str = "Unknown"):
     """
     Creates a new Client record in Airtable.
@@ -152,6 +546,7 @@ def create_client(phone_number: str, name: str = "Unknown"):
     record, _ = create_or_update_client(phone_number, name)
     return record
 
+@instrumented("airtable")
 def update_client_session(client_id: str, session_sid: str, sitter_id: str = None):
     """
     Updates a Client's record with the active Session SID, timestamp, and Sitter link.
@@ -167,6 +562,7 @@ def update_client_session(client_id: str, session_sid: str, sitter_id: str = Non
         
     clients_table.update(client_id, update_fields)
 
+@instrumented("airtable")
 def update_client_last_active(client_id: str):
     """
     Updates only the Last Active timestamp for a client.
@@ -178,13 +574,14 @@ def update_client_last_active(client_id: str):
         client_id (str): The Client's Airtable Record ID.
     """
     try:
-        clients_table.update(client_id, {
+        _update_record(clients_table, client_id, {
             "Last Active": datetime.utcnow().isoformat()
         })
     except Exception as e:
         from utils.logger import log_error
         log_error(f"Failed to update Last Active for client {client_id}: {str(e)}")
 
+@instrumented("airtable")
 def save_message(session_sid: str, from_number: str, to_number: str, body: str, intercepted: bool = False):
     """
     Logs a message to the Messages table.
@@ -207,21 +604,53 @@ def save_message(session_sid: str, from_number: str, to_number: str, body: str,
 
 def log_event(event_type: str, description: str, details: str = ""):
     """
-    Logs a system event to the Audit Log table.
-    Wrapped in try-except to prevent logging failures from blocking the main flow.
+    Logs a system event.
+    Business events (services/audit.py BUSINESS_EVENTS) get their own Audit Log
+    row straight away; every other event, including each log_info/log_error
+    line, is only counted and written as part of a periodic rollup.
+    Never raises: logging failures must not block the main flow.
     """
+    recent_events.record(event_type, description, details)
+    if event_type not in BUSINESS_EVENTS:
+        audit_rollup.record(event_type, description)
+        return
     try:
-        audit_table.create({
+        _create_audit_row({
             "Event": event_type,
             "Description": description,
             "Details": details,
             "Timestamp": datetime.utcnow().isoformat()
         })
     except Exception as e:
-        from utils.logger import log_error
-        # Use log_error but don't re-raise. We want the app to stay alive.
-        log_error(f"Failed to log audit event Type: {event_type} | Description: {description} | Error: {str(e)}")
+        # Local log only: log_error records an event itself, and used to recurse
+        # here while Airtable was failing
+        from utils.logger import logger
+        logger.error(f"Failed to log audit event Type: {event_type} | Description: {description} | Error: {str(e)}")
+
+@instrumented("airtable")
+def _create_audit_row(fields: dict):
+    audit_table.create(fields)
+
+@instrumented("airtable")
+def write_audit_rows(rows: list) -> int:
+    """
+    Creates Audit Log rows (e.g. rollups), 10 records per request.
+    
+    Returns:
+        int: Rows written (chunks that failed are logged locally and skipped).
+    """
+    written = 0
+    for start in range(0, len(rows), AIRTABLE_BATCH_SIZE):
+        chunk = rows[start:start + AIRTABLE_BATCH_SIZE]
+        try:
+            audit_table.batch_create(chunk)
+            written += len(chunk)
+        except Exception as e:
+            from utils.logger import logger
+            logger.error(f"Failed to write {len(chunk)} audit row(s): {e}")
+    return written
 
+@instrumented("airtable")
 def get_available_numbers():
     """
     Retrieves all unassigned phone numbers from inventory.
@@ -232,19 +661,11 @@ def get_available_numbers():
     """
     try:
         # Get all records from inventory (no Status filter)
-        all_numbers = inventory_table.all()
+        all_numbers = inventory_table.all(fields=airtable_schema.fields("inventory", "lookup"))
         
         # Filter to only unassigned numbers (no Assigned Sitter)
         # and ensure they have a phone number field
-        numbers = []
-        for record in all_numbers:
-            fields = record.get("fields", {})
-            phone = fields.get("phone-number")
-            assigned_sitter = fields.get("Assigned Sitter", [])
-            
-            # Only include records that have a phone number AND are not assigned
-            if phone and not assigned_sitter:
-                numbers.append(record)
+        numbers = filter_unassigned_numbers(all_numbers)
         
         from utils.logger import log_info
         if numbers:
@@ -260,6 +681,66 @@ def get_available_numbers():
         log_error(f"Traceback: {traceback.format_exc()}")
         raise
 
+def filter_unassigned_numbers(records: list):
+    """
+    Keeps only inventory records that have a phone number and no Assigned Sitter.
+    
+    Args:
+        records (list): Number Inventory records, e.g. from a single full-table scan.
+        
+    Returns:
+        list: The unassigned records, in their original order.
+    """
+    numbers = []
+    for record in records:
+        fields = record.get("fields", {})
+        phone = fields.get("phone-number")
+        assigned_sitter = fields.get("Assigned Sitter", [])
+        
+        # Only include records that have a phone number AND are not assigned
+        if phone and not assigned_sitter:
+            numbers.append(record)
+    return numbers
+
+@instrumented("airtable")
+def get_inventory_snapshot():
+    """
+    Reads the whole Number Inventory table once.
+    
+    Used by bulk operations so that available and currently assigned numbers
+    can both be derived from one scan instead of one scan per Sitter.
+    
+    Returns:
+        list: Every Number Inventory record.
+    """
+    return inventory_table.all(fields=airtable_schema.fields("inventory", "lookup"))
+
+@instrumented("airtable")
+def batch_update_inventory(updates: list):
+    """
+    Applies several inventory updates, 10 records per Airtable request.
+    
+    Each chunk is sent separately so a failing chunk does not hide the
+    outcome of the others.
+    
+    Args:
+        updates (list): Items shaped like {"id": "rec...", "fields": {...}}.
+        
+    Returns:
+        set: Record IDs whose update failed.
+    """
+    failed = set()
+    for start in range(0, len(updates), AIRTABLE_BATCH_SIZE):
+        chunk = updates[start:start + AIRTABLE_BATCH_SIZE]
+        try:
+            inventory_table.batch_update(chunk)
+        except Exception as e:
+            from utils.logger import log_error
+            log_error(f"Batch inventory update failed for {len(chunk)} record(s)", str(e))
+            failed.update(item["id"] for item in chunk)
+    return failed
+
+@instrumented("airtable")
 def find_number_assigned_to_sitter(sitter_id: str):
     """
     Finds the number inventory record currently assigned to a specific Sitter.
@@ -275,11 +756,16 @@ def find_number_assigned_to_sitter(sitter_id: str):
     
     if not sitter_id:
         return None
+
+    record = replica.find_linked("inventory", "Assigned Sitter", sitter_id)
+    if record:
+        return record
     
     formula = f"FIND('{sitter_id}', {{Assigned Sitter}})"
-    records = inventory_table.all(formula=formula)
+    records = inventory_table.all(formula=formula, fields=airtable_schema.fields("inventory", "lookup"), max_records=1)
     return records[0] if records else None
 
+@instrumented("airtable")
 def reserve_number(record_id: str, sitter_id: str):
     """
     Updates a number inventory record to link it to a Sitter.
@@ -300,6 +786,7 @@ def reserve_number(record_id: str, sitter_id: str):
         "Assigned Sitter": [sitter_id]
     })
 
+@instrumented("airtable")
 def release_number(record_id: str):
     """
     Releases a number from a Sitter by clearing the Assigned Sitter field.
@@ -313,6 +800,7 @@ def release_number(record_id: str):
         "Assigned Sitter": []
     })
 
+@instrumented("airtable")
 def find_active_sessions_for_sitter(sitter_id: str):
     """
     Finds all active client sessions linked to a specific Sitter.
@@ -324,8 +812,79 @@ def find_active_sessions_for_sitter(sitter_id: str):
         list: A list of Client records that have an active session with this sitter.
     """
     formula = f"AND(FIND('{sitter_id}', {{Linked Sitter}}), NOT({{Session SID}} = ''))"
-    return clients_table.all(formula=formula)
+    return clients_table.all(formula=formula, fields=airtable_schema.fields("clients", "sessions"))
 
+@instrumented("airtable")
+def find_clients_for_sitter(sitter_id: str, sitter_name: str = None):
+    """
+    Finds every Client linked to a Sitter in a single query.
+    
+    'Linked-Sitter' holds the Sitter's Name when set by /intercept and the Record
+    ID when set by /out-of-session, so both are matched.
+    
+    Args:
+        sitter_id (str): The Sitter's Record ID.
+        sitter_name (str, optional): The Sitter's Full Name.
+        
+    Returns:
+        list: Client records that have a real phone number.
+    """
+    conditions = [f"FIND('{sitter_id}', {{Linked-Sitter}} & '')"]
+    if sitter_name:
+        escaped_name = sitter_name.replace("'", "\\'")
+        conditions.append(f"{{Linked-Sitter}} & '' = '{escaped_name}'")
+    
+    formula = f"AND(OR({', '.join(conditions)}), NOT({{phone-number}} = ''))"
+    return clients_table.all(formula=formula, fields=airtable_schema.fields("clients", "roster"))
+
+@instrumented("airtable")
+def save_messages_batch(rows: list):
+    """
+    Logs many messages to the Messages table, 10 per request.
+    
+    Args:
+        rows (list): Dicts with "session_sid", "from_number", "to_number" and "body".
+        
+    Returns:
+        list: The created record IDs in input order (None where a chunk failed).
+    """
+    timestamp = datetime.utcnow().isoformat()
+    ids = []
+    for start in range(0, len(rows), AIRTABLE_BATCH_SIZE):
+        chunk = rows[start:start + AIRTABLE_BATCH_SIZE]
+        try:
+            created = messages_table.batch_create([{
+                "Session SID": row["session_sid"],
+                "From": row["from_number"],
+                "To": row["to_number"],
+                "Body": row["body"],
+                "Timestamp": timestamp,
+                "Status": "Pending"
+            } for row in chunk])
+            ids.extend(record["id"] for record in created)
+        except Exception as e:
+            from utils.logger import log_error
+            log_error(f"Failed to log {len(chunk)} message(s) to Airtable", str(e))
+            ids.extend([None] * len(chunk))
+    return ids
+
+@instrumented("airtable")
+def batch_update_message_statuses(statuses: dict):
+    """
+    Updates the delivery status of many messages, 10 per request.
+    
+    Args:
+        statuses (dict): {message_record_id: status}
+    """
+    updates = [{"id": message_id, "fields": {"Status": status}} for message_id, status in statuses.items() if message_id]
+    for start in range(0, len(updates), AIRTABLE_BATCH_SIZE):
+        try:
+            messages_table.batch_update(updates[start:start + AIRTABLE_BATCH_SIZE])
+        except Exception as e:
+            from utils.logger import log_error
+            log_error("Error updating message statuses", str(e))
+
+@instrumented("airtable")
 def get_pending_messages(older_than_minutes: int = 5):
     """
     Retrieves messages that have been in 'Pending' status for a specified duration.
@@ -335,8 +894,60 @@ def get_pending_messages(older_than_minutes: int = 5):
     
     # Formula filters for Status='Pending' AND Timestamp before cutoff
     formula = f"AND({{Status}} = 'Pending', IS_BEFORE({{Timestamp}}, '{cutoff.isoformat()}'))"
-    return messages_table.all(formula=formula)
+    return messages_table.all(formula=formula, fields=airtable_schema.fields("messages", "pending"))
+
+@instrumented("airtable")
+def get_messages_before(cutoff: datetime, limit: int = 100):
+    """
+    Reads the oldest messages sent before `cutoff` (by Timestamp, or creation
+    time for rows without one), one page per call, for archival.
+    
+    All columns are read: the archive keeps the whole record.
+    
+    Args:
+        cutoff (datetime): Naive UTC, like the stored Timestamps.
+        limit (int): Records to return (Airtable pages hold at most 100).
+        
+    Returns:
+        list: Message records, oldest first.
+    """
+    formula = f"IS_BEFORE(IF({{Timestamp}}, {{Timestamp}}, CREATED_TIME()), '{cutoff.isoformat()}')"
+    return messages_table.all(formula=formula, sort=["Timestamp"], max_records=limit)
+
+@instrumented("airtable")
+def delete_messages(message_ids: list) -> set:
+    """
+    Deletes messages, 10 records per request.
+    
+    Messages that are already gone count as deleted: Airtable rejects a whole
+    batch for one missing record, so such a chunk is retried one record at a
+    time, skipping the 404s.
+    
+    Returns:
+        set: Message IDs whose deletion failed.
+    """
+    from utils.logger import log_error
+    failed = set()
+    for start in range(0, len(message_ids), AIRTABLE_BATCH_SIZE):
+        chunk = message_ids[start:start + AIRTABLE_BATCH_SIZE]
+        try:
+            messages_table.batch_delete(chunk)
+            continue
+        except Exception as e:
+            if not _is_not_found(e):
+                log_error(f"Message delete failed for {len(chunk)} record(s)", str(e))
+                failed.update(chunk)
+                continue
+        for message_id in chunk:
+            try:
+                messages_table.delete(message_id)
+            except Exception as e:
+                if not _is_not_found(e):
+                    log_error(f"Message delete failed for {message_id}", str(e))
+                    failed.add(message_id)
+    return failed
 
+@instrumented("airtable")
 def update_message_status(message_id: str, status: str):
     """
     Updates the delivery status of a message.
@@ -355,6 +966,11 @@ def update_message_status(message_id: str, status: str):
         else:
             log_error(f"Error updating message status: {err_str}")
 
+# Callers hold this from picking a Ready number until it is assigned, so two
+# concurrent first contacts never get the same number
+pool_allocation_lock = threading.Lock()
+
+@instrumented("airtable")
 def get_ready_pool_number():
     """
     Fetches a number from inventory with Lifecycle='pool' and Status='Ready'.
@@ -362,33 +978,54 @@ def get_ready_pool_number():
     try:
         # Formula: AND(Lifecycle='Pool', Status='Ready')
         formula = "AND({Lifecycle}='Pool', {Status}='Ready')"
-        records = inventory_table.all(formula=formula)
+        records = inventory_table.all(formula=formula, fields=airtable_schema.fields("inventory", "lookup"), max_records=1)
         return records[0] if records else None
     except Exception as e:
         from utils.logger import log_error
         log_error(f"Error fetching ready pool number: {str(e)}")
         return None
 
+@instrumented("airtable")
 def assign_pool_number_to_client(client_id: str, number_record_id: str, number_value: str):
     """
     Assigns a pool number to a client and updates the inventory status.
     Uses 'twilio-number' for the Clients table and 'phone-number' for Inventory source.
+    
+    Both writes are made immediately, never staged on the unit of work: a
+    staged Client write fails after the webhook has answered, which would leave
+    the number Assigned in Inventory with no Client holding it.
+    
+    Returns:
+        bool: True once both records are written. False if either write failed;
+        a Client write already made is then undone so the number stays Ready.
     """
+    from utils.logger import log_error
+    client_fields = {
+        "twilio-number": number_value,
+        "Last Active": datetime.utcnow().isoformat()
+    }
     try:
         # 1. Update Client with the assigned number and timestamp (Correct column name: "twilio-number")
-        clients_table.update(client_id, {
-            "twilio-number": number_value,
-            "Last Active": datetime.utcnow().isoformat()
-        })
-        
+        clients_table.update(client_id, client_fields)
+    except Exception as e:
+        log_error(f"Failed to assign pool number: {str(e)}")
+        return False
+    _written(clients_table, client_id, client_fields)
+    
+    try:
         # 2. Update Inventory to mark as Assigned (Status='Assigned')
         inventory_table.update(number_record_id, {"Status": "Assigned"})
         return True
     except Exception as e:
-        from utils.logger import log_error
-        log_error(f"Failed to assign pool number: {str(e)}")
+        log_error(f"Failed to mark pool number {number_value} Assigned: {str(e)}")
+        try:
+            clients_table.update(client_id, {"twilio-number": ""})
+            _written(clients_table, client_id, {"twilio-number": ""})
+        except Exception as undo_error:
+            log_error(f"Failed to clear pool number {number_value} from client {client_id}", str(undo_error))
         return False
 
+@instrumented("airtable")
 def update_client_linked_sitter(client_id: str, sitter_value: str):
     """
     Updates the Linked-Sitter field for a client with the Sitter's Name or ID.
@@ -398,7 +1035,7 @@ def update_client_linked_sitter(client_id: str, sitter_value: str):
     """
     try:
         # We use the Sitter Name (or ID)
-        clients_table.update(client_id, {"Linked-Sitter": sitter_value})
+        _update_record(clients_table, client_id, {"Linked-Sitter": sitter_value})
         return True
     except Exception as e:
         from utils.logger import log_error
@@ -407,79 +1044,169 @@ def update_client_linked_sitter(client_id: str, sitter_value: str):
 
 def increment_client_error_count(client_id: str):
     """
-    Increments the Twilio-Error-Count for a client.
-    Handles 'Twilio-Error-Count' as a String/Text field to avoid 422 errors.
+    Counts one Twilio error for a client.
+    The increment is kept in memory and written together with the others by
+    the periodic flush (services/error_counts.py), so a spike of failures
+    costs no Airtable requests on the request path.
     """
+    error_counts.add(client_id)
+
+# Clients whose error count is read per request (RECORD_ID() conditions in one formula)
+ERROR_COUNT_READ_CHUNK = 50
+
+def _error_count(raw) -> int:
+    # Twilio-Error-Count is a Single Line Text column
     try:
-        client = clients_table.get(client_id)
-        # Get current value, default to "0" (as string) or 0 (if int logic was used locally)
-        raw_val = client["fields"].get("Twilio-Error-Count", "0")
+        return int(str(raw or 0))
+    except ValueError:
+        return 0
+
+@instrumented("airtable")
+def get_client_error_counts(client_ids: list) -> dict:
+    """
+    Reads the current Twilio-Error-Count of several clients, 50 per request.
+    
+    Args:
+        client_ids (list): Client Record IDs.
         
-        # Safely convert to int
+    Returns:
+        dict: {client_id: count} for the clients that still exist.
+    """
+    counts = {}
+    for start in range(0, len(client_ids), ERROR_COUNT_READ_CHUNK):
+        conditions = [f"RECORD_ID() = '{client_id}'" for client_id in client_ids[start:start + ERROR_COUNT_READ_CHUNK]]
+        records = clients_table.all(formula=f"OR({', '.join(conditions)})", fields=airtable_schema.fields("clients", "error_count"))
+        for record in records:
+            counts[record["id"]] = _error_count(record["fields"].get("Twilio-Error-Count"))
+    return counts
+
+@instrumented("airtable")
+def set_client_error_counts(counts: dict) -> set:
+    """
+    Writes the Twilio-Error-Count of several clients, 10 records per request.
+    
+    Args:
+        counts (dict): {client_id: count}.
+        
+    Returns:
+        set: Client IDs whose update failed.
+    """
+    # Written as a string: the column is Single Line Text (a number is rejected with 422)
+    updates = [{"id": client_id, "fields": {"Twilio-Error-Count": str(count)}} for client_id, count in counts.items()]
+    failed = set()
+    for start in range(0, len(updates), AIRTABLE_BATCH_SIZE):
+        chunk = updates[start:start + AIRTABLE_BATCH_SIZE]
         try:
-            current = int(str(raw_val))
-        except ValueError:
-            current = 0
-            
-        new_count = current + 1
+            clients_table.batch_update(chunk)
+        except Exception as e:
+            from utils.logger import log_error
+            log_error(f"Error count update failed for {len(chunk)} client(s)", str(e))
+            failed.update(item["id"] for item in chunk)
+    return failed
+
+@instrumented("airtable")
+def get_session_links() -> dict:
+    """
+    Reads every Client that holds a Proxy Session SID.
+    
+    Returns:
+        dict: {session_sid: [client records]} (Session SID and Last Active only).
+    """
+    links = {}
+    records = clients_table.all(formula="NOT({Session SID} = '')", fields=airtable_schema.fields("clients", "session_links"))
+    for record in records:
+        links.setdefault(record["fields"]["Session SID"], []).append(record)
+    return links
+
+@instrumented("airtable")
+def clear_client_sessions(client_ids: list) -> set:
+    """
+    Empties the Session SID of several clients, 10 records per request.
+    
+    Args:
+        client_ids (list): Client Record IDs.
         
-        # Update as STRING because user confirmed it is a Single Line Text column
-        clients_table.update(client_id, {"Twilio-Error-Count": str(new_count)})
-    except Exception as e:
-        from utils.logger import log_error
-        log_error(f"Failed to increment error count: {str(e)}")
+    Returns:
+        set: Client IDs whose update failed.
+    """
+    updates = [{"id": client_id, "fields": {"Session SID": ""}} for client_id in client_ids]
+    failed = set()
+    for start in range(0, len(updates), AIRTABLE_BATCH_SIZE):
+        chunk = updates[start:start + AIRTABLE_BATCH_SIZE]
+        try:
+            clients_table.batch_update(chunk)
+        except Exception as e:
+            from utils.logger import log_error
+            log_error(f"Session link update failed for {len(chunk)} client(s)", str(e))
+            failed.update(item["id"] for item in chunk)
+    return failed
 
+@instrumented("airtable")
 def find_client_by_twilio_number(twilio_number: str):
     """
     Finds a Client record by their assigned 'twilio-number'. (Used for Sitter -> Client routing)
+    Answered from the read replica when enabled; otherwise concurrent lookups
+    for the same number share one Airtable query.
     """
-    if not twilio_number:
-        return None
-    
-    # Clean input: keep only digits
-    clean_num = "".join(filter(str.isdigit, twilio_number))
-    ten_digit = clean_num[-10:] if len(clean_num) >= 10 else clean_num
-
-    # Formula: {twilio-number} = 'number' or SEARCH for robustness
-    formula = f"OR(" \
-              f"{{twilio-number}} = '{twilio_number}', " \
-              f"SEARCH('{ten_digit}', {{twilio-number}})" \
-              f")"
+    record = replica.find_by_phone("clients", twilio_number, ("twilio_key",))
+    if record:
+        return record
     try:
-        records = clients_table.all(formula=formula)
-        return records[0] if records else None
+        return _query_client_by_twilio_number(twilio_number)
     except Exception as e:
-        from utils.logger import log_error
-        log_error(f"Error finding client by pool number: {str(e)}")
+        _lookup_failed("find_client_by_twilio_number", twilio_number, e)
         return None
+
+@coalesce
+def _query_client_by_twilio_number(twilio_number: str):
+    formula = _phone_match_formula(twilio_number, ("twilio-number",))
+    if not formula:
+        return None
+    records = clients_table.all(formula=formula, fields=airtable_schema.fields("clients", "lookup"), max_records=1)
+    return records[0] if records else None
+
+@instrumented("airtable")
 def get_assigned_clients():
     """
     Retrieves all Client records that currently have an assigned pool number.
     """
     try:
         formula = "NOT({twilio-number} = '')"
-        return clients_table.all(formula=formula)
+        return clients_table.all(formula=formula, fields=airtable_schema.fields("clients", "assigned"))
     except Exception as e:
         from utils.logger import log_error
         log_error(f"Error fetching assigned clients: {str(e)}")
         return []
 
+@instrumented("airtable")
 def find_inventory_record_by_number(phone_number: str):
     """
     Finds the inventory record ID for a specific phone number.
     """
     if not phone_number:
         return None
+
+    record = replica.find_by_phone("inventory", phone_number, ("phone_key",))
+    if record:
+        return record
     
-    formula = f"{{phone-number}} = '{phone_number}'"
+    if settings.AIRTABLE_PHONE_KEY_FIELDS:
+        formula = _phone_match_formula(phone_number, ("phone-number",))
+    else:
+        # Pool numbers are stored in E.164
+        canonical = e164(phone_number)
+        formula = f"{{phone-number}} = '{canonical}'" if canonical else None
+    if not formula:
+        return None
     try:
-        records = inventory_table.all(formula=formula)
+        records = inventory_table.all(formula=formula, fields=airtable_schema.fields("inventory", "lookup"), max_records=1)
         return records[0] if records else None
     except Exception as e:
         from utils.logger import log_error
         log_error(f"Error finding inventory record for {phone_number}: {str(e)}")
         return None
 
+@instrumented("airtable")
 def deallocate_client(client_id: str, inventory_record_id: str):
     """
     Clears the assigned pool number from a client and marks the inventory record as Ready.
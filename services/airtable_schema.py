@@ -0,0 +1,63 @@
+"""
+Airtable Schema
+===============
+The columns this service reads from each Airtable table, defined in one place.
+
+Key Functionality:
+- `SCHEMA`: for each table, the field list ("view") each kind of read needs.
+  Every list request in services/airtable_client.py asks Airtable for one of
+  these views only, instead of every column (long text, linked-record arrays,
+  attachments), which keeps responses, JSON decoding and per-lookup memory small.
+- `fields(table, *views)`: the columns of one or more views, in order, without duplicates.
+
+A field missing from a view reads as empty in the code that uses the records.
+A field that does not exist in the base makes Airtable reject the request (422),
+so the names here must match the base (see "Airtable Schema" in the README).
+"""
+
+SCHEMA = {
+    "sitters": {
+        # In-memory phone directory (services/directory.py)
+        "directory": ["Full Name", "phone-number", "twilio-number"],
+        # Routing and broadcasts (find_sitter_by_*)
+        "lookup": ["Full Name", "phone-number", "twilio-number"],
+    },
+    "clients": {
+        "directory": ["Name", "phone-number", "twilio-number"],
+        # Routing (find_client_by_*)
+        "lookup": ["Name", "phone-number", "twilio-number", "Linked-Sitter", "Last Active", "Session SID"],
+        # Broadcast recipients (find_clients_for_sitter)
+        "roster": ["Name", "phone-number", "twilio-number", "Linked-Sitter"],
+        # Deallocation sweep (get_assigned_clients)
+        "assigned": ["Name", "twilio-number", "Last Active"],
+        # find_active_sessions_for_sitter
+        "sessions": ["Name", "phone-number", "twilio-number", "Session SID"],
+        # Session reaper (get_session_links)
+        "session_links": ["Session SID", "Last Active"],
+        # Error count flush (services/error_counts.py)
+        "error_count": ["Twilio-Error-Count"],
+    },
+    "inventory": {
+        "directory": ["phone-number", "Lifecycle", "Status"],
+        # Finders, pool picks and bulk attach planning
+        "lookup": ["phone-number", "Lifecycle", "Status", "Assigned Sitter"],
+    },
+    "messages": {
+        # get_pending_messages (everything save_message writes)
+        "pending": ["Session SID", "From", "To", "Body", "Timestamp", "Status"],
+    },
+}
+
+def fields(table: str, *views: str) -> list:
+    """
+    Columns to request for a read.
+
+    Args:
+        table (str): "sitters", "clients", "inventory" or "messages".
+        *views (str): View names in SCHEMA[table] (default: all of them).
+
+    Returns:
+        list: The field names, in order, without duplicates.
+    """
+    views = views or tuple(SCHEMA[table])
+    return list(dict.fromkeys(field for view in views for field in SCHEMA[table][view]))
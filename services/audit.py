@@ -0,0 +1,152 @@
+"""
+Audit Rollups
+=============
+This script decides which events get their own Audit Log row, and rolls the
+rest up into periodic summaries.
+
+Key Functionality:
+- Business events (BUSINESS_EVENTS: a number assigned, the pool exhausted, a
+  forward failing, a number deallocated, a session expiring) keep one
+  full-fidelity row each, written when they happen (see
+  `airtable_client.log_event`).
+- Every other event (INFO/ERROR/SUCCESS log lines, broadcasts, syncs,
+  webhook timings, ...) is only counted in memory by `audit_rollup.record()`.
+  No Airtable request is made on the request path.
+- Every AUDIT_ROLLUP_SECONDS (and at shutdown) one ROLLUP row per event type
+  is written, 10 rows per request. Each row holds the count, the most frequent
+  descriptions and, for timed events, a latency summary (mean, p50, p95, max).
+  The Details column holds the summary as JSON.
+- Latency percentiles come from up to MAX_SAMPLES durations per type and
+  interval (reservoir sampling). Counts, means and maxima are exact.
+"""
+
+import asyncio
+import json
+import random
+import threading
+from datetime import datetime
+from config import settings
+from utils.logger import logger, log_info
+
+BUSINESS_EVENTS = frozenset({"NUMBER_ASSIGNED", "POOL_EXHAUSTED", "FORWARD_ERROR", "NUMBER_DEALLOCATED", "TTL_EXPIRY"})
+
+# Per event type and interval: distinct descriptions counted, latency samples kept
+MAX_DESCRIPTIONS = 50
+TOP_DESCRIPTIONS = 10
+MAX_SAMPLES = 1000
+
+class _TypeStats:
+    def __init__(self):
+        self.count = 0
+        self.descriptions = {}   # description -> count (MAX_DESCRIPTIONS, then "(other)")
+        self.timed = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.samples = []
+
+    def add(self, description: str, duration_ms: float = None):
+        self.count += 1
+        if description in self.descriptions or len(self.descriptions) < MAX_DESCRIPTIONS:
+            self.descriptions[description] = self.descriptions.get(description, 0) + 1
+        else:
+            self.descriptions["(other)"] = self.descriptions.get("(other)", 0) + 1
+        if duration_ms is None:
+            return
+        self.timed += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(duration_ms)
+        else:
+            slot = random.randrange(self.timed)
+            if slot < MAX_SAMPLES:
+                self.samples[slot] = duration_ms
+
+    def summary(self) -> dict:
+        top = sorted(self.descriptions.items(), key=lambda item: item[1], reverse=True)[:TOP_DESCRIPTIONS]
+        summary = {"count": self.count, "top": dict(top)}
+        if self.timed:
+            samples = sorted(self.samples)
+            summary["latency_ms"] = {
+                "mean": round(self.total_ms / self.timed, 1),
+                "p50": round(samples[len(samples) // 2], 1),
+                "p95": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1),
+                "max": round(self.max_ms, 1),
+            }
+        return summary
+
+class AuditRollup:
+    """
+    Counts of routine events for the current interval. Thread-safe.
+    """
+
+    def __init__(self):
+        self._stats = {}   # event type -> _TypeStats
+        self._since = datetime.utcnow()
+        self._lock = threading.Lock()
+
+    def record(self, event_type: str, description: str, duration_ms: float = None):
+        """
+        Counts one routine event (with its duration, if it is a timed one).
+        """
+        with self._lock:
+            stats = self._stats.get(event_type)
+            if stats is None:
+                stats = self._stats[event_type] = _TypeStats()
+            stats.add(description, duration_ms)
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(stats.count for stats in self._stats.values())
+
+    def take(self) -> list:
+        """
+        Ends the current interval.
+
+        Returns:
+            list: One Audit Log row (fields) per event type seen in the interval.
+        """
+        now = datetime.utcnow()
+        with self._lock:
+            stats, self._stats = self._stats, {}
+            since, self._since = self._since, now
+        rows = []
+        for event_type, type_stats in sorted(stats.items()):
+            summary = type_stats.summary()
+            summary.update(type=event_type, window_start=since.isoformat(), window_end=now.isoformat())
+            latency = f", p95 {summary['latency_ms']['p95']}ms" if "latency_ms" in summary else ""
+            rows.append({
+                "Event": "ROLLUP",
+                "Description": f"{event_type}: {type_stats.count} event(s) in {int((now - since).total_seconds())}s{latency}",
+                "Details": json.dumps(summary),
+                "Timestamp": now.isoformat(),
+            })
+        return rows
+
+    def flush(self) -> int:
+        """
+        Writes the rollup rows of the interval that just ended.
+
+        Returns:
+            int: Rows written.
+        """
+        from services.airtable_client import write_audit_rows
+        rows = self.take()
+        if not rows:
+            return 0
+        try:
+            return write_audit_rows(rows)
+        except Exception as e:
+            # Local log only: log_error would record another event while flushing
+            logger.error(f"Failed to write {len(rows)} audit rollup row(s): {e}")
+            return 0
+
+# Process-wide rollup behind airtable_client.log_event
+audit_rollup = AuditRollup()
+
+async def async_run_audit_rollups():
+    """ Writes the audit rollups every AUDIT_ROLLUP_SECONDS. """
+    log_info(f"Audit Rollups Started. Writing every {settings.AUDIT_ROLLUP_SECONDS}s.")
+    while True:
+        await asyncio.sleep(settings.AUDIT_ROLLUP_SECONDS)
+        await asyncio.to_thread(audit_rollup.flush)
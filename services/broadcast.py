@@ -0,0 +1,88 @@
+"""
+Broadcast Service
+=================
+This script fans one Sitter message out to all of the Sitter's Clients.
+
+Key Functionality:
+- Resolves every linked Client in a single Airtable query.
+- Logs all Messages rows with batch creates (10 per request).
+- Sends through the per-number SMS scheduler, so the sending number's rate
+  limit is respected, with a bound on how many sends are outstanding.
+- Records final delivery statuses with batch updates.
+
+Messages go out from the Sitter's entry-point number ('twilio-number'), the
+same number Sitter -> Client replies use, so Client replies route back normally.
+"""
+
+import threading
+from services.airtable_client import (
+    find_sitter_by_id,
+    find_clients_for_sitter,
+    save_messages_batch,
+    batch_update_message_statuses,
+    log_event
+)
+from services.sms_scheduler import scheduler
+from utils.logger import log_info, log_error
+
+# Maximum sends handed to the scheduler but not yet finished
+BROADCAST_CONCURRENCY = 10
+
+def prepare_broadcast(sitter_id: str):
+    """
+    Loads the Sitter and the Clients a broadcast should reach.
+
+    Returns:
+        tuple: (sitter record or None, list of Client records)
+    """
+    sitter = find_sitter_by_id(sitter_id)
+    if not sitter:
+        return None, []
+    sitter_name = sitter["fields"].get("Full Name")
+    return sitter, find_clients_for_sitter(sitter_id, sitter_name)
+
+def deliver_broadcast(sitter: dict, clients: list, body: str):
+    """
+    Logs and sends one message per Client, then records the outcomes.
+
+    Args:
+        sitter (dict): The Sitter record (must have 'twilio-number').
+        clients (list): Client records with 'phone-number'.
+        body (str): The message text.
+
+    Returns:
+        dict: {"sent": int, "failed": int}
+    """
+    entry_point = sitter["fields"].get("twilio-number")
+    recipients = [c["fields"]["phone-number"] for c in clients]
+
+    message_ids = save_messages_batch([
+        {"session_sid": "Broadcast", "from_number": entry_point, "to_number": phone, "body": body}
+        for phone in recipients
+    ])
+
+    slots = threading.BoundedSemaphore(BROADCAST_CONCURRENCY)
+    pending = []
+    for phone, message_id in zip(recipients, message_ids):
+        slots.acquire()
+        future = scheduler.submit(entry_point, phone, body)
+        future.add_done_callback(lambda _: slots.release())
+        pending.append((phone, message_id, future))
+
+    statuses = {}
+    sent = 0
+    for phone, message_id, future in pending:
+        try:
+            future.result()
+            statuses[message_id] = "Sent"
+            sent += 1
+        except Exception as e:
+            log_error(f"Broadcast to {phone} failed", str(e))
+            statuses[message_id] = "Failed"
+
+    batch_update_message_statuses(statuses)
+
+    failed = len(pending) - sent
+    log_info(f"Broadcast from sitter {sitter['id']} complete: {sent} sent, {failed} failed")
+    log_event("BROADCAST", f"Sitter {sitter['fields'].get('Full Name')} broadcast to {len(pending)} client(s)", f"Sent: {sent}, Failed: {failed}")
+    return {"sent": sent, "failed": failed}
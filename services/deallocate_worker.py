@@ -15,11 +15,21 @@ from services.airtable_client import (
     log_event
 )
 from utils.logger import log_info, log_error
+from utils.metrics import Histogram
+
+sweep_duration = Histogram(
+    "deallocation_sweep_duration_seconds", "Duration of one check_and_deallocate sweep.",
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800),
+)
 
 def check_and_deallocate():
     """
     Checks all assigned clients and deallocates numbers older than 14 days.
     """
+    with sweep_duration.time():
+        _sweep_assigned_clients()
+
+def _sweep_assigned_clients():
     log_info("Running Automated Deallocation Check...")
     
     clients = get_assigned_clients()
@@ -80,7 +90,8 @@ async def async_run_worker():
     log_info("Deallocation Background Worker Started. Checking every hour.")
     while True:
         try:
-            check_and_deallocate()
+            # The sweep makes blocking Airtable/Twilio calls; keep it off the event loop
+            await asyncio.to_thread(check_and_deallocate)
         except Exception as e:
             log_error("Deallocation Worker encountered an error", str(e))
         
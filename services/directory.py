@@ -0,0 +1,238 @@
+"""
+Phone Directory Service
+=======================
+This script keeps an in-memory directory of every phone number the service knows about.
+
+Key Functionality:
+- Periodically reads the phone columns of Sitters, Clients and Number Inventory
+  (the three tables in parallel).
+- Builds a Bloom filter of all known numbers on every refresh.
+- Keeps a short-lived negative cache of numbers the Bloom filter lets through
+  (false positives, records deleted since the refresh) but that went through
+  the full lookup chain without matching anything. Nothing is cached after a
+  lookup that failed, so an Airtable error cannot get a known Sitter or Client
+  ignored.
+- Lets /intercept reject traffic between two unknown numbers (spam, misdials,
+  carrier test messages) without touching Airtable.
+- Warm restarts: after every refresh the records are saved to
+  DIRECTORY_SNAPSHOT_PATH; on boot the snapshot is loaded and only records
+  modified since it was taken are fetched. Records deleted in the meantime
+  stay until the next full refresh (at worst a number is looked up in full
+  instead of being rejected early).
+
+Until the first refresh completes nothing is rejected.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from config import settings
+from services.airtable_client import get_directory_records
+from services.directory_snapshot import read_snapshot, write_snapshot
+from utils.bloom import BloomFilter
+from utils.phone import national_key, national_keys
+from utils.logger import log_info, log_error
+from utils.metrics import Gauge
+
+DIRECTORIES = ("sitters", "clients", "inventory")
+PHONE_FIELDS = ("phone-number", "twilio-number")
+
+# Overlap for delta reads, covering clock skew between us and Airtable
+SNAPSHOT_OVERLAP = timedelta(minutes=1)
+
+class PhoneDirectory:
+    """
+    Known phone numbers with a Bloom filter front and a TTL negative cache.
+    """
+
+    def __init__(self, negative_ttl: float = None):
+        self.negative_ttl = negative_ttl if negative_ttl is not None else settings.NEGATIVE_CACHE_TTL_SECONDS
+        self.records = {name: {} for name in DIRECTORIES}   # directory -> {record_id: fields}
+        self.loaded_at = None
+        self._bloom = None
+        self._unknown = {}   # phone key -> monotonic expiry
+        self._lock = threading.Lock()
+
+    @property
+    def is_ready(self) -> bool:
+        return self._bloom is not None
+
+    def load(self, records_by_directory: dict, as_of: datetime = None):
+        """
+        Replaces directory contents and rebuilds the Bloom filter.
+
+        Args:
+            records_by_directory (dict): {"sitters": [...], "clients": [...], "inventory": [...]}
+            as_of (datetime): When the records were read (default: now).
+        """
+        self._install({
+            name: {r["id"]: r.get("fields", {}) for r in records_by_directory.get(name, [])}
+            for name in DIRECTORIES
+        }, as_of)
+
+    def merge(self, changed_by_directory: dict, as_of: datetime = None):
+        """
+        Applies changed/new records on top of the current contents.
+
+        Args:
+            changed_by_directory (dict): Same shape as `load()`, only the changed records.
+            as_of (datetime): When the changes were read (default: now).
+        """
+        with self._lock:
+            records = {name: dict(self.records[name]) for name in DIRECTORIES}
+        for name in DIRECTORIES:
+            for r in changed_by_directory.get(name, []):
+                records[name][r["id"]] = r.get("fields", {})
+        self._install(records, as_of)
+
+    def _install(self, records: dict, as_of: datetime = None):
+        keys = set(national_keys(
+            fields.get(column)
+            for directory in records.values()
+            for fields in directory.values()
+            for column in PHONE_FIELDS
+            if fields.get(column)
+        ))
+        keys.discard("")
+
+        bloom = BloomFilter(capacity=max(1000, 2 * len(keys)))
+        for key in keys:
+            bloom.add(key)
+
+        with self._lock:
+            self.records = records
+            self._bloom = bloom
+            self._unknown.clear()
+            self.loaded_at = as_of or datetime.now(timezone.utc)
+
+    def refresh(self):
+        """
+        Re-reads all directory tables from Airtable and rebuilds the index.
+        """
+        as_of = datetime.now(timezone.utc)
+        with ThreadPoolExecutor(max_workers=len(DIRECTORIES), thread_name_prefix="directory") as pool:
+            self.load(dict(zip(DIRECTORIES, pool.map(get_directory_records, DIRECTORIES))), as_of)
+        log_info("Phone directory refreshed: " + ", ".join(f"{len(self.records[n])} {n}" for n in DIRECTORIES))
+        self.save_snapshot()
+
+    def refresh_changes(self, since: datetime):
+        """
+        Fetches only records modified after `since` and merges them in.
+        """
+        as_of = datetime.now(timezone.utc)
+        since = since - SNAPSHOT_OVERLAP
+        with ThreadPoolExecutor(max_workers=len(DIRECTORIES), thread_name_prefix="directory") as pool:
+            changed = dict(zip(DIRECTORIES, pool.map(lambda name: get_directory_records(name, since), DIRECTORIES)))
+        self.merge(changed, as_of)
+        log_info(
+            "Phone directory updated from snapshot: "
+            + ", ".join(f"{len(changed[n])} changed {n}" for n in DIRECTORIES)
+        )
+        self.save_snapshot()
+
+    def warm_start(self):
+        """
+        Boot-time load: the local snapshot plus changes since it was taken,
+        or a full refresh when there is no usable snapshot.
+        """
+        snapshot = read_snapshot(settings.DIRECTORY_SNAPSHOT_PATH) if settings.DIRECTORY_SNAPSHOT_PATH else None
+        if snapshot is None:
+            self.refresh()
+            return
+        records, taken_at = snapshot
+        self._install({name: records.get(name, {}) for name in DIRECTORIES}, taken_at)
+        self.refresh_changes(taken_at)
+
+    def save_snapshot(self):
+        """
+        Writes the current contents to DIRECTORY_SNAPSHOT_PATH (if configured).
+        """
+        if not settings.DIRECTORY_SNAPSHOT_PATH or not self.is_ready:
+            return
+        with self._lock:
+            records, taken_at = self.records, self.loaded_at
+        try:
+            write_snapshot(settings.DIRECTORY_SNAPSHOT_PATH, records, taken_at)
+        except Exception as e:
+            log_error("Failed to write phone directory snapshot", str(e))
+
+    def add(self, number: str):
+        """
+        Registers a number immediately (e.g. one just assigned) without waiting for a refresh.
+        """
+        key = national_key(number)
+        if not key:
+            return
+        with self._lock:
+            self._unknown.pop(key, None)
+            if self._bloom is not None:
+                self._bloom.add(key)
+
+    def mark_unknown(self, number: str):
+        """
+        Remembers that a full lookup found nothing for this number.
+        
+        Only numbers in the Bloom filter need an entry (the others are
+        rejected anyway). Callers must not mark numbers after a lookup that
+        failed (see `failed_lookups()` in airtable_client).
+        """
+        key = national_key(number)
+        if key and self.is_ready and key in self._bloom:
+            with self._lock:
+                self._unknown[key] = time.monotonic() + self.negative_ttl
+
+    def is_unknown(self, number: str) -> bool:
+        """
+        True only when the number is definitely not a Sitter, Client or pool number
+        (absent from the Bloom filter) or was recently confirmed unknown by a
+        full lookup (a Bloom false positive or a since-deleted record).
+        """
+        if not self.is_ready:
+            return False
+        key = national_key(number)
+        if not key:
+            return True
+
+        expiry = self._unknown.get(key)
+        if expiry is not None:
+            if expiry > time.monotonic():
+                return True
+            with self._lock:
+                self._unknown.pop(key, None)
+
+        return key not in self._bloom
+
+    def pool_ready_count(self):
+        """
+        Number of pool numbers (Lifecycle 'Pool', Status 'Ready') as of the last refresh.
+        """
+        if not self.is_ready:
+            return None
+        return sum(
+            1 for fields in self.records["inventory"].values()
+            if fields.get("Lifecycle") == "Pool" and fields.get("Status") == "Ready"
+        )
+
+    def should_reject(self, from_number: str, to_number: str) -> bool:
+        """
+        True when neither side of the message can match a routing rule.
+        """
+        return self.is_unknown(from_number) and self.is_unknown(to_number)
+
+# Process-wide directory used by the routers
+directory = PhoneDirectory()
+
+Gauge("pool_ready_numbers", "Ready client pool numbers as of the last directory refresh.", directory.pool_ready_count)
+
+async def async_run_refresher():
+    """ Refreshes the directory every DIRECTORY_REFRESH_SECONDS (the startup warm-up does the first load). """
+    log_info(f"Phone Directory Refresher Started. Refreshing every {settings.DIRECTORY_REFRESH_SECONDS}s.")
+    while True:
+        await asyncio.sleep(settings.DIRECTORY_REFRESH_SECONDS)
+
+        try:
+            await asyncio.to_thread(directory.refresh)
+        except Exception as e:
+            log_error("Phone directory refresh failed", str(e))
@@ -0,0 +1,74 @@
+"""
+Directory Snapshot
+==================
+This script saves the in-memory phone directory to a local file and reads it back,
+so a restarted process can skip the full Sitters/Clients/Number Inventory reads.
+
+Key Functionality:
+- File layout: one JSON header line, then one compact JSON line of records
+  ({"sitters": {record_id: fields}, ...}). Both parse with the C JSON decoder.
+- The header carries the format version, the Airtable base, the directory
+  columns and the time the data was read; a snapshot that doesn't match the
+  running code and configuration (or is older than DIRECTORY_SNAPSHOT_MAX_AGE_SECONDS)
+  is ignored.
+- Writes go to a temporary file that replaces the snapshot atomically, so a
+  crash mid-write never leaves a torn file.
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+from config import settings
+from services.airtable_client import DIRECTORY_FIELDS
+
+SNAPSHOT_FORMAT = "phonemasking-directory"
+SNAPSHOT_VERSION = 1
+
+def _header(taken_at: datetime) -> dict:
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "base": settings.AIRTABLE_BASE_ID,
+        "fields": DIRECTORY_FIELDS,
+        "taken_at": taken_at.isoformat(),
+    }
+
+def write_snapshot(path: str, records: dict, taken_at: datetime):
+    """
+    Atomically writes directory records to `path`.
+
+    Args:
+        path (str): Snapshot file.
+        records (dict): {"sitters": {record_id: fields}, "clients": ..., "inventory": ...}
+        taken_at (datetime): When the records were read from Airtable.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as f:
+        f.write(json.dumps(_header(taken_at), separators=(",", ":")) + "\n")
+        f.write(json.dumps(records, separators=(",", ":")) + "\n")
+    os.replace(temporary, path)
+
+def read_snapshot(path: str):
+    """
+    Reads a snapshot written by this version of the service for this base.
+
+    Returns:
+        tuple: (records, taken_at), or None if the file is missing, stale or incompatible.
+    """
+    try:
+        with open(path) as f:
+            header = json.loads(f.readline())
+            expected = _header(datetime.now(timezone.utc))
+            if any(header.get(key) != expected[key] for key in ("format", "version", "base", "fields")):
+                return None
+            taken_at = datetime.fromisoformat(header["taken_at"])
+            age = (datetime.now(timezone.utc) - taken_at).total_seconds()
+            if age > settings.DIRECTORY_SNAPSHOT_MAX_AGE_SECONDS:
+                return None
+            records = json.loads(f.readline())
+    except (OSError, ValueError, KeyError):
+        return None
+    return records, taken_at
@@ -0,0 +1,98 @@
+"""
+Client Error Counts
+===================
+This script coalesces increments of the Clients' Twilio-Error-Count.
+
+Key Functionality:
+- `error_counts.add(client_id)`: counts one forwarding failure or pool
+  exhaustion in memory. No Airtable request is made on the request path.
+- `error_counts.flush()`: runs every ERROR_COUNT_FLUSH_SECONDS (and at
+  shutdown). It reads the current counts of all clients with pending
+  increments in one request per 50 clients, adds the pending deltas to those
+  last-known values, and writes the sums back 10 records per request.
+    - The counts are read just before they are written, so an edit made in
+      Airtable (e.g. a count reset to 0) is respected.
+    - Increments that arrive during a flush are kept for the next one.
+    - When a read or write fails, its deltas go back into the pending counts,
+      so no increment is lost.
+
+This replaces a GET plus a PATCH per failure. That pattern doubled Airtable
+load during outages, which is exactly when failures spike, and lost increments
+when two read-modify-writes of the same client raced.
+"""
+
+import asyncio
+import threading
+from config import settings
+from utils.logger import log_info, log_error
+from utils.metrics import Gauge
+
+class ErrorCounts:
+    """
+    Pending Twilio-Error-Count increments per client. Thread-safe.
+    """
+
+    def __init__(self):
+        self._pending = {}   # client_id -> increments not yet written
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def add(self, client_id: str, n: int = 1):
+        if not client_id:
+            return
+        with self._lock:
+            self._pending[client_id] = self._pending.get(client_id, 0) + n
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(self._pending.values())
+
+    def _restore(self, deltas: dict):
+        with self._lock:
+            for client_id, n in deltas.items():
+                self._pending[client_id] = self._pending.get(client_id, 0) + n
+
+    def flush(self) -> int:
+        """
+        Writes the pending increments (one flush at a time).
+
+        Returns:
+            int: Number of Client records updated.
+        """
+        from services.airtable_client import get_client_error_counts, set_client_error_counts
+        with self._flush_lock:
+            with self._lock:
+                deltas, self._pending = self._pending, {}
+            if not deltas:
+                return 0
+
+            try:
+                current = get_client_error_counts(list(deltas))
+            except Exception as e:
+                self._restore(deltas)
+                log_error(f"Failed to read error counts of {len(deltas)} client(s), retrying next flush", str(e))
+                return 0
+
+            gone = [client_id for client_id in deltas if client_id not in current]
+            if gone:
+                log_error(f"Dropping error counts of {len(gone)} deleted client(s)", ", ".join(gone))
+            counts = {client_id: current[client_id] + n for client_id, n in deltas.items() if client_id in current}
+            failed = set_client_error_counts(counts)
+            self._restore({client_id: deltas[client_id] for client_id in failed})
+            return len(counts) - len(failed)
+
+# Process-wide aggregator behind airtable_client.increment_client_error_count
+error_counts = ErrorCounts()
+
+Gauge("client_error_counts_pending", "Client Twilio-Error-Count increments not yet written to Airtable.", error_counts.pending)
+
+async def async_run_error_count_flusher():
+    """ Flushes the pending error counts every ERROR_COUNT_FLUSH_SECONDS. """
+    log_info(f"Error Count Flusher Started. Flushing every {settings.ERROR_COUNT_FLUSH_SECONDS}s.")
+    while True:
+        await asyncio.sleep(settings.ERROR_COUNT_FLUSH_SECONDS)
+
+        try:
+            await asyncio.to_thread(error_counts.flush)
+        except Exception as e:
+            log_error("Error count flush failed", str(e))
@@ -0,0 +1,179 @@
+"""
+Messages Archive
+================
+This script moves old rows out of the Airtable Messages table into compressed
+local files, keeping the table (and every formula scan of it) small.
+
+Key Functionality:
+- Streams messages older than MESSAGE_ARCHIVE_AFTER_DAYS out of Airtable one
+  page (100 records, oldest first) at a time. Each page is archived and then
+  deleted before the next page is read, so memory use stays flat.
+- Archive files are gzip JSONL, one per message day (UTC, by Timestamp):
+  `<MESSAGE_ARCHIVE_DIR>/messages-2024-05-01.jsonl.gz`. Each line is the
+  Airtable record as read ({"id", "createdTime", "fields"}). Files are only
+  appended to, one gzip member per page; `gzip.open` / `zcat` read them as
+  one stream.
+- Deletes archived messages from Airtable 10 records per request.
+- A checkpoint file (`checkpoint.json`) makes every step resumable:
+    - "writing": the archive file sizes before the page was appended. A crash
+      while writing truncates the files back to those sizes, and the page,
+      still in Airtable, is archived again by the next run.
+    - "deleting": the IDs archived but not yet deleted, advanced after every
+      delete request. The next run deletes them first, so no message is
+      archived twice; IDs Airtable no longer has count as deleted.
+- Runs every MESSAGE_ARCHIVE_INTERVAL_SECONDS in the background, at most
+  MESSAGE_ARCHIVE_MAX_PER_RUN messages per run so the shared Airtable request
+  budget stays available for routing. scripts/archive_messages.py runs it by hand.
+
+Disabled unless MESSAGE_ARCHIVE_DIR is set.
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from config import settings
+from utils.logger import log_info, log_error
+
+PAGE_SIZE = 100
+CHECKPOINT_FILE = "checkpoint.json"
+
+def _day(record: dict) -> str:
+    # Partition by message time; rows without a Timestamp by creation time
+    return (record.get("fields", {}).get("Timestamp") or record.get("createdTime") or "unknown")[:10]
+
+class MessageArchiver:
+    """
+    Archives old Messages rows to day-partitioned gzip JSONL files. One run at a time.
+    """
+
+    def __init__(self, directory: str = None, after_days: int = None):
+        self.directory = directory if directory is not None else settings.MESSAGE_ARCHIVE_DIR
+        self.after_days = after_days if after_days is not None else settings.MESSAGE_ARCHIVE_AFTER_DAYS
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def path(self, day: str) -> str:
+        return os.path.join(self.directory, f"messages-{day}.jsonl.gz")
+
+    # -- checkpoint -------------------------------------------------------
+    def _checkpoint_path(self) -> str:
+        return os.path.join(self.directory, CHECKPOINT_FILE)
+
+    def _load_checkpoint(self) -> dict:
+        try:
+            with open(self._checkpoint_path(), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _save_checkpoint(self, state: dict):
+        # Written atomically: a crash leaves the previous checkpoint in place
+        tmp_path = self._checkpoint_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._checkpoint_path())
+
+    # -- steps ------------------------------------------------------------
+    def _append(self, records: list):
+        by_day = {}
+        for record in records:
+            by_day.setdefault(_day(record), []).append(record)
+        paths = {day: self.path(day) for day in by_day}
+        self._save_checkpoint({
+            "state": "writing",
+            "sizes": {path: os.path.getsize(path) if os.path.exists(path) else 0 for path in paths.values()},
+        })
+        for day, day_records in by_day.items():
+            with open(paths[day], "ab") as f:
+                with gzip.GzipFile(fileobj=f, mode="wb") as member:
+                    member.write("".join(json.dumps(record) + "\n" for record in day_records).encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _delete(self, message_ids: list) -> set:
+        from services.airtable_client import AIRTABLE_BATCH_SIZE, delete_messages
+        failed = set()
+        for start in range(0, len(message_ids), AIRTABLE_BATCH_SIZE):
+            # The checkpoint only ever holds what may still be in Airtable
+            self._save_checkpoint({"state": "deleting", "ids": sorted(failed) + message_ids[start:]})
+            failed |= delete_messages(message_ids[start:start + AIRTABLE_BATCH_SIZE])
+        self._save_checkpoint({"state": "deleting", "ids": sorted(failed)} if failed else {})
+        return failed
+
+    def _resume(self, summary: dict) -> bool:
+        """
+        Finishes or rolls back the step a previous run was in.
+        Returns False if Airtable deletions are still failing.
+        """
+        checkpoint = self._load_checkpoint()
+        if checkpoint.get("state") == "writing":
+            for path, size in checkpoint["sizes"].items():
+                if os.path.exists(path):
+                    with open(path, "r+b") as f:
+                        f.truncate(size)
+            self._save_checkpoint({})
+            log_info(f"Message archive: rolled back an interrupted write to {len(checkpoint['sizes'])} file(s)")
+        elif checkpoint.get("state") == "deleting" and checkpoint.get("ids"):
+            failed = self._delete(checkpoint["ids"])
+            summary["deleted"] += len(checkpoint["ids"]) - len(failed)
+            return not failed
+        return True
+
+    def run(self, now: datetime = None, max_records: int = None) -> dict:
+        """
+        Archives and deletes messages older than `after_days`.
+
+        Args:
+            now (datetime): Naive UTC reference time (default: now).
+            max_records (int): Stop after this many messages (default: MESSAGE_ARCHIVE_MAX_PER_RUN).
+
+        Returns:
+            dict: {"archived": int, "deleted": int, "failed": int}
+        """
+        from services.airtable_client import get_messages_before
+        max_records = max_records if max_records is not None else settings.MESSAGE_ARCHIVE_MAX_PER_RUN
+        summary = {"archived": 0, "deleted": 0, "failed": 0}
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            if not self._resume(summary):
+                summary["failed"] = len(self._load_checkpoint().get("ids", []))
+                return summary
+
+            cutoff = (now or datetime.utcnow()) - timedelta(days=self.after_days)
+            while summary["archived"] < max_records:
+                page = get_messages_before(cutoff, min(PAGE_SIZE, max_records - summary["archived"]))
+                if not page:
+                    break
+                self._append(page)
+                summary["archived"] += len(page)
+                failed = self._delete([record["id"] for record in page])
+                summary["deleted"] += len(page) - len(failed)
+                if failed:
+                    # Still in Airtable: reading on would archive them again
+                    summary["failed"] = len(failed)
+                    break
+        return summary
+
+# Process-wide archiver (MESSAGE_ARCHIVE_DIR)
+archiver = MessageArchiver()
+
+async def async_run_message_archiver():
+    """ Archives old messages every MESSAGE_ARCHIVE_INTERVAL_SECONDS. """
+    log_info(f"Message Archiver Started. Archiving messages older than {archiver.after_days} days every {settings.MESSAGE_ARCHIVE_INTERVAL_SECONDS}s.")
+    while True:
+        await asyncio.sleep(settings.MESSAGE_ARCHIVE_INTERVAL_SECONDS)
+
+        try:
+            summary = await asyncio.to_thread(archiver.run)
+            if summary["archived"] or summary["deleted"] or summary["failed"]:
+                await asyncio.to_thread(log_info, "Message archive run complete", str(summary))
+        except Exception as e:
+            log_error("Message archive run failed", str(e))
@@ -12,7 +12,7 @@ Key Functionality:
 This service ensures that phone numbers are efficiently rotated and reused.
 """
 
-from services.airtable_client import get_available_numbers, reserve_number, release_number, log_event
+from services.airtable_client import get_available_numbers, filter_unassigned_numbers, reserve_number, release_number, log_event
 from utils.logger import log_info, log_error
 
 def get_next_available_number():
@@ -67,6 +67,51 @@ def move_old_number_to_standby(number_record_id: str):
         log_error(f"Failed to release number {number_record_id}", str(e))
         return False
 
+def plan_bulk_assignment(sitter_ids: list, inventory_records: list):
+    """
+    Pairs Sitters with distinct unassigned numbers from one inventory snapshot.
+    
+    Every available number is handed out at most once, so concurrent
+    assignments within the same batch can never collide.
+    
+    Args:
+        sitter_ids (list): Sitter Record IDs, in the order they should be served.
+        inventory_records (list): All Number Inventory records (one full scan).
+        
+    Returns:
+        tuple: (assignments, unserved) where assignments is a list of dicts with
+               "sitter_id", "new_record" and "old_record" (or None), and unserved
+               lists the Sitter IDs left over once the pool ran out.
+    """
+    available = filter_unassigned_numbers(inventory_records)
+    
+    # Index current assignments so each Sitter's old number is found without a query
+    current_by_sitter = {}
+    for record in inventory_records:
+        for linked_id in record.get("fields", {}).get("Assigned Sitter", []) or []:
+            current_by_sitter.setdefault(linked_id, record)
+    
+    assignments = []
+    unserved = []
+    seen = set()
+    for sitter_id in sitter_ids:
+        sitter_id = sitter_id.strip() if sitter_id else sitter_id
+        if not sitter_id or sitter_id in seen:
+            continue
+        seen.add(sitter_id)
+        
+        if len(assignments) >= len(available):
+            unserved.append(sitter_id)
+            continue
+        
+        assignments.append({
+            "sitter_id": sitter_id,
+            "new_record": available[len(assignments)],
+            "old_record": current_by_sitter.get(sitter_id),
+        })
+    
+    return assignments, unserved
+
 def refresh_pool_status():
     """
     Placeholder for future logic to audit or refresh the number pool.
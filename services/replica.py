@@ -0,0 +1,346 @@
+"""
+Airtable Read Replica
+=====================
+This script keeps a local SQLite copy of the Sitters, Clients and Number Inventory
+tables, so phone-number and linked-record lookups are indexed local queries
+instead of SEARCH()/FIND() formula scans in Airtable.
+
+Key Functionality:
+- One SQLite table per Airtable table: the record (JSON, the columns of all its
+  views in services/airtable_schema.py) plus indexed key columns (normalized
+  phone numbers, name, status, ...). Linked-record IDs (Linked-Sitter,
+  Assigned Sitter) go to an indexed `links` table.
+- Incremental sync every REPLICA_SYNC_SECONDS: only records modified since the
+  previous sync (minus a minute for clock skew) are read. A full read every
+  REPLICA_FULL_SYNC_SECONDS also drops records deleted in Airtable.
+- Write-through: records this process creates, updates or deletes are applied
+  as soon as Airtable confirms the write (see `_LazyTable` in airtable_client),
+  so a lookup straight after a write sees it. The time of each such write is
+  kept per record, and a sync read that started before it neither overwrites
+  nor drops (nor brings back) that record.
+- Lookups only use the replica once every table has been synced by this
+  process; a miss falls back to Airtable, since the record may be newer than
+  the last sync.
+- The database (AIRTABLE_REPLICA_PATH) can be opened with `sqlite3` for ad-hoc
+  ops queries, and survives restarts: a restart resumes incremental sync.
+
+Disabled unless AIRTABLE_REPLICA_PATH is set (":memory:" for a process-local copy).
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from config import settings
+from services import airtable_schema
+from utils.phone import national_key, national_keys
+from utils.logger import log_info, log_error
+from utils.metrics import Gauge, record_local_read
+
+REPLICA_VERSION = 1
+
+# Overlap for incremental reads, covering clock skew between us and Airtable
+SYNC_OVERLAP = timedelta(minutes=1)
+
+# Replica table -> Airtable table
+TABLES = {
+    "sitters": settings.AIRTABLE_SITTERS_TABLE,
+    "clients": settings.AIRTABLE_CLIENTS_TABLE,
+    "inventory": settings.AIRTABLE_NUMBER_INVENTORY_TABLE,
+}
+
+# Replica table -> {"columns": {column: field}, "phones": {column: field}, "links": [field]}
+# "phones" columns hold national_key() of the field and are indexed.
+SCHEMA = {
+    "sitters": {
+        "columns": {"name": "Full Name"},
+        "phones": {"phone_key": "phone-number", "twilio_key": "twilio-number"},
+        "links": [],
+    },
+    "clients": {
+        "columns": {"name": "Name", "session_sid": "Session SID", "last_active": "Last Active"},
+        "phones": {"phone_key": "phone-number", "twilio_key": "twilio-number"},
+        "links": ["Linked-Sitter"],
+    },
+    "inventory": {
+        "columns": {"status": "Status", "lifecycle": "Lifecycle"},
+        "phones": {"phone_key": "phone-number"},
+        "links": ["Assigned Sitter"],
+    },
+}
+
+def _schema_sql() -> str:
+    statements = [
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+        "CREATE TABLE IF NOT EXISTS links (tbl TEXT, record_id TEXT, field TEXT, linked_id TEXT)",
+        "CREATE INDEX IF NOT EXISTS links_by_target ON links (tbl, field, linked_id)",
+        "CREATE INDEX IF NOT EXISTS links_by_record ON links (tbl, record_id)",
+        "CREATE TABLE IF NOT EXISTS written (tbl TEXT, record_id TEXT, written_at TEXT, PRIMARY KEY (tbl, record_id))",
+    ]
+    for name, spec in SCHEMA.items():
+        columns = [*spec["columns"], *spec["phones"]]
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {name} "
+            f"(id TEXT PRIMARY KEY, created_time TEXT, {', '.join(f'{c} TEXT' for c in columns)}, fields TEXT)"
+        )
+        statements += [f"CREATE INDEX IF NOT EXISTS {name}_{c} ON {name} ({c})" for c in spec["phones"]]
+    return ";\n".join(statements) + ";"
+
+def _source() -> str:
+    # What the replica was built from; a mismatch means it has to be rebuilt
+    return json.dumps({
+        "version": REPLICA_VERSION, "base": settings.AIRTABLE_BASE_ID, "tables": TABLES, "schema": SCHEMA,
+        "fields": {name: airtable_schema.fields(name) for name in TABLES},
+    })
+
+def _text(value):
+    if isinstance(value, list):
+        return ", ".join(str(v) for v in value)
+    return None if value is None else str(value)
+
+class Replica:
+    """
+    SQLite copy of the directory tables. Thread-safe (one connection, one lock).
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+        self._synced = set()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path if self.path is not None else settings.AIRTABLE_REPLICA_PATH)
+
+    @property
+    def is_ready(self) -> bool:
+        return self._conn is not None and len(self._synced) == len(TABLES)
+
+    def open(self):
+        """
+        Opens (or creates) the database, rebuilding it if it came from another
+        base or schema.
+        """
+        with self._lock:
+            if self._conn is not None:
+                return
+            conn = sqlite3.connect(self.path or settings.AIRTABLE_REPLICA_PATH, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_schema_sql())
+            row = conn.execute("SELECT value FROM meta WHERE key = 'source'").fetchone()
+            if row is None or row[0] != _source():
+                conn.executescript(
+                    "".join(f"DROP TABLE IF EXISTS {name};" for name in (*SCHEMA, "links", "written", "meta")) + _schema_sql()
+                )
+                conn.execute("INSERT INTO meta VALUES ('source', ?)", (_source(),))
+            self._conn = conn
+            # Stored sync times only pick incremental reads; lookups wait for
+            # this process's first sync, since the copy may be far behind
+            self._synced = set()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+            self._synced = set()
+
+    # -- writes -----------------------------------------------------------
+    @contextmanager
+    def _transaction(self):
+        # Callers hold self._lock
+        self._conn.execute("BEGIN")
+        try:
+            yield
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _meta(self, key: str):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def _set_meta(self, key: str, value: datetime):
+        self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value.isoformat()))
+
+    def _upsert(self, name: str, record: dict, phone_keys: dict = None):
+        # phone_keys: precomputed {column: key} (store() keys whole reads in one batch)
+        spec = SCHEMA[name]
+        fields = record.get("fields", {})
+        values = {column: _text(fields.get(field)) for column, field in spec["columns"].items()}
+        if phone_keys is None:
+            phone_keys = {column: national_key(_text(fields.get(field))) for column, field in spec["phones"].items()}
+        values.update({column: key or None for column, key in phone_keys.items()})
+        columns = ["id", "created_time", *values, "fields"]
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO {name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            (record["id"], record.get("createdTime"), *values.values(), json.dumps(fields)),
+        )
+        self._conn.execute("DELETE FROM links WHERE tbl = ? AND record_id = ?", (name, record["id"]))
+        for field in spec["links"]:
+            linked_ids = fields.get(field)
+            if isinstance(linked_ids, list):
+                self._conn.executemany(
+                    "INSERT INTO links VALUES (?, ?, ?, ?)",
+                    [(name, record["id"], field, linked_id) for linked_id in linked_ids],
+                )
+
+    def _delete(self, name: str, record_id: str):
+        self._conn.execute(f"DELETE FROM {name} WHERE id = ?", (record_id,))
+        self._conn.execute("DELETE FROM links WHERE tbl = ? AND record_id = ?", (name, record_id))
+
+    def _written_since(self, name: str, as_of: datetime) -> set:
+        # IDs of the records written through after `as_of`; older entries are
+        # dropped, since a read started after a write includes it
+        written = self._conn.execute("SELECT record_id, written_at FROM written WHERE tbl = ?", (name,)).fetchall()
+        newer = {record_id for record_id, written_at in written if datetime.fromisoformat(written_at) > as_of}
+        self._conn.executemany(
+            "DELETE FROM written WHERE tbl = ? AND record_id = ?",
+            [(name, record_id) for record_id, _ in written if record_id not in newer],
+        )
+        return newer
+
+    def store(self, name: str, records: list, as_of: datetime, full: bool):
+        """
+        Applies one sync read of a table in a single transaction. Records
+        written through after `as_of` keep their newer copy (or stay deleted).
+
+        Args:
+            name (str): Replica table ("sitters", "clients", "inventory").
+            records (list): Airtable records read.
+            as_of (datetime): When the read started.
+            full (bool): The read covered the whole table (rows not in it are dropped).
+        """
+        with self._lock:
+            with self._transaction():
+                newer = self._written_since(name, as_of)
+                if full:
+                    keep = ", ".join("?" * len(newer))
+                    self._conn.execute(f"DELETE FROM {name} WHERE id NOT IN ({keep})", tuple(newer))
+                    self._conn.execute(f"DELETE FROM links WHERE tbl = ? AND record_id NOT IN ({keep})", (name, *newer))
+                    self._set_meta(f"full_synced_at:{name}", as_of)
+                records = [record for record in records if record["id"] not in newer]
+                keys = {
+                    column: national_keys(_text(record.get("fields", {}).get(field)) for record in records)
+                    for column, field in SCHEMA[name]["phones"].items()
+                }
+                for i, record in enumerate(records):
+                    self._upsert(name, record, {column: column_keys[i] for column, column_keys in keys.items()})
+                self._set_meta(f"synced_at:{name}", as_of)
+            self._synced.add(name)
+
+    def apply_write(self, table_name: str, result):
+        """
+        Applies what an Airtable write returned (a record, a list of records,
+        an upsert summary or deletion results) to the replicated table, if any.
+        """
+        name = next((n for n, t in TABLES.items() if t == table_name), None)
+        if name is None or self._conn is None:
+            return
+        if isinstance(result, dict):
+            result = result.get("records", [result])
+        written_at = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            if self._conn is None:
+                return
+            with self._transaction():
+                for item in result or []:
+                    if item.get("deleted"):
+                        self._delete(name, item["id"])
+                    elif "fields" in item:
+                        self._upsert(name, item)
+                    else:
+                        continue
+                    self._conn.execute("INSERT OR REPLACE INTO written VALUES (?, ?, ?)", (name, item["id"], written_at))
+
+    # -- sync -------------------------------------------------------------
+    def sync(self, full: bool = False):
+        """
+        Brings every table up to date: an incremental read, or a full read for
+        a table never synced or last fully synced over REPLICA_FULL_SYNC_SECONDS ago.
+        """
+        from services.airtable_client import get_replica_records
+
+        self.open()
+        now = datetime.now(timezone.utc)
+        full_every = timedelta(seconds=settings.REPLICA_FULL_SYNC_SECONDS)
+
+        def sync_table(name):
+            with self._lock:
+                synced_at, full_synced_at = self._meta(f"synced_at:{name}"), self._meta(f"full_synced_at:{name}")
+            table_full = full or synced_at is None or full_synced_at is None or now - full_synced_at > full_every
+            as_of = datetime.now(timezone.utc)
+            records = get_replica_records(name, None if table_full else synced_at - SYNC_OVERLAP)
+            self.store(name, records, as_of, table_full)
+            return len(records), table_full
+
+        with ThreadPoolExecutor(max_workers=len(TABLES), thread_name_prefix="replica") as pool:
+            return dict(zip(TABLES, pool.map(sync_table, TABLES)))
+
+    def age_seconds(self) -> float:
+        """
+        Seconds since the least recently synced table was synced (0 before the first sync).
+        """
+        if not self.is_ready:
+            return 0.0
+        with self._lock:
+            oldest = min(self._meta(f"synced_at:{name}") for name in TABLES)
+        return (datetime.now(timezone.utc) - oldest).total_seconds()
+
+    # -- lookups ----------------------------------------------------------
+    def _select(self, sql: str, params: tuple):
+        with self._lock:
+            row = self._conn.execute(sql, params).fetchone()
+        if row is None:
+            return None
+        record_local_read()
+        return {"id": row[0], "createdTime": row[1], "fields": json.loads(row[2])}
+
+    def find_by_phone(self, name: str, number: str, columns: tuple):
+        """
+        First record whose phone `columns` match `number` (compared by national_key()),
+        or None on a miss or before the replica is ready.
+        """
+        key = national_key(number)
+        if not key or not self.is_ready:
+            return None
+        where = " OR ".join(f"{column} = ?" for column in columns)
+        return self._select(
+            f"SELECT id, created_time, fields FROM {name} WHERE {where} ORDER BY rowid LIMIT 1",
+            (key,) * len(columns),
+        )
+
+    def find_linked(self, name: str, field: str, linked_id: str):
+        """
+        First record whose linked-record `field` contains `linked_id`,
+        or None on a miss or before the replica is ready.
+        """
+        if not linked_id or not self.is_ready:
+            return None
+        return self._select(
+            f"SELECT r.id, r.created_time, r.fields FROM links l JOIN {name} r ON r.id = l.record_id "
+            f"WHERE l.tbl = ? AND l.field = ? AND l.linked_id = ? ORDER BY r.rowid LIMIT 1",
+            (name, field, linked_id),
+        )
+
+# Process-wide replica used by the airtable_client finders
+replica = Replica()
+
+Gauge("airtable_replica_age_seconds", "Seconds since the read replica's oldest table was synced.", replica.age_seconds)
+
+async def async_run_replica_sync():
+    """ Syncs the replica every REPLICA_SYNC_SECONDS (the startup warm-up does the first sync). """
+    log_info(f"Airtable Replica Sync Started. Syncing every {settings.REPLICA_SYNC_SECONDS}s.")
+    while True:
+        await asyncio.sleep(settings.REPLICA_SYNC_SECONDS)
+
+        try:
+            await asyncio.to_thread(replica.sync)
+        except Exception as e:
+            log_error("Airtable replica sync failed", str(e))
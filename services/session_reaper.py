@@ -0,0 +1,144 @@
+"""
+Proxy Session Reaper
+====================
+This script closes the Twilio Proxy sessions nothing needs any more, in bulk.
+
+Key Functionality:
+- Reads every Client's Session SID once, then pages through the Proxy
+  service's sessions (100 per request) and picks out, among the open ones:
+    - expired: past their Twilio expiry, or every Client linked to them has
+      been inactive for more than TTL_DAYS (services/ttl_manager.py);
+    - orphaned: no Client references them, and they are older than
+      ORPHAN_GRACE (a session is linked just after it is created).
+- Closes them SESSION_REAPER_CONCURRENCY at a time. The listing already
+  carries each session's status, so a close is one request instead of a
+  fetch plus an update.
+- Empties the Session SID of the Clients linked to a session that was closed
+  (by the reaper or before), or that no longer exists in the Proxy service,
+  10 records per request.
+- Runs every SESSION_REAPER_INTERVAL_SECONDS in the background when set;
+  scripts/reap_sessions.py runs it by hand (with --dry-run to only count).
+
+Legacy sessions from `twilio_proxy.create_session` live for 14 days, so
+`ttl_manager.handle_ttl_expiry` closing them one at a time lets them pile up.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from config import settings
+from services.ttl_manager import is_ttl_expired
+from utils.logger import log_info, log_error
+
+PAGE_SIZE = 100
+ORPHAN_GRACE = timedelta(hours=1)
+CLOSED_STATUSES = {"closed", "failed"}
+
+def _reason(session, linked: list, now: datetime):
+    """
+    Why an open session should be closed ("expired" / "orphaned"), or None.
+    """
+    if session.status in CLOSED_STATUSES:
+        return None
+    if session.date_expiry and session.date_expiry <= now:
+        return "expired"
+    if not linked:
+        if session.date_created is None or now - session.date_created > ORPHAN_GRACE:
+            return "orphaned"
+        return None
+    if all(is_ttl_expired(record, now) for record in linked):
+        return "expired"
+    return None
+
+class SessionReaper:
+    """
+    Finds and closes expired and orphaned Proxy sessions. One run at a time.
+    """
+
+    def __init__(self, concurrency: int = None):
+        self.concurrency = concurrency or settings.SESSION_REAPER_CONCURRENCY
+        self._lock = threading.Lock()
+
+    def _close(self, pool: ThreadPoolExecutor, candidates: list, links: dict, summary: dict, unlink: list):
+        from services.twilio_proxy import close_session
+        results = pool.map(lambda item: close_session(item[0].sid, status=item[0].status), candidates)
+        for (session, reason), closed in zip(candidates, results):
+            if not closed:
+                summary["failed"] += 1
+                continue
+            summary[reason] += 1
+            unlink.extend(record["id"] for record in links.get(session.sid, []))
+
+    def run(self, now: datetime = None, max_sessions: int = None, dry_run: bool = False) -> dict:
+        """
+        Scans the Proxy service once.
+
+        Args:
+            now (datetime): Timezone-aware reference time (default: now).
+            max_sessions (int): Stop after listing this many sessions (default: all).
+                A partial scan does not unlink sessions it did not see.
+            dry_run (bool): Only count what would be closed and unlinked.
+
+        Returns:
+            dict: {"scanned", "expired", "orphaned", "failed", "unlinked"}
+        """
+        from services.airtable_client import get_session_links, clear_client_sessions
+        from services.twilio_proxy import list_sessions
+        now = now or datetime.now(timezone.utc)
+        summary = {"scanned": 0, "expired": 0, "orphaned": 0, "failed": 0, "unlinked": 0}
+        with self._lock:
+            links = get_session_links()
+            seen = set()
+            unlink = []   # Client IDs whose Session SID is emptied
+            complete = True
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="reaper") as pool:
+                candidates = []
+                for session in list_sessions(PAGE_SIZE):
+                    if max_sessions is not None and summary["scanned"] >= max_sessions:
+                        complete = False
+                        break
+                    summary["scanned"] += 1
+                    seen.add(session.sid)
+                    reason = _reason(session, links.get(session.sid), now)
+                    if reason is None:
+                        if session.status in CLOSED_STATUSES:
+                            unlink.extend(record["id"] for record in links.get(session.sid, []))
+                        continue
+                    if dry_run:
+                        summary[reason] += 1
+                        unlink.extend(record["id"] for record in links.get(session.sid, []))
+                        continue
+                    candidates.append((session, reason))
+                    if len(candidates) >= PAGE_SIZE:
+                        self._close(pool, candidates, links, summary, unlink)
+                        candidates = []
+                self._close(pool, candidates, links, summary, unlink)
+
+            if complete:
+                for session_sid in links.keys() - seen:
+                    unlink.extend(record["id"] for record in links[session_sid])
+            summary["unlinked"] = len(unlink)
+            if dry_run or not unlink:
+                return summary
+            failed = clear_client_sessions(unlink)
+            summary["unlinked"] -= len(failed)
+        return summary
+
+# Process-wide reaper (SESSION_REAPER_INTERVAL_SECONDS)
+reaper = SessionReaper()
+
+async def async_run_session_reaper():
+    """ Reaps Proxy sessions every SESSION_REAPER_INTERVAL_SECONDS. """
+    from services.airtable_client import log_event
+    log_info(f"Session Reaper Started. Reaping every {settings.SESSION_REAPER_INTERVAL_SECONDS}s, {reaper.concurrency} at a time.")
+    while True:
+        await asyncio.sleep(settings.SESSION_REAPER_INTERVAL_SECONDS)
+
+        try:
+            summary = await asyncio.to_thread(reaper.run)
+            if summary["expired"]:
+                await asyncio.to_thread(log_event, "TTL_EXPIRY", f"Session reaper closed {summary['expired']} expired session(s)", str(summary))
+            log_info("Session reaper run complete", str(summary))
+        except Exception as e:
+            log_error("Session reaper run failed", str(e))
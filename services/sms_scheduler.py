@@ -0,0 +1,188 @@
+"""
+SMS Scheduler Service
+=====================
+This script paces outbound SMS per sending number.
+
+Key Functionality:
+- Keeps one FIFO queue per `from_number` so messages in a conversation are
+  delivered in the order they were received.
+- Paces each queue to the configured per-number rate (Twilio long codes
+  handle about 1 message/second).
+- Retries throttling errors (HTTP 429, rate/queue limits) with exponential
+  backoff instead of failing the message.
+- Reports queue depth per number.
+
+`queue_sms` is what the webhooks use instead of `twilio_proxy.send_sms`: it
+queues the message and returns straight away. The Messages row is marked Sent
+from a done-callback once Twilio accepts it. A webhook never waits for the
+queue or the retries: behind a busy number those can take longer than Twilio's
+15s webhook timeout, and every wait would hold a threadpool worker.
+"""
+
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from config import settings
+from services import twilio_proxy
+from utils.logger import log_info, log_error
+from utils.metrics import Gauge
+from utils import tracing
+
+# Twilio error codes meaning "slow down", not "this message is bad"
+THROTTLE_ERROR_CODES = {20429, 14107, 30001}
+
+def is_throttling_error(error: Exception) -> bool:
+    """
+    True if Twilio rejected the send because of rate or queue limits.
+    """
+    return getattr(error, "status", None) == 429 or getattr(error, "code", None) in THROTTLE_ERROR_CODES
+
+class _OutboundMessage:
+    def __init__(self, to_number: str, body: str):
+        self.to_number = to_number
+        self.body = body
+        self.attempts = 0
+        self.future = Future()
+        # The submitting request's context, so the Twilio call joins its trace
+        self.context = contextvars.copy_context()
+
+class OutboundScheduler:
+    """
+    Per-sender queues drained by one worker thread per active sending number.
+    """
+
+    def __init__(self, rate_per_number: float = None, max_retries: int = None, backoff_seconds: float = None):
+        self.interval = 1.0 / (rate_per_number or settings.SMS_PER_NUMBER_MPS)
+        self.max_retries = max_retries if max_retries is not None else settings.SMS_MAX_RETRIES
+        self.backoff_seconds = backoff_seconds if backoff_seconds is not None else settings.SMS_RETRY_BACKOFF_SECONDS
+        self._queues = {}      # from_number -> deque of _OutboundMessage
+        self._next_send = {}   # from_number -> monotonic time the number may send again
+        self._lock = threading.Lock()
+
+    def submit(self, from_number: str, to_number: str, body: str) -> Future:
+        """
+        Queues a message behind earlier messages from the same number.
+
+        Returns:
+            Future: Resolves to the Message SID, or raises the final send error.
+        """
+        message = _OutboundMessage(to_number, body)
+        with self._lock:
+            queue = self._queues.get(from_number)
+            start_worker = queue is None
+            if start_worker:
+                queue = self._queues[from_number] = deque()
+            queue.append(message)
+
+        if start_worker:
+            threading.Thread(
+                target=self._drain, args=(from_number,), name=f"sms-{from_number}", daemon=True
+            ).start()
+        return message.future
+
+    def wait_idle(self, timeout: float) -> bool:
+        """
+        Waits until every queued message has been sent or has failed (e.g. at shutdown).
+
+        Returns:
+            bool: False if messages were still queued after `timeout` seconds.
+        """
+        deadline = time.monotonic() + timeout
+        while self.queue_depths():
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def queue_depths(self) -> dict:
+        """
+        Returns the number of queued (unsent) messages per sending number.
+        """
+        with self._lock:
+            return {number: len(queue) for number, queue in self._queues.items()}
+
+    def _drain(self, from_number: str):
+        while True:
+            with self._lock:
+                queue = self._queues[from_number]
+                if not queue:
+                    # Queue exhausted: retire this worker, the next submit starts a new one
+                    del self._queues[from_number]
+                    return
+                message = queue[0]
+
+            wait = self._next_send.get(from_number, 0) - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+
+            message.attempts += 1
+            try:
+                sid = message.context.run(
+                    twilio_proxy.send_sms, from_number=from_number, to_number=message.to_number, body=message.body
+                )
+                self._next_send[from_number] = time.monotonic() + self.interval
+                outcome = (sid, None)
+            except Exception as e:
+                if is_throttling_error(e) and message.attempts <= self.max_retries:
+                    # Keep the message at the head of the queue to preserve order
+                    backoff = self.backoff_seconds * (2 ** (message.attempts - 1))
+                    log_info(f"Twilio throttled {from_number}; retry {message.attempts} in {backoff:.1f}s")
+                    self._next_send[from_number] = time.monotonic() + max(backoff, self.interval)
+                    continue
+                self._next_send[from_number] = time.monotonic() + self.interval
+                outcome = (None, e)
+
+            with self._lock:
+                queue.popleft()
+
+            sid, error = outcome
+            if error is not None:
+                message.future.set_exception(error)
+            else:
+                message.future.set_result(sid)
+
+# Process-wide scheduler used by the routers
+scheduler = OutboundScheduler()
+
+Gauge("sms_queue_depth", "Outbound SMS waiting to be sent, all sending numbers.", lambda: sum(scheduler.queue_depths().values()))
+Gauge("sms_active_senders", "Sending numbers with queued outbound SMS.", lambda: len(scheduler.queue_depths()))
+
+def queue_sms(from_number: str, to_number: str, body: str, message_id: str = None, on_failure=None) -> Future:
+    """
+    Queues an SMS on the per-number paced queue and returns without waiting.
+
+    When the message has gone out, the Messages row `message_id` is marked
+    Sent. When it finally fails, the row stays Pending for the retry worker and
+    `on_failure(error)` is called. Both run on the sending thread.
+
+    Args:
+        from_number (str): The Twilio number to send FROM.
+        to_number (str): The destination number.
+        body (str): The message content.
+        message_id (str, optional): The Messages record of this SMS.
+        on_failure (callable, optional): Called with the final send error.
+
+    Returns:
+        Future: Resolves to the Message SID, or raises the final send error.
+    """
+    with tracing.span("queue_sms"):
+        future = scheduler.submit(from_number, to_number, body)
+
+    def settle(done: Future):
+        error = done.exception()
+        if error is None:
+            if message_id:
+                from services.airtable_client import update_message_status
+                update_message_status(message_id, "Sent")
+            return
+        log_error(f"Failed to send SMS {from_number} -> {to_number}", str(error))
+        if on_failure is not None:
+            try:
+                on_failure(error)
+            except Exception as e:
+                log_error("SMS failure handler failed", str(e))
+
+    future.add_done_callback(settle)
+    return future
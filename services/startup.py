@@ -0,0 +1,130 @@
+"""
+Startup Warm-Up
+===============
+This script gets a new replica ready to route messages before it takes traffic.
+
+Key Functionality:
+- Runs the warm-up steps concurrently, off the event loop:
+    - Loads the phone directory: from the local snapshot plus recent changes
+      when there is one, otherwise Sitters, Clients and Number Inventory are
+      read in full, in parallel (this is also where pyairtable is first imported).
+    - Builds the Twilio client and loads its Proxy/Messages modules.
+    - Syncs the local read replica, if enabled (incrementally when its
+      database survived the restart).
+- Reports progress through `readiness`, served at GET /ready (503 until done).
+- Retries a failed warm-up (e.g. Airtable unreachable) until it succeeds.
+- Starts the periodic background jobs (directory refresher, replica sync,
+  error count flusher, audit rollups, message archiver, session reaper,
+  deallocation worker) only once the process is ready, so they don't compete
+  with the warm-up for Airtable's request budget.
+
+The process starts listening straight away (GET / answers immediately); load
+balancers and the Docker healthcheck should route on /ready.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import settings
+from services import twilio_proxy
+from services.directory import directory, async_run_refresher
+from services.error_counts import async_run_error_count_flusher
+from services.audit import async_run_audit_rollups
+from services.replica import replica, async_run_replica_sync
+from services.message_archive import archiver, async_run_message_archiver
+from services.session_reaper import async_run_session_reaper
+from utils.logger import log_info, log_error
+
+WARM_UP_RETRY_SECONDS = 5
+
+class Readiness:
+    """
+    Warm-up state of this process.
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.ready = False
+        self.ready_at = None
+        self.steps = {}       # step name -> seconds taken
+        self.attempts = 0
+        self.last_error = None
+
+    def status(self) -> dict:
+        status = {
+            "ready": self.ready,
+            "uptime_seconds": round(time.monotonic() - self.started, 3),
+            "steps": dict(self.steps),
+            "attempts": self.attempts,
+        }
+        if self.ready_at is not None:
+            status["ready_after_seconds"] = round(self.ready_at - self.started, 3)
+        if self.last_error and not self.ready:
+            status["last_error"] = self.last_error
+        return status
+
+# Process-wide readiness served at /ready
+readiness = Readiness()
+
+def _timed(step):
+    start = time.perf_counter()
+    step()
+    return time.perf_counter() - start
+
+def warm_up():
+    """
+    Runs every warm-up step concurrently and waits for all of them.
+
+    Raises:
+        Exception: The first step failure (the others still run to completion).
+    """
+    steps = {"directory": directory.warm_start, "twilio": twilio_proxy.warm_up}
+    if replica.enabled:
+        steps["replica"] = replica.sync
+    with ThreadPoolExecutor(max_workers=len(steps), thread_name_prefix="warm-up") as pool:
+        futures = {name: pool.submit(_timed, step) for name, step in steps.items()}
+        errors = []
+        for name, future in futures.items():
+            try:
+                readiness.steps[name] = round(future.result(), 3)
+            except Exception as e:
+                errors.append(e)
+    if errors:
+        raise errors[0]
+
+async def async_warm_up():
+    """
+    Warms up in a worker thread, retrying until it succeeds, then marks the
+    process ready and starts the background jobs.
+    """
+    await asyncio.to_thread(log_info, "Starting Phone Masking Service")
+    await asyncio.to_thread(log_info, f"Loaded configuration for environment: {settings.AIRTABLE_BASE_ID}")
+
+    while True:
+        readiness.attempts += 1
+        try:
+            await asyncio.to_thread(warm_up)
+            break
+        except Exception as e:
+            readiness.last_error = str(e)
+            await asyncio.to_thread(log_error, f"Startup warm-up failed (attempt {readiness.attempts}), retrying", str(e))
+            await asyncio.sleep(WARM_UP_RETRY_SECONDS)
+
+    readiness.ready = True
+    readiness.ready_at = time.monotonic()
+    await asyncio.to_thread(
+        log_info, f"Ready after {readiness.ready_at - readiness.started:.2f}s", str(readiness.steps)
+    )
+
+    # Automated 14-day deallocation worker and directory refresher
+    from services.deallocate_worker import async_run_worker
+    asyncio.create_task(async_run_worker())
+    asyncio.create_task(async_run_refresher())
+    asyncio.create_task(async_run_error_count_flusher())
+    asyncio.create_task(async_run_audit_rollups())
+    if replica.enabled:
+        asyncio.create_task(async_run_replica_sync())
+    if archiver.enabled:
+        asyncio.create_task(async_run_message_archiver())
+    if settings.SESSION_REAPER_INTERVAL_SECONDS:
+        asyncio.create_task(async_run_session_reaper())
@@ -9,6 +9,7 @@ Key Functionality:
 - Handles the expiration process: closing the Twilio session and logging the event.
 
 This ensures that old, unused sessions are cleaned up and do not persist indefinitely.
+services/session_reaper.py does the same for every session of the Proxy service at once.
 """
 
 from datetime import datetime, timedelta, timezone
@@ -18,12 +19,13 @@ from utils.logger import log_info, log_error
 
 TTL_DAYS = 14
 
-def is_ttl_expired(client_record: dict) -> bool:
+def is_ttl_expired(client_record: dict, now: datetime = None) -> bool:
     """
     Checks if a client's session has expired based on their last activity.
     
     Args:
         client_record (dict): The client's Airtable record containing 'Last Active'.
+        now (datetime, optional): Timezone-aware reference time (default: now).
         
     Returns:
         bool: True if the session is expired (inactive > TTL_DAYS), False otherwise.
@@ -35,7 +37,7 @@ def is_ttl_expired(client_record: dict) -> bool:
     try:
         # Airtable returns ISO strings with timezones, make comparison aware
         last_active = datetime.fromisoformat(last_active_str.replace('Z', '+00:00'))
-        if datetime.now(timezone.utc) - last_active > timedelta(days=TTL_DAYS):
+        if (now or datetime.now(timezone.utc)) - last_active > timedelta(days=TTL_DAYS):
             return True
     except Exception as e:
         log_error("Error parsing Last Active date", str(e))
@@ -6,20 +6,79 @@ This script handles all direct interactions with the Twilio Proxy API.
 Key Functionality:
 - Creates and manages Proxy Sessions (conversations).
 - Adds participants (Client and Sitter) to sessions.
-- Handles session termination (closing).
+- Handles session termination (closing) and lists the service's sessions.
 - Manages proxy phone number assignments within sessions.
 
 The Twilio Proxy service is responsible for the core logic of masking phone numbers,
 ensuring that neither party sees the other's real contact information.
+
+The Twilio SDK is imported and the REST client built on first use; the SDK
+then loads each API domain (Proxy, Messages) the first time it is touched,
+which `warm_up()` does at startup.
 """
 
-from twilio.rest import Client
+import threading
+from urllib.parse import urlsplit
 from config import settings
 from utils.logger import log_info, log_error
+from utils.metrics import instrumented, record_response
+
+def _build_client():
+    """
+    The Twilio REST client (the SDK is imported here, not at module import).
+    """
+    from twilio.http.http_client import TwilioHttpClient
+    from twilio.rest import Client
+
+    class _MeteredHttpClient(TwilioHttpClient):
+        """
+        Reports every response status to the metrics and, when `base_url` is set,
+        sends every *.twilio.com request there instead (local stand-in server).
+        """
+
+        def __init__(self, base_url: str = "", **kwargs):
+            super().__init__(**kwargs)
+            self.base_url = base_url.rstrip("/")
+
+        def request(self, method, url, *args, **kwargs):
+            parts = urlsplit(url)
+            if self.base_url and parts.hostname and parts.hostname.endswith("twilio.com"):
+                url = self.base_url + parts.path + (f"?{parts.query}" if parts.query else "")
+            response = super().request(method, url, *args, **kwargs)
+            record_response("twilio", response.status_code)
+            return response
+
+    http_client = _MeteredHttpClient(settings.TWILIO_API_URL)
+    return Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN, http_client=http_client)
+
+class _LazyClient:
+    """
+    Stands in for the Twilio REST client until it is first used.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
 
-client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+    def __getattr__(self, attribute):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = _build_client()
+        return getattr(self._client, attribute)
+
+client = _LazyClient()
 service_sid = settings.TWILIO_PROXY_SERVICE_SID
 
+def warm_up():
+    """
+    Builds the client and loads the Proxy and Messages API modules (no HTTP
+    requests), so the first webhook doesn't pay for them.
+    """
+    client.proxy.v1.services(service_sid).sessions
+    client.messages
+
+@instrumented("twilio")
 def create_session(sitter_id: str, client_id: str):
     """
     Creates a new Proxy Session in Twilio.
@@ -47,6 +106,7 @@ def create_session(sitter_id: str, client_id: str):
         log_error("Failed to create Twilio Session", str(e))
         raise e
 
+@instrumented("twilio")
 def add_participant(session_sid: str, identifier: str, proxy_identifier: str = None):
     """
     Adds a participant (user) to an existing Proxy Session.
@@ -74,6 +134,7 @@ def add_participant(session_sid: str, identifier: str, proxy_identifier: str = N
         log_error("Failed to add participant", str(e))
         raise e
 
+@instrumented("twilio")
 def get_participant(session_sid: str, participant_sid: str):
     """
     Retrieves a participant's details from a session.
@@ -88,6 +149,7 @@ def get_participant(session_sid: str, participant_sid: str):
         log_error(f"Failed to fetch participant {participant_sid}", str(e))
         return None
 
+@instrumented("twilio")
 def list_participants(session_sid: str):
     """
     Lists all participants in a session.
@@ -102,6 +164,7 @@ def list_participants(session_sid: str):
         log_error(f"Failed to list participants for session {session_sid}", str(e))
         return []
 
+@instrumented("twilio")
 def remove_participant(session_sid: str, participant_sid: str):
     """
     Removes a participant from a session.
@@ -117,6 +180,7 @@ def remove_participant(session_sid: str, participant_sid: str):
         log_error(f"Failed to remove participant {participant_sid}", str(e))
         return False
 
+@instrumented("twilio")
 def send_session_message(session_sid: str, participant_sid: str, body: str):
     """
     Sends a message through a Proxy session as a specific participant.
@@ -133,17 +197,21 @@ def send_session_message(session_sid: str, participant_sid: str, body: str):
         log_error(f"Failed to send session message through Proxy", str(e))
         return None
 
-def close_session(session_sid: str):
+@instrumented("twilio")
+def close_session(session_sid: str, status: str = None):
     """
     Terminates a Proxy Session.
     
     Args:
         session_sid (str): The Session SID to close.
+        status (str, optional): The session's current status, when the caller
+            already has it (e.g. from `list_sessions`); skips the fetch.
     """
     try:
         # Check if it's already closed to avoid redundant requests
-        session = client.proxy.v1.services(service_sid).sessions(session_sid).fetch()
-        if session.status == "closed":
+        if status is None:
+            status = client.proxy.v1.services(service_sid).sessions(session_sid).fetch().status
+        if status == "closed":
             return True
             
         client.proxy.v1.services(service_sid).sessions(session_sid).update(status="closed")
@@ -156,6 +224,19 @@ def close_session(session_sid: str):
         log_error("Failed to close session", str(e))
         return False
 
+def list_sessions(page_size: int = 100):
+    """
+    Pages through every session of the Proxy service (open and closed).
+    
+    Args:
+        page_size (int): Sessions per request (Twilio's maximum is 1000).
+        
+    Returns:
+        iterator: Session instances (sid, status, date_created, date_expiry, ...),
+        fetched one page at a time as the iterator is consumed.
+    """
+    return client.proxy.v1.services(service_sid).sessions.stream(page_size=page_size)
+
 def update_proxy_number(session_sid: str, participant_sid: str, new_number: str):
     """
     Updates the proxy number assigned to a participant in a session.
@@ -180,6 +261,7 @@ def update_proxy_number(session_sid: str, participant_sid: str, new_number: str)
 def log_message_to_twilio():
     pass
 
+@instrumented("twilio")
 def search_and_purchase_number(area_code: str, number_type: str = "local"):
     """
     Search for and purchase a phone number from Twilio.
@@ -233,6 +315,7 @@ def search_and_purchase_number(area_code: str, number_type: str = "local"):
         log_error("Failed to purchase number", str(e))
         raise e
 
+@instrumented("twilio")
 def add_number_to_proxy_service(phone_number: str):
     """
     Add a purchased phone number to the Twilio Proxy Service.
@@ -259,6 +342,7 @@ def add_number_to_proxy_service(phone_number: str):
         log_error("Failed to add number to Proxy", str(e))
         raise e
 
+@instrumented("twilio")
 def send_sms(from_number: str, to_number: str, body: str):
     """
     Sends a standard programmable SMS (bypassing Proxy Sessions).
@@ -0,0 +1,92 @@
+"""
+Unit of Work Service
+====================
+This script collects Airtable field changes made while handling one request and
+writes them out together at the end.
+
+Key Functionality:
+- Merges every PATCH aimed at the same record into a single update.
+- Writes whose failure must change the response (a pool number assignment)
+  bypass it; `written()` drops older staged values of the fields they set.
+- Commits pending changes with one batch update per table (10 records per request).
+
+A webhook handler wraps its work in `with unit_of_work():`. Helpers in
+airtable_client stage their writes on the active unit of work when there is one
+and write immediately otherwise, so background jobs behave exactly as before.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from utils.logger import log_error
+from utils import tracing
+
+_current = ContextVar("airtable_unit_of_work", default=None)
+
+class UnitOfWork:
+    """
+    Pending Airtable updates for one request, keyed by table and record ID.
+    """
+
+    def __init__(self):
+        self._tables = {}    # table name -> pyairtable Table
+        self._pending = {}   # table name -> {record_id: merged fields}
+
+    def stage(self, table, record_id: str, fields: dict):
+        """
+        Queues field changes for a record, merging with earlier changes to it.
+        """
+        self._tables[table.name] = table
+        self._pending.setdefault(table.name, {}).setdefault(record_id, {}).update(fields)
+
+    def written(self, table, record_id: str, fields: dict):
+        """
+        Records fields written directly (not staged), so that an older staged
+        value for the same field does not overwrite them at commit.
+        """
+        staged = self._pending.get(table.name, {}).get(record_id)
+        if staged:
+            for field in fields:
+                staged.pop(field, None)
+
+    def pending_count(self) -> int:
+        return sum(len(records) for records in self._pending.values())
+
+    def commit(self):
+        """
+        Writes all staged changes: one update per record, batched per table.
+        """
+        pending, self._pending = self._pending, {}
+        for table_name, records in pending.items():
+            table = self._tables[table_name]
+            updates = [{"id": record_id, "fields": fields} for record_id, fields in records.items() if fields]
+            if not updates:
+                continue
+            with tracing.span("unit_of_work.commit", kind="client", table=table_name, records=len(updates)) as span:
+                try:
+                    if len(updates) == 1:
+                        table.update(updates[0]["id"], updates[0]["fields"])
+                    else:
+                        table.batch_update(updates)
+                except Exception as e:
+                    span.mark_error()
+                    log_error(f"Failed to commit {len(updates)} pending update(s) to {table_name}", str(e))
+
+def current_unit_of_work():
+    """
+    Returns the unit of work active in this context, or None.
+    """
+    return _current.get()
+
+@contextmanager
+def unit_of_work():
+    """
+    Activates a unit of work for the enclosed block and commits it on exit,
+    including when the block returns early or raises.
+    """
+    uow = UnitOfWork()
+    token = _current.set(uow)
+    try:
+        yield uow
+    finally:
+        _current.reset(token)
+        uow.commit()
@@ -0,0 +1,30 @@
+# Simulators package: offline stand-ins for Airtable and Twilio (benchmarks, soak tests)
+
+def install_fakes(base, twilio_client):
+    """
+    Points the service modules at in-process fakes instead of the real SDK clients.
+
+    Args:
+        base (FakeBase): Fake Airtable base providing the tables.
+        twilio_client (FakeTwilioClient): Fake Twilio REST client.
+    """
+    from config import settings
+    from services import airtable_client, twilio_proxy
+
+    def table(name):
+        # Behind the client's table wrapper, so writes reach the read replica as in production
+        wrapper = airtable_client._LazyTable(name)
+        wrapper._table = base.table(name)
+        return wrapper
+
+    airtable_client.sitters_table = table(settings.AIRTABLE_SITTERS_TABLE)
+    airtable_client.clients_table = table(settings.AIRTABLE_CLIENTS_TABLE)
+    airtable_client.messages_table = table(settings.AIRTABLE_MESSAGES_TABLE)
+    airtable_client.inventory_table = table(settings.AIRTABLE_NUMBER_INVENTORY_TABLE)
+    airtable_client.audit_table = table(settings.AIRTABLE_AUDIT_LOG_TABLE)
+
+    # Modules that imported a table object directly
+    import routers.numbers
+    routers.numbers.inventory_table = airtable_client.inventory_table
+
+    twilio_proxy.client = twilio_client
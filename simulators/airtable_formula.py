@@ -0,0 +1,207 @@
+"""
+Airtable Formula Evaluator
+==========================
+Evaluates the subset of Airtable formula syntax this service sends in
+`filterByFormula`, against an in-memory record.
+
+Supported:
+- String and number literals, `{Field}` references, `&` concatenation
+- Comparisons: =, !=, <, >, <=, >=
+- OR, AND, NOT, IF, SEARCH, FIND, LEN, LOWER, UPPER, TRIM, RECORD_ID,
+  LAST_MODIFIED_TIME, CREATED_TIME, IS_BEFORE, IS_AFTER, TRUE, FALSE, BLANK
+
+Linked-record and other list values behave like Airtable's text rendering
+(items joined with ", ").
+"""
+
+import re
+from datetime import datetime, timezone
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<string>'(?:\\.|[^'\\])*'|"(?:\\.|[^"\\])*")
+      | (?P<number>\d+(?:\.\d+)?)
+      | (?P<field>\{[^}]*\})
+      | (?P<op><=|>=|!=|=|<|>|&|\(|\)|,)
+      | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+    )""", re.VERBOSE)
+
+
+class FormulaError(ValueError):
+    pass
+
+
+def _tokenize(formula: str):
+    pos, tokens = 0, []
+    formula = formula.rstrip()
+    while pos < len(formula):
+        match = _TOKEN.match(formula, pos)
+        if not match:
+            raise FormulaError(f"Unexpected input at {pos}: {formula[pos:pos + 20]!r}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "string":
+            value = re.sub(r"\\(.)", r"\1", value[1:-1])
+        elif kind == "number":
+            value = float(value) if "." in value else int(value)
+        elif kind == "field":
+            value = value[1:-1]
+        tokens.append((kind, value))
+        pos = match.end()
+    return tokens
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, list):
+        return ", ".join(_text(v) for v in value)
+    return str(value)
+
+
+def _truthy(value) -> bool:
+    if isinstance(value, list):
+        return len(value) > 0
+    return bool(value) and value != "0"
+
+
+def _parse_time(value):
+    text = _text(value)
+    if not text:
+        return None
+    dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _compare(op, left, right):
+    if isinstance(left, (int, float)) or isinstance(right, (int, float)):
+        try:
+            left, right = float(_text(left) or 0), float(_text(right) or 0)
+        except ValueError:
+            left, right = _text(left), _text(right)
+    else:
+        left, right = _text(left), _text(right)
+    return {
+        "=": left == right, "!=": left != right,
+        "<": left < right, ">": left > right,
+        "<=": left <= right, ">=": left >= right,
+    }[op]
+
+
+def _find(needle, haystack, case_sensitive):
+    needle, haystack = _text(needle), _text(haystack)
+    if not case_sensitive:
+        needle, haystack = needle.lower(), haystack.lower()
+    return haystack.find(needle) + 1
+
+
+class _Parser:
+    def __init__(self, tokens, record):
+        self.tokens = tokens
+        self.pos = 0
+        self.record = record
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, expected=None):
+        token = self.peek()
+        if expected is not None and token[1] != expected:
+            raise FormulaError(f"Expected {expected!r}, got {token[1]!r}")
+        self.pos += 1
+        return token
+
+    def parse(self):
+        value = self.expression()
+        if self.pos != len(self.tokens):
+            raise FormulaError(f"Trailing input: {self.tokens[self.pos:]}")
+        return value
+
+    def expression(self):
+        left = self.concat()
+        kind, op = self.peek()
+        if kind == "op" and op in ("=", "!=", "<", ">", "<=", ">="):
+            self.take()
+            return _compare(op, left, self.concat())
+        return left
+
+    def concat(self):
+        value = self.primary()
+        while self.peek() == ("op", "&"):
+            self.take()
+            value = _text(value) + _text(self.primary())
+        return value
+
+    def primary(self):
+        kind, value = self.take()
+        if kind in ("string", "number"):
+            return value
+        if kind == "field":
+            return self.record.get("fields", {}).get(value)
+        if kind == "op" and value == "(":
+            inner = self.expression()
+            self.take(")")
+            return inner
+        if kind == "name":
+            args = []
+            if self.peek() == ("op", "("):
+                self.take()
+                while self.peek() != ("op", ")"):
+                    args.append(self.expression())
+                    if self.peek() == ("op", ","):
+                        self.take()
+                self.take(")")
+            return self.call(value.upper(), args)
+        raise FormulaError(f"Unexpected token {value!r}")
+
+    def call(self, name, args):
+        if name == "OR":
+            return any(_truthy(a) for a in args)
+        if name == "AND":
+            return all(_truthy(a) for a in args)
+        if name == "NOT":
+            return not _truthy(args[0])
+        if name == "IF":
+            return args[1] if _truthy(args[0]) else (args[2] if len(args) > 2 else "")
+        if name == "SEARCH":
+            return _find(args[0], args[1], case_sensitive=False)
+        if name == "FIND":
+            return _find(args[0], args[1], case_sensitive=True)
+        if name == "LEN":
+            return len(_text(args[0]))
+        if name == "LOWER":
+            return _text(args[0]).lower()
+        if name == "UPPER":
+            return _text(args[0]).upper()
+        if name == "TRIM":
+            return _text(args[0]).strip()
+        if name == "RECORD_ID":
+            return self.record.get("id")
+        if name == "LAST_MODIFIED_TIME":
+            return self.record.get("_modified") or self.record.get("createdTime")
+        if name == "CREATED_TIME":
+            return self.record.get("createdTime")
+        if name in ("IS_BEFORE", "IS_AFTER"):
+            left, right = _parse_time(args[0]), _parse_time(args[1])
+            if left is None or right is None:
+                return False
+            return left < right if name == "IS_BEFORE" else left > right
+        if name == "TRUE":
+            return True
+        if name == "FALSE":
+            return False
+        if name == "BLANK":
+            return ""
+        raise FormulaError(f"Unsupported function {name}()")
+
+
+def matches(formula: str, record: dict) -> bool:
+    """
+    True if `record` ({"id", "createdTime", "fields", "_modified"}) satisfies `formula`.
+    An empty formula matches everything.
+    """
+    if not formula:
+        return True
+    return _truthy(_Parser(_tokenize(formula), record).parse())
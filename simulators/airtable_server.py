@@ -0,0 +1,232 @@
+"""
+Airtable Stand-In Server
+========================
+A local HTTP server speaking the subset of the Airtable REST API that
+`services/airtable_client.py` (pyairtable) uses, for soak and load tests.
+
+Key Functionality:
+- List records (GET and POST `listRecords`) with filterByFormula, fields[],
+  maxRecords, pageSize/offset and sort.
+- Get, create, update (PATCH/PUT), delete; batch create/update/upsert/delete
+  with Airtable's 10-records-per-request cap.
+- Rate limiting at Airtable's quotas: 5 requests/second per base and
+  50 requests/second per token; exceeding either returns 429 and locks the
+  caller out for 30 seconds.
+- Latency and 5xx injection, request accounting (`GET /__stats`).
+
+Usage:
+    python -m simulators.airtable_server --port 8181 --seed seed.json --latency-ms 150
+    AIRTABLE_API_URL=http://127.0.0.1:8181 uvicorn main:app
+
+The seed file maps table names to lists of field dicts (or {"id", "fields"}
+records, as written by `benchmarks/replay_webhooks.py --export-seed`).
+"""
+
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from urllib.parse import unquote
+import requests
+from simulators.fake_airtable import CallCounter, FakeBase, Latency
+from simulators.stand_in import StandInHandler, StandInServer, add_fault_arguments, faults_from_args
+
+MAX_RECORDS_PER_REQUEST = 10
+MAX_PAGE_SIZE = 100
+
+class RateWindow:
+    """
+    Sliding one-second request window with a lockout once it is exceeded.
+    """
+
+    def __init__(self, limit: float, penalty_seconds: float):
+        self.limit = limit
+        self.penalty_seconds = penalty_seconds
+        self._hits = {}
+        self._locked_until = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key: str) -> float:
+        """
+        Records a request for `key`. Returns 0 if allowed, otherwise the
+        seconds left in the lockout.
+        """
+        if not self.limit:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            locked_until = self._locked_until.get(key, 0)
+            if now < locked_until:
+                return locked_until - now
+            hits = self._hits.setdefault(key, deque())
+            while hits and now - hits[0] >= 1.0:
+                hits.popleft()
+            if len(hits) >= self.limit:
+                self._locked_until[key] = now + self.penalty_seconds
+                return self.penalty_seconds
+            hits.append(now)
+            return 0.0
+
+class AirtableServer(StandInServer):
+    def __init__(self, address, faults, base: FakeBase = None, base_rate: float = 5,
+                 token_rate: float = 50, penalty_seconds: float = 30):
+        self.base = base or FakeBase()
+        super().__init__(address, AirtableHandler, faults, self.base.calls)
+        self.base_window = RateWindow(base_rate, penalty_seconds)
+        self.token_window = RateWindow(token_rate, penalty_seconds)
+
+    def seed(self, tables: dict, modified: str = None):
+        """
+        Loads {table name: [fields or {"id", "fields"}, ...]}, optionally
+        backdated to `modified` (ISO 8601).
+        """
+        for table_name, rows in tables.items():
+            table = self.base.table(table_name)
+            for row in rows:
+                if "fields" in row:
+                    table.seed(row["fields"], row.get("id"), modified)
+                else:
+                    table.seed(row, modified=modified)
+
+class AirtableHandler(StandInHandler):
+    service = "airtable"
+
+    def error_payload(self, status, code, message):
+        if status == 404:
+            return {"error": "NOT_FOUND"}
+        if status == 429:
+            return {"errors": [{"error": "RATE_LIMIT_REACHED", "message": "Rate limit exceeded. Please try again later"}]}
+        if status >= 500:
+            return {"error": {"type": "SERVER_ERROR", "message": message}}
+        return {"error": {"type": "INVALID_REQUEST_UNKNOWN", "message": message}}
+
+    def admit(self):
+        segments = self.path.split("?")[0].strip("/").split("/")
+        base_id = segments[1] if len(segments) > 1 and segments[0] == "v0" else None
+        if base_id is None or base_id.startswith("__"):
+            return None
+        token = self.headers.get("Authorization", "")
+        wait = self.server.base_window.hit(base_id) or self.server.token_window.hit(token)
+        if wait:
+            return 429, self.error_payload(429, 429, ""), {"Retry-After": str(int(wait) + 1)}
+        return None
+
+    # -- routing ----------------------------------------------------------
+    def route(self, method, path, query, body):
+        segments = [unquote(s) for s in path.strip("/").split("/")]
+        if len(segments) < 3 or segments[0] != "v0":
+            raise KeyError(path)
+        table = self.server.base.table(segments[2])
+        rest = segments[3:]
+
+        if not rest:
+            if method == "GET":
+                return 200, self._list(table, self._list_options(query))
+            if method == "POST":
+                return self._create(table, body)
+            if method in ("PATCH", "PUT"):
+                return self._batch_update(table, body, replace=method == "PUT")
+            if method == "DELETE":
+                return self._batch_delete(table, query.get("records[]", []))
+        elif rest == ["listRecords"] and method == "POST":
+            return 200, self._list(table, body)
+        elif len(rest) == 1:
+            record_id = rest[0]
+            try:
+                if method == "GET":
+                    return 200, table.get(record_id)
+                if method in ("PATCH", "PUT"):
+                    return 200, table.update(record_id, body.get("fields", {}), replace=method == "PUT")
+                if method == "DELETE":
+                    if record_id not in table.records:
+                        raise KeyError(record_id)
+                    return 200, table.delete(record_id)
+            except requests.HTTPError:
+                raise KeyError(record_id)
+        raise KeyError(path)
+
+    @staticmethod
+    def _list_options(query: dict) -> dict:
+        options = {
+            "filterByFormula": query.get("filterByFormula", [None])[0],
+            "fields": query.get("fields[]"),
+            "maxRecords": query.get("maxRecords", [None])[0],
+            "pageSize": query.get("pageSize", [None])[0],
+            "offset": query.get("offset", [None])[0],
+            "sort": [],
+        }
+        i = 0
+        while f"sort[{i}][field]" in query:
+            options["sort"].append({
+                "field": query[f"sort[{i}][field]"][0],
+                "direction": query.get(f"sort[{i}][direction]", ["asc"])[0],
+            })
+            i += 1
+        return options
+
+    @staticmethod
+    def _list(table, options: dict) -> dict:
+        table.calls.add(f"airtable.{table.name}.list")
+        sort = [("-" if s.get("direction") == "desc" else "") + s["field"] for s in options.get("sort") or []]
+        max_records = int(options["maxRecords"]) if options.get("maxRecords") else None
+        rows = table.select(options.get("filterByFormula"), options.get("fields"), max_records, sort)
+
+        page_size = min(int(options.get("pageSize") or MAX_PAGE_SIZE), MAX_PAGE_SIZE)
+        start = int(str(options.get("offset") or "itr0")[3:])
+        payload = {"records": rows[start:start + page_size]}
+        if start + page_size < len(rows):
+            payload["offset"] = f"itr{start + page_size}"
+        return payload
+
+    @staticmethod
+    def _check_batch(records: list):
+        if len(records) > MAX_RECORDS_PER_REQUEST:
+            raise ValueError(f"At most {MAX_RECORDS_PER_REQUEST} records per request")
+
+    def _create(self, table, body: dict):
+        if "records" in body:
+            self._check_batch(body["records"])
+            return 200, {"records": table.batch_create(body["records"])}
+        return 200, table.create(body.get("fields", {}))
+
+    def _batch_update(self, table, body: dict, replace: bool):
+        records = body.get("records", [])
+        self._check_batch(records)
+        upsert = body.get("performUpsert")
+        if upsert:
+            return 200, table.batch_upsert(records, upsert["fieldsToMergeOn"], replace=replace)
+        try:
+            return 200, {"records": table.batch_update(records, replace=replace)}
+        except requests.HTTPError as e:
+            raise KeyError(str(e))
+
+    def _batch_delete(self, table, record_ids: list):
+        self._check_batch(record_ids)
+        try:
+            return 200, {"records": table.batch_delete(record_ids)}
+        except requests.HTTPError as e:
+            raise KeyError(str(e))
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Airtable stand-in server.")
+    parser.add_argument("--port", type=int, default=8181)
+    parser.add_argument("--seed", help="JSON file: {table name: [fields, ...]}")
+    parser.add_argument("--base-rate", type=float, default=5, help="requests/second per base (0 = unlimited)")
+    parser.add_argument("--token-rate", type=float, default=50, help="requests/second per token (0 = unlimited)")
+    parser.add_argument("--penalty-seconds", type=float, default=30, help="lockout after exceeding a rate limit")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    server = AirtableServer(
+        (args.host, args.port), faults_from_args(args), FakeBase(Latency(), CallCounter()),
+        args.base_rate, args.token_rate, args.penalty_seconds,
+    )
+    if args.seed:
+        with open(args.seed) as f:
+            server.seed(json.load(f))
+    print(f"Airtable stand-in listening on {server.url}")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Minimal ASGI Client
+===================
+Sends HTTP requests straight into an ASGI app (no sockets, no extra dependencies).
+Lifespan events are not sent, so startup background tasks do not run.
+"""
+
+import asyncio
+import json
+from urllib.parse import urlencode
+
+class Response:
+    def __init__(self, status: int, headers: list, body: bytes):
+        self.status_code = status
+        self.headers = {k.decode().lower(): v.decode() for k, v in headers}
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body)
+
+async def request(app, method: str, path: str, form: dict = None, json_body=None, headers: dict = None) -> Response:
+    """
+    Performs one request against `app` and returns the complete response.
+    """
+    if form is not None:
+        body, content_type = urlencode(form).encode(), "application/x-www-form-urlencoded"
+    elif json_body is not None:
+        body, content_type = json.dumps(json_body).encode(), "application/json"
+    else:
+        body, content_type = b"", "text/plain"
+
+    path_only, _, query = path.partition("?")
+    raw_headers = [(b"content-type", content_type.encode()), (b"content-length", str(len(body)).encode())]
+    raw_headers += [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method.upper(), "scheme": "http", "path": path_only,
+        "raw_path": path_only.encode(), "query_string": query.encode(), "root_path": "",
+        "headers": raw_headers, "server": ("bench", 80), "client": ("127.0.0.1", 50000),
+    }
+
+    delivered = False
+    async def receive():
+        nonlocal delivered
+        if not delivered:
+            delivered = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Keep the connection "open" until the app is done
+        await asyncio.Event().wait()
+
+    status, resp_headers, chunks = None, [], []
+    async def send(message):
+        nonlocal status, resp_headers
+        if message["type"] == "http.response.start":
+            status, resp_headers = message["status"], message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return Response(status, resp_headers, b"".join(chunks))
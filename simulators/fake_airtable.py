@@ -0,0 +1,258 @@
+"""
+In-Process Fake Airtable
+========================
+Drop-in stand-ins for pyairtable `Table` objects backed by in-memory records.
+
+Key Functionality:
+- Implements the Table methods this service uses (all/iterate/first/get,
+  create/update/delete and their batch variants, batch_upsert).
+- Evaluates `formula=` with the local formula evaluator and honours
+  `fields=` projection and `max_records=`.
+- Injects configurable latency per request and counts every request the way
+  Airtable would bill it (a batch of 25 records is 3 requests).
+"""
+
+import itertools
+import math
+import random
+import threading
+import time
+from datetime import datetime, timezone
+import requests
+from simulators.airtable_formula import matches
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+class Latency:
+    """
+    Per-request delay around `mean_ms`.
+
+    Distributions:
+    - "uniform": within +/- `jitter` (fraction) of the mean
+    - "lognormal": long right tail, `jitter` is the log-space sigma
+    - "exponential": memoryless, occasional very slow requests
+    """
+
+    DISTRIBUTIONS = ("uniform", "lognormal", "exponential")
+
+    def __init__(self, mean_ms: float = 0.0, jitter: float = 0.5, distribution: str = "uniform"):
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution {distribution!r}")
+        self.mean_ms = mean_ms
+        self.jitter = jitter
+        self.distribution = distribution
+
+    def sample(self) -> float:
+        if self.mean_ms <= 0:
+            return 0.0
+        if self.distribution == "lognormal":
+            # Pick mu so the distribution's mean stays at mean_ms
+            mu = math.log(self.mean_ms) - self.jitter ** 2 / 2
+            return random.lognormvariate(mu, self.jitter) / 1000.0
+        if self.distribution == "exponential":
+            return random.expovariate(1.0 / self.mean_ms) / 1000.0
+        low, high = 1 - self.jitter, 1 + self.jitter
+        return self.mean_ms * random.uniform(low, high) / 1000.0
+
+    def wait(self):
+        delay = self.sample()
+        if delay:
+            time.sleep(delay)
+
+class CallCounter:
+    """
+    Thread-safe tally of external calls, keyed like "airtable.Clients.list".
+    """
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def add(self, key: str, n: int = 1):
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + n
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._counts)
+
+    def total(self, prefix: str = "") -> int:
+        with self._lock:
+            return sum(v for k, v in self._counts.items() if k.startswith(prefix))
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+class FakeTable:
+    """
+    An in-memory Airtable table with the pyairtable `Table` interface.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, name: str, latency: Latency = None, calls: CallCounter = None):
+        self.name = name
+        self.latency = latency or Latency()
+        self.calls = calls or CallCounter()
+        self.records = {}
+        self._lock = threading.Lock()
+
+    # -- helpers --------------------------------------------------------
+    def _request(self, op: str, n: int = 1):
+        self.calls.add(f"airtable.{self.name}.{op}", n)
+        for _ in range(n):
+            self.latency.wait()
+
+    def _new_id(self) -> str:
+        return f"rec{next(self._ids):014d}"
+
+    @staticmethod
+    def _project(record: dict, fields) -> dict:
+        out = {"id": record["id"], "createdTime": record["createdTime"], "fields": dict(record["fields"])}
+        if fields:
+            out["fields"] = {k: v for k, v in record["fields"].items() if k in fields}
+        return out
+
+    def seed(self, fields: dict, record_id: str = None, modified: str = None) -> dict:
+        """
+        Inserts a record without counting a request (test setup).
+        `modified` backdates its LAST_MODIFIED_TIME() (ISO 8601, default now).
+        """
+        with self._lock:
+            now = _now_iso()
+            record = {
+                "id": record_id or self._new_id(), "createdTime": modified or now,
+                "_modified": modified or now, "fields": dict(fields),
+            }
+            self.records[record["id"]] = record
+        return self._project(record, None)
+
+    def select(self, formula=None, fields=None, max_records=None, sort=None):
+        """
+        Returns matching records without counting a request.
+
+        `sort` takes pyairtable's form: field names, "-" prefix for descending.
+        """
+        with self._lock:
+            rows = [r for r in self.records.values() if matches(formula, r)]
+        for key in reversed(sort or []):
+            descending = key.startswith("-")
+            name = key.lstrip("-")
+            rows.sort(key=lambda r: (r["fields"].get(name) is None, str(r["fields"].get(name, ""))), reverse=descending)
+        if max_records:
+            rows = rows[:max_records]
+        return [self._project(r, fields) for r in rows]
+
+    # -- reads ----------------------------------------------------------
+    def iterate(self, formula=None, fields=None, max_records=None, page_size=100, sort=None, **_):
+        rows = self.select(formula, fields, max_records, sort)
+        page_size = page_size or 100
+        pages = max(1, math.ceil(len(rows) / page_size))
+        for i in range(pages):
+            self._request("list")
+            yield rows[i * page_size:(i + 1) * page_size]
+
+    def all(self, **options):
+        return [r for page in self.iterate(**options) for r in page]
+
+    def first(self, **options):
+        options["max_records"] = 1
+        rows = self.all(**options)
+        return rows[0] if rows else None
+
+    def get(self, record_id: str, fields=None, **_):
+        self._request("get")
+        with self._lock:
+            record = self.records.get(record_id)
+        if record is None:
+            response = requests.Response()
+            response.status_code = 404
+            raise requests.HTTPError(f"404 Client Error: NOT_FOUND for {record_id}", response=response)
+        return self._project(record, fields)
+
+    # -- writes ---------------------------------------------------------
+    def _write(self, record_id, fields, replace=False):
+        with self._lock:
+            record = self.records.get(record_id)
+            if record is None:
+                response = requests.Response()
+                response.status_code = 404
+                raise requests.HTTPError(f"404 Client Error: NOT_FOUND for {record_id}", response=response)
+            if replace:
+                record["fields"] = {}
+            record["fields"].update(fields)
+            record["_modified"] = _now_iso()
+            return self._project(record, None)
+
+    def create(self, fields: dict, typecast=False, **_):
+        self._request("create")
+        return self.seed(fields)
+
+    def batch_create(self, records, typecast=False, **_):
+        records = list(records)
+        self._request("create", math.ceil(len(records) / 10))
+        return [self.seed(r.get("fields", r)) for r in records]
+
+    def update(self, record_id: str, fields: dict, replace=False, typecast=False, **_):
+        self._request("update")
+        return self._write(record_id, fields, replace)
+
+    def batch_update(self, records, replace=False, typecast=False, **_):
+        records = list(records)
+        self._request("update", math.ceil(len(records) / 10))
+        return [self._write(r["id"], r["fields"], replace) for r in records]
+
+    def batch_upsert(self, records, key_fields, replace=False, typecast=False, **_):
+        records = list(records)
+        self._request("upsert", math.ceil(len(records) / 10))
+        created, updated, out = [], [], []
+        for item in records:
+            fields = item.get("fields", {})
+            with self._lock:
+                existing = next(
+                    (r for r in self.records.values()
+                     if all(r["fields"].get(k) == fields.get(k) for k in key_fields)),
+                    None
+                )
+            if existing:
+                out.append(self._write(existing["id"], fields, replace))
+                updated.append(existing["id"])
+            else:
+                record = self.seed(fields)
+                out.append(record)
+                created.append(record["id"])
+        return {"createdRecords": created, "updatedRecords": updated, "records": out}
+
+    def delete(self, record_id: str):
+        return self.batch_delete([record_id])[0]
+
+    def batch_delete(self, record_ids):
+        record_ids = list(record_ids)
+        self._request("delete", math.ceil(len(record_ids) / 10))
+        with self._lock:
+            # Like Airtable, one missing record fails the whole request
+            missing = next((record_id for record_id in record_ids if record_id not in self.records), None)
+            if missing is not None:
+                response = requests.Response()
+                response.status_code = 404
+                raise requests.HTTPError(f"404 Client Error: NOT_FOUND for {missing}", response=response)
+            for record_id in record_ids:
+                del self.records[record_id]
+        return [{"id": record_id, "deleted": True} for record_id in record_ids]
+
+class FakeBase:
+    """
+    A set of FakeTables sharing one latency model and call counter.
+    """
+
+    def __init__(self, latency: Latency = None, calls: CallCounter = None):
+        self.latency = latency or Latency()
+        self.calls = calls or CallCounter()
+        self.tables = {}
+
+    def table(self, name: str) -> FakeTable:
+        if name not in self.tables:
+            self.tables[name] = FakeTable(name, self.latency, self.calls)
+        return self.tables[name]
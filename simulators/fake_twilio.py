@@ -0,0 +1,137 @@
+"""
+In-Process Fake Twilio
+======================
+A stand-in for `twilio.rest.Client` covering the calls `twilio_proxy.py` makes:
+Messages, Proxy sessions/participants/phone numbers and number purchase.
+
+Every call is counted (e.g. "twilio.messages.create") and delayed by the
+configured latency model.
+"""
+
+import itertools
+import threading
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from simulators.fake_airtable import CallCounter, Latency
+
+_sids = itertools.count(1)
+
+def _sid(prefix: str) -> str:
+    return f"{prefix}{next(_sids):032x}"
+
+class _Resource:
+    def __init__(self, client, name):
+        self._client = client
+        self._name = name
+
+    def _request(self, op):
+        self._client.calls.add(f"twilio.{self._name}.{op}")
+        self._client.latency.wait()
+
+class _Messages(_Resource):
+    def create(self, body=None, from_=None, to=None, **kwargs):
+        self._request("create")
+        message = SimpleNamespace(sid=_sid("SM"), body=body, from_=from_, to=to, status="queued")
+        with self._client.lock:
+            self._client.sent.append(message)
+        return message
+
+class _Session(_Resource):
+    def __init__(self, client, session_sid):
+        super().__init__(client, "proxy.sessions")
+        self.sid = session_sid
+
+    def fetch(self):
+        self._request("fetch")
+        session = self._client.sessions.get(self.sid)
+        if session is None:
+            raise Exception(f"The requested resource {self.sid} was not found")
+        return session
+
+    def update(self, status=None, **kwargs):
+        self._request("update")
+        session = self._client.sessions.get(self.sid)
+        if session is None:
+            raise Exception(f"The requested resource {self.sid} was not found")
+        if status:
+            session.status = status
+        return session
+
+    @property
+    def participants(self):
+        return _Participants(self._client, self.sid)
+
+class _Sessions(_Resource):
+    def __init__(self, client):
+        super().__init__(client, "proxy.sessions")
+
+    def __call__(self, session_sid):
+        return _Session(self._client, session_sid)
+
+    def create(self, unique_name=None, ttl=None, **kwargs):
+        self._request("create")
+        now = datetime.now(timezone.utc)
+        session = SimpleNamespace(
+            sid=_sid("KC"), unique_name=unique_name, status="open", date_created=now,
+            date_updated=now, date_expiry=now + timedelta(seconds=ttl) if ttl else None,
+        )
+        with self._client.lock:
+            self._client.sessions[session.sid] = session
+        return session
+
+    def stream(self, page_size=50, limit=None, **kwargs):
+        sessions = list(self._client.sessions.values())[:limit]
+        for start in range(0, max(1, len(sessions)), page_size):
+            self._request("list")
+            yield from sessions[start:start + page_size]
+
+    def list(self, **kwargs):
+        return list(self.stream(**kwargs))
+
+class _Participants(_Resource):
+    def __init__(self, client, session_sid):
+        super().__init__(client, "proxy.participants")
+        self.session_sid = session_sid
+
+    def create(self, identifier=None, proxy_identifier=None, **kwargs):
+        self._request("create")
+        participant = SimpleNamespace(
+            sid=_sid("KP"), session_sid=self.session_sid, identifier=identifier, proxy_identifier=proxy_identifier
+        )
+        with self._client.lock:
+            self._client.participants.setdefault(self.session_sid, []).append(participant)
+        return participant
+
+    def list(self, **kwargs):
+        self._request("list")
+        with self._client.lock:
+            return list(self._client.participants.get(self.session_sid, []))
+
+class _PhoneNumbers(_Resource):
+    def __init__(self, client):
+        super().__init__(client, "proxy.phone_numbers")
+
+    def create(self, phone_number=None, **kwargs):
+        self._request("create")
+        return SimpleNamespace(sid=_sid("PN"), phone_number=phone_number)
+
+class _Service:
+    def __init__(self, client):
+        self.sessions = _Sessions(client)
+        self.phone_numbers = _PhoneNumbers(client)
+
+class FakeTwilioClient:
+    """
+    Minimal `twilio.rest.Client` replacement with call accounting.
+    """
+
+    def __init__(self, latency: Latency = None, calls: CallCounter = None):
+        self.latency = latency or Latency()
+        self.calls = calls or CallCounter()
+        self.lock = threading.Lock()
+        self.sent = []
+        self.sessions = {}
+        self.participants = {}  # session SID -> participants
+        self.messages = _Messages(self, "messages")
+        service = _Service(self)
+        self.proxy = SimpleNamespace(v1=SimpleNamespace(services=lambda service_sid: service))
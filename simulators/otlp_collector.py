@@ -0,0 +1,121 @@
+"""
+OTLP Collector Stand-In
+=======================
+Receives OTLP/HTTP JSON trace exports (TRACE_OTLP_ENDPOINT) locally and
+appends each trace to a JSON lines file in the same format as
+TRACE_EXPORT_PATH, so `benchmarks/trace_waterfall.py` reads either.
+
+Key Functionality:
+- POST /v1/traces: accepts `ExportTraceServiceRequest` JSON.
+- GET /__stats: received span/trace counts.
+
+Usage:
+    python -m simulators.otlp_collector --port 4318 --output traces.jsonl
+    TRACE_OTLP_ENDPOINT=http://127.0.0.1:4318/v1/traces uvicorn main:app
+"""
+
+import argparse
+import json
+import threading
+from simulators.fake_airtable import CallCounter
+from simulators.stand_in import Faults, StandInHandler, StandInServer
+
+def _attribute_value(value: dict):
+    if "intValue" in value:
+        return int(value["intValue"])
+    for key in ("stringValue", "boolValue", "doubleValue"):
+        if key in value:
+            return value[key]
+    return None
+
+def traces_from_otlp(payload: dict) -> list:
+    """
+    Regroups the spans of an export request into per-trace dicts
+    (see `utils.tracing.trace_to_dict`).
+    """
+    by_trace = {}
+    for resource_spans in payload.get("resourceSpans", []):
+        for scope_spans in resource_spans.get("scopeSpans", []):
+            for span in scope_spans.get("spans", []):
+                by_trace.setdefault(span["traceId"], []).append(span)
+
+    traces = []
+    for trace_id, spans in by_trace.items():
+        spans.sort(key=lambda s: int(s["startTimeUnixNano"]))
+        root = next((s for s in spans if not s.get("parentSpanId")), spans[0])
+        root_start = int(root["startTimeUnixNano"])
+
+        def attributes(span):
+            return {a["key"]: _attribute_value(a["value"]) for a in span.get("attributes", [])}
+
+        traces.append({
+            "trace_id": trace_id,
+            "name": root["name"],
+            "start": root_start / 1e9,
+            "duration_ms": round((int(root["endTimeUnixNano"]) - root_start) / 1e6, 3),
+            "attributes": attributes(root),
+            "spans": [
+                {
+                    "name": s["name"],
+                    "span_id": s["spanId"],
+                    "parent_id": s.get("parentSpanId"),
+                    "kind": {2: "server", 3: "client"}.get(s.get("kind"), "internal"),
+                    "offset_ms": round((int(s["startTimeUnixNano"]) - root_start) / 1e6, 3),
+                    "duration_ms": round((int(s["endTimeUnixNano"]) - int(s["startTimeUnixNano"])) / 1e6, 3),
+                    "error": s.get("status", {}).get("code") == 2,
+                    "attributes": attributes(s),
+                }
+                for s in spans
+            ],
+        })
+    return traces
+
+class CollectorHandler(StandInHandler):
+    service = "otlp"
+
+    def route(self, method: str, path: str, query: dict, body: dict):
+        if method != "POST" or path != "/v1/traces":
+            raise KeyError(path)
+        self.server.calls.add("otlp.export")
+        self.server.receive(traces_from_otlp(body))
+        return 200, {}
+
+    def error_payload(self, status: int, code: int, message: str) -> dict:
+        return {"code": code, "message": message}
+
+class CollectorServer(StandInServer):
+    """
+    Keeps received traces in memory and optionally appends them to a file.
+    """
+
+    def __init__(self, address, output: str = None, faults: Faults = None):
+        super().__init__(address, CollectorHandler, faults or Faults(), CallCounter())
+        self.output = output
+        self.traces = []
+        self._lock = threading.Lock()
+
+    def receive(self, traces: list):
+        with self._lock:
+            self.traces.extend(traces)
+            if self.output:
+                with open(self.output, "a") as f:
+                    for trace in traces:
+                        f.write(json.dumps(trace, separators=(",", ":")) + "\n")
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        with self._lock:
+            stats["traces"] = len(self.traces)
+            stats["spans"] = sum(len(t["spans"]) for t in self.traces)
+        return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local OTLP/HTTP JSON trace collector.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4318)
+    parser.add_argument("--output", default="traces.jsonl")
+    args = parser.parse_args()
+
+    server = CollectorServer((args.host, args.port), args.output)
+    print(f"OTLP collector stand-in on {server.url}/v1/traces -> {args.output}")
+    server.serve_forever()
@@ -0,0 +1,180 @@
+"""
+Stand-In HTTP Server Plumbing
+=============================
+Shared pieces of the local Airtable and Twilio stand-in servers.
+
+Key Functionality:
+- Fault injection: latency distribution per request, random 5xx responses.
+- Request accounting by operation and by response status, served at
+  `GET /__stats` (and cleared with `POST /__reset`).
+- A small JSON/form request handler on top of `http.server`.
+"""
+
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from simulators.fake_airtable import CallCounter, Latency
+
+SERVER_ERROR_STATUSES = (500, 502, 503)
+
+class Faults:
+    """
+    What to inject into every request a stand-in server handles.
+    """
+
+    def __init__(self, latency: Latency = None, error_rate: float = 0.0):
+        self.latency = latency or Latency()
+        self.error_rate = error_rate
+
+    def server_error(self):
+        """
+        Returns a 5xx status to fail this request with, or None.
+        """
+        if self.error_rate and random.random() < self.error_rate:
+            return random.choice(SERVER_ERROR_STATUSES)
+        return None
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    Threading HTTP server carrying the fault model and the request accounting.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, handler_class, faults: Faults, calls: CallCounter):
+        super().__init__(address, handler_class)
+        self.faults = faults
+        self.calls = calls
+        self.responses = CallCounter()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stats(self) -> dict:
+        return {"calls": self.calls.snapshot(), "responses": self.responses.snapshot()}
+
+    def start(self) -> threading.Thread:
+        """
+        Serves in a background thread (for tests and in-process soak runs).
+        """
+        thread = threading.Thread(target=self.serve_forever, name=self.__class__.__name__, daemon=True)
+        thread.start()
+        return thread
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Parses the request, applies faults and dispatches to `route()`.
+
+    Subclasses implement `route(method, path, query, body)` returning
+    `(status, payload)` and `error_payload(status, code, message)`.
+    """
+
+    protocol_version = "HTTP/1.1"
+    service = "stand-in"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        content_type = self.headers.get("Content-Type", "")
+        if not raw:
+            return {}
+        if "application/json" in content_type:
+            return json.loads(raw)
+        return {k: v if len(v) > 1 else v[0] for k, v in parse_qs(raw.decode()).items()}
+
+    def _send(self, status: int, payload, headers: dict = None):
+        body = b"" if status == 204 else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.responses.add(f"{self.service}.{status}")
+
+    def _handle(self, method: str):
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        body = self._read_body()
+
+        if parts.path == "/__stats" and method == "GET":
+            return self._send(200, self.server.stats())
+        if parts.path == "/__reset" and method == "POST":
+            self.server.calls.reset()
+            self.server.responses.reset()
+            return self._send(200, {"reset": True})
+
+        rejection = self.admit()
+        if rejection is not None:
+            status, payload, headers = rejection
+            return self._send(status, payload, headers)
+
+        try:
+            self.server.faults.latency.wait()
+            status = self.server.faults.server_error()
+            if status:
+                payload = self.error_payload(status, status, "Injected server error")
+            else:
+                try:
+                    status, payload = self.route(method, parts.path, query, body)
+                except KeyError as e:
+                    status, payload = 404, self.error_payload(404, 20404, f"Not found: {e}")
+                except (ValueError, TypeError) as e:
+                    status, payload = 422, self.error_payload(422, 21602, str(e))
+        finally:
+            self.release()
+        self._send(status, payload)
+
+    def admit(self):
+        """
+        Rate/concurrency check before the request is served.
+        Returns None to admit, or (status, payload, headers) to reject.
+        """
+        return None
+
+    def release(self):
+        """
+        Called once an admitted request has been served.
+        """
+
+    def route(self, method: str, path: str, query: dict, body: dict):
+        raise NotImplementedError
+
+    def error_payload(self, status: int, code: int, message: str) -> dict:
+        raise NotImplementedError
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+def add_fault_arguments(parser):
+    """
+    Adds the common latency/error CLI options to an argparse parser.
+    """
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="mean per-request latency")
+    parser.add_argument("--latency-dist", choices=Latency.DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--jitter", type=float, default=0.5, help="spread (uniform: fraction, lognormal: sigma)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of an injected 5xx")
+
+def faults_from_args(args) -> Faults:
+    return Faults(Latency(args.latency_ms, args.jitter, args.latency_dist), args.error_rate)
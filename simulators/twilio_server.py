@@ -0,0 +1,184 @@
+"""
+Twilio Stand-In Server
+======================
+A local HTTP server speaking the subset of the Twilio REST API that
+`services/twilio_proxy.py` uses, for soak and load tests.
+
+Key Functionality:
+- Messages: send (`POST .../Messages.json`).
+- Proxy: sessions (create/list/fetch/update/delete), participants
+  (create/list/fetch/delete) and service phone numbers.
+- Number purchase: available local numbers and incoming phone numbers.
+- Twilio's account concurrency limit (100 in-flight requests by default):
+  requests beyond it get 429 with error code 20429.
+- Latency and 5xx injection, request accounting (`GET /__stats`).
+
+Usage:
+    python -m simulators.twilio_server --port 8282 --latency-ms 200
+    TWILIO_API_URL=http://127.0.0.1:8282 uvicorn main:app
+"""
+
+import argparse
+import random
+import threading
+from datetime import datetime
+from simulators.fake_airtable import CallCounter, Latency
+from simulators.fake_twilio import FakeTwilioClient, _sid
+from simulators.stand_in import StandInHandler, StandInServer, add_fault_arguments, faults_from_args
+
+class TwilioServer(StandInServer):
+    def __init__(self, address, faults, client: FakeTwilioClient = None, max_concurrency: int = 100):
+        self.client = client or FakeTwilioClient()
+        super().__init__(address, TwilioHandler, faults, self.client.calls)
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.in_flight_lock = threading.Lock()
+        self.proxy_service = self.client.proxy.v1.services(None)
+
+def _serialize(obj) -> dict:
+    out = {}
+    for key, value in vars(obj).items():
+        if isinstance(value, datetime):
+            value = value.isoformat().replace("+00:00", "Z")
+        out[key.rstrip("_")] = value
+    return out
+
+class TwilioHandler(StandInHandler):
+    service = "twilio"
+
+    def error_payload(self, status, code, message):
+        return {"code": code, "message": message, "more_info": f"https://www.twilio.com/docs/errors/{code}", "status": status}
+
+    def admit(self):
+        if self.path.startswith("/__"):
+            return None
+        with self.server.in_flight_lock:
+            if self.server.max_concurrency and self.server.in_flight >= self.server.max_concurrency:
+                return 429, self.error_payload(429, 20429, "Too Many Requests"), {}
+            self.server.in_flight += 1
+        self._admitted = True
+        return None
+
+    def release(self):
+        if getattr(self, "_admitted", False):
+            with self.server.in_flight_lock:
+                self.server.in_flight -= 1
+            self._admitted = False
+
+    # -- routing ----------------------------------------------------------
+    def route(self, method, path, query, body):
+        segments = path.strip("/").split("/")
+        if segments[0] == "2010-04-01":
+            return self._api(method, segments[3:], query, body)
+        if segments[:2] == ["v1", "Services"] and len(segments) >= 4:
+            return self._proxy(method, segments[3:], query, body)
+        raise KeyError(path)
+
+    def _api(self, method, rest, query, body):
+        client = self.server.client
+        if rest == ["Messages.json"] and method == "POST":
+            if not body.get("To"):
+                raise ValueError("A 'To' phone number is required.")
+            message = client.messages.create(body=body.get("Body"), from_=body.get("From"), to=body.get("To"))
+            return 201, _serialize(message)
+        if len(rest) == 3 and rest[0] == "AvailablePhoneNumbers" and method == "GET":
+            client.calls.add("twilio.available_phone_numbers.list")
+            area_code = query.get("AreaCode", ["555"])[0]
+            numbers = [
+                {"phone_number": f"+1{area_code}{random.randrange(10_000_000):07d}",
+                 "capabilities": {"sms": True, "voice": True}}
+                for _ in range(int(query.get("PageSize", ["10"])[0]))
+            ]
+            return 200, {"available_phone_numbers": numbers, "uri": self.path}
+        if rest == ["IncomingPhoneNumbers.json"] and method == "POST":
+            client.calls.add("twilio.incoming_phone_numbers.create")
+            return 201, {"sid": _sid("PN"), "phone_number": body.get("PhoneNumber"),
+                         "capabilities": {"sms": True, "voice": True}}
+        raise KeyError("/".join(rest))
+
+    def _proxy(self, method, rest, query, body):
+        client = self.server.client
+        sessions = self.server.proxy_service.sessions
+
+        if rest == ["PhoneNumbers"] and method == "POST":
+            return 201, _serialize(self.server.proxy_service.phone_numbers.create(phone_number=body.get("PhoneNumber")))
+
+        if rest[0] != "Sessions":
+            raise KeyError("/".join(rest))
+        if len(rest) == 1:
+            if method == "POST":
+                ttl = int(body["Ttl"]) if body.get("Ttl") else None
+                return 201, _serialize(sessions.create(unique_name=body.get("UniqueName"), ttl=ttl))
+            return 200, self._page("sessions", list(client.sessions.values()), query, "proxy.sessions")
+
+        session_sid = rest[1]
+        if session_sid not in client.sessions:
+            raise KeyError(session_sid)
+        session = sessions(session_sid)
+        if len(rest) == 2:
+            if method == "GET":
+                return 200, _serialize(session.fetch())
+            if method == "POST":
+                return 200, _serialize(session.update(status=body.get("Status")))
+            if method == "DELETE":
+                client.calls.add("twilio.proxy.sessions.delete")
+                with client.lock:
+                    client.sessions.pop(session_sid, None)
+                    client.participants.pop(session_sid, None)
+                return 204, {}
+
+        if rest[2] != "Participants":
+            raise KeyError("/".join(rest))
+        if len(rest) == 3:
+            if method == "POST":
+                participant = session.participants.create(
+                    identifier=body.get("Identifier"), proxy_identifier=body.get("ProxyIdentifier")
+                )
+                return 201, _serialize(participant)
+            participants = client.participants.get(session_sid, [])
+            return 200, self._page("participants", participants, query, "proxy.participants")
+
+        participant_sid = rest[3]
+        participants = client.participants.get(session_sid, [])
+        participant = next((p for p in participants if p.sid == participant_sid), None)
+        if participant is None:
+            raise KeyError(participant_sid)
+        if method == "DELETE":
+            client.calls.add("twilio.proxy.participants.delete")
+            with client.lock:
+                participants.remove(participant)
+            return 204, {}
+        client.calls.add("twilio.proxy.participants.fetch")
+        return 200, _serialize(participant)
+
+    def _page(self, key: str, items: list, query: dict, counter: str) -> dict:
+        self.server.client.calls.add(f"twilio.{counter}.list")
+        page_size = int(query.get("PageSize", ["50"])[0])
+        page = int(query.get("Page", ["0"])[0])
+        chunk = items[page * page_size:(page + 1) * page_size]
+        path = self.path.split("?")[0]
+        next_url = None
+        if (page + 1) * page_size < len(items):
+            next_url = f"{self.server.url}{path}?PageSize={page_size}&Page={page + 1}"
+        return {
+            key: [_serialize(item) for item in chunk],
+            "meta": {"key": key, "page": page, "page_size": page_size, "next_page_url": next_url,
+                     "previous_page_url": None, "first_page_url": None, "url": f"{self.server.url}{self.path}"},
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Twilio stand-in server.")
+    parser.add_argument("--port", type=int, default=8282)
+    parser.add_argument("--max-concurrency", type=int, default=100, help="in-flight requests before 429 (0 = unlimited)")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    server = TwilioServer(
+        (args.host, args.port), faults_from_args(args),
+        FakeTwilioClient(Latency(), CallCounter()), args.max_concurrency,
+    )
+    print(f"Twilio stand-in listening on {server.url}")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
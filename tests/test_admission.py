@@ -0,0 +1,114 @@
+import asyncio
+import os
+import sys
+from unittest.mock import patch
+
+# Add the project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi import HTTPException
+from utils import admission
+from utils.rate_limiter import KeyedRateLimiter
+
+class FakeRequest:
+    def __init__(self, from_number: str, to_number: str):
+        self.headers = {"content-type": "application/x-www-form-urlencoded"}
+        self.query_params = {}
+        self._form = {"From": from_number, "To": to_number}
+
+    async def json(self):
+        raise ValueError("not JSON")
+
+    async def form(self):
+        return self._form
+
+async def admit(from_number: str, to_number: str):
+    """ Enters the dependency like FastAPI does; returns the open generator. """
+    guard = admission.webhook_admission(FakeRequest(from_number, to_number))
+    await guard.__anext__()
+    return guard
+
+async def release(guard, error: Exception = None):
+    """ Leaves the dependency after the handler returned (or raised `error`). """
+    try:
+        if error is None:
+            await guard.__anext__()
+        else:
+            await guard.athrow(error)
+    except StopAsyncIteration:
+        pass
+    except Exception as e:
+        if e is not error:
+            raise
+
+def isolated(max_in_flight=50, sender=(1, 10), recipient=(5, 30)):
+    return patch.multiple(
+        admission,
+        _in_flight=0,
+        sender_limiter=KeyedRateLimiter(*sender),
+        recipient_limiter=KeyedRateLimiter(*recipient),
+    ), patch.object(admission.settings, "WEBHOOK_MAX_IN_FLIGHT", max_in_flight)
+
+def rejection(coroutine) -> HTTPException:
+    try:
+        asyncio.run(coroutine)
+    except HTTPException as e:
+        return e
+    raise AssertionError("expected the webhook to be shed")
+
+def test_sheds_with_503_at_in_flight_cap():
+    print("Testing the in-flight cap...")
+    state, cap = isolated(max_in_flight=3)
+    with state, cap:
+        async def fill():
+            guards = [await admit(f"+1555000000{i}", "+15550009999") for i in range(3)]
+            assert admission._in_flight == 3
+            try:
+                await admit("+15550000005", "+15550009999")
+            finally:
+                for guard in guards:
+                    await release(guard)
+
+        error = rejection(fill())
+        assert error.status_code == 503 and error.headers["Retry-After"] == "1"
+        assert admission._in_flight == 0
+    print("SUCCESS: The fourth concurrent webhook got 503.")
+
+def test_per_sender_and_recipient_budgets():
+    print("\nTesting per-From and per-To budgets...")
+    state, cap = isolated(sender=(0.5, 2), recipient=(0.25, 2))
+    with state, cap:
+        async def send(from_number, to_number):
+            await release(await admit(from_number, to_number))
+
+        # Same handset in two formats: one bucket
+        asyncio.run(send("+15550000001", "+15550009999"))
+        asyncio.run(send("(555) 000-0001", "+15550009999"))
+        error = rejection(send("555-000-0001", "+15550008888"))
+        assert error.status_code == 429 and error.headers["Retry-After"] == "2"
+        assert "sender" in error.detail
+
+        # A third sender to the same entry number runs out its budget
+        error = rejection(send("+15550000002", "+15550009999"))
+        assert error.status_code == 429 and error.headers["Retry-After"] == "4"
+        assert "recipient" in error.detail
+        assert admission._in_flight == 0
+    print("SUCCESS: 429 with Retry-After for a flooding sender and a flooded entry number.")
+
+def test_in_flight_released_when_handler_raises():
+    print("\nTesting the in-flight count after a handler error...")
+    state, cap = isolated()
+    with state, cap:
+        async def failing_handler():
+            guard = await admit("+15550000001", "+15550009999")
+            assert admission._in_flight == 1
+            await release(guard, RuntimeError("Airtable down"))
+
+        asyncio.run(failing_handler())
+        assert admission._in_flight == 0
+    print("SUCCESS: The slot is given back when the handler raises.")
+
+if __name__ == "__main__":
+    test_sheds_with_503_at_in_flight_cap()
+    test_per_sender_and_recipient_budgets()
+    test_in_flight_released_when_handler_raises()
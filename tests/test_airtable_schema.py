@@ -0,0 +1,50 @@
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+# Add the project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import airtable_client, airtable_schema
+
+READS = [
+    lambda: airtable_client.find_sitter_by_twilio_number("+15550000001"),
+    lambda: airtable_client.find_client_by_phone("+15550000002"),
+    lambda: airtable_client.find_client_by_twilio_number("+15550000003"),
+    lambda: airtable_client.find_inventory_record_by_number("+15550000004"),
+    lambda: airtable_client.find_number_assigned_to_sitter("recSitter"),
+    lambda: airtable_client.find_active_sessions_for_sitter("recSitter"),
+    lambda: airtable_client.find_clients_for_sitter("recSitter", "Sam Sitter"),
+    lambda: airtable_client.get_available_numbers(),
+    lambda: airtable_client.get_inventory_snapshot(),
+    lambda: airtable_client.get_pending_messages(),
+    lambda: airtable_client.get_ready_pool_number(),
+    lambda: airtable_client.get_assigned_clients(),
+    lambda: airtable_client.get_directory_records("clients"),
+    lambda: airtable_client.get_replica_records("inventory"),
+    lambda: airtable_client.get_session_links(),
+]
+
+def test_every_list_read_is_projected():
+    print("Testing field projection...")
+    tables = {name: MagicMock(**{"all.return_value": []}) for name in ("sitters_table", "clients_table", "inventory_table", "messages_table")}
+    with patch.multiple(airtable_client, **tables), patch("utils.logger.log_info"):
+        for read in READS:
+            read()
+
+    calls = [call for table in tables.values() for call in table.all.call_args_list]
+    assert len(calls) == len(READS)
+    for call in calls:
+        assert call.kwargs.get("fields"), call
+    print(f"SUCCESS: All {len(calls)} list reads name their columns.")
+
+def test_views_are_deduplicated():
+    print("\nTesting schema views...")
+    assert airtable_schema.fields("sitters") == ["Full Name", "phone-number", "twilio-number"]
+    clients = airtable_schema.fields("clients", "directory", "assigned")
+    assert clients == ["Name", "phone-number", "twilio-number", "Last Active"]
+    print("SUCCESS: Combined views keep their order without duplicates.")
+
+if __name__ == "__main__":
+    test_every_list_read_is_projected()
+    test_views_are_deduplicated()
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import sys
+from unittest.mock import AsyncMock, patch
+
+# Add the project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from routers import numbers as numbers_router
+from services import airtable_client
+from services.airtable_client import _LazyTable
+from services.number_pool import plan_bulk_assignment
+from simulators.fake_airtable import FakeBase
+
+def test_bulk_plan_has_no_collisions():
+    print("Testing Bulk Assignment Plan...")
+
+    snapshot = [
+        {"id": "recInvA", "fields": {"phone-number": "+15550000001"}},
+        {"id": "recInvB", "fields": {"phone-number": "+15550000002", "Assigned Sitter": ["recSitter1"]}},
+        {"id": "recInvC", "fields": {"phone-number": "+15550000003"}},
+        {"id": "recInvNoPhone", "fields": {}},
+    ]
+
+    # Duplicate and padded IDs should be served once; the third sitter runs out of numbers
+    assignments, unserved = plan_bulk_assignment(["recSitter1", " recSitter2 ", "recSitter1", "recSitter3"], snapshot)
+
+    assert [a["sitter_id"] for a in assignments] == ["recSitter1", "recSitter2"]
+    assert [a["new_record"]["id"] for a in assignments] == ["recInvA", "recInvC"]
+    assert unserved == ["recSitter3"]
+
+    # Old number is resolved from the same snapshot
+    assert assignments[0]["old_record"]["id"] == "recInvB"
+    assert assignments[1]["old_record"] is None
+
+    print("SUCCESS: Each sitter received a distinct number from one snapshot.")
+
+def test_attach_numbers_reports_failed_chunk():
+    print("\nTesting POST /attach-numbers with a failed reservation chunk...")
+    base = FakeBase()
+    inventory = _LazyTable("Number Inventory")
+    inventory._table = base.table("Number Inventory")
+    for i in range(12):
+        inventory._table.seed({"phone-number": f"+155500000{i:02d}"}, f"recInv{i:02d}")
+    old = inventory._table.seed({"phone-number": "+15550000099", "Assigned Sitter": ["recSitter11"]}, "recInvOld")
+    sitter_ids = [f"recSitter{i:02d}" for i in range(12)]
+
+    batch_update = inventory._table.batch_update
+    chunks = []
+
+    def update(records, **kwargs):
+        chunks.append([r["id"] for r in records])
+        if len(chunks) == 1:
+            raise Exception("503 Service Unavailable")
+        return batch_update(records, **kwargs)
+
+    with patch.object(airtable_client, "inventory_table", inventory), \
+         patch.object(inventory._table, "batch_update", update), \
+         patch.object(numbers_router, "parse_incoming_payload", AsyncMock(return_value={"sitter_ids": sitter_ids})), \
+         patch.object(numbers_router, "directory") as directory, \
+         patch.object(numbers_router, "log_event"), patch.object(numbers_router, "log_info"), \
+         patch.object(numbers_router, "log_error"), patch("utils.logger.log_error"), \
+         patch("services.twilio_proxy.add_number_to_proxy_service", side_effect=lambda number: f"PN{number[-2:]}"):
+        response = asyncio.run(numbers_router.attach_numbers(None))
+
+    # Reservations go out 10 per request; the first request fails as a whole
+    assert [len(chunk) for chunk in chunks] == [10, 2, 3]
+    assert response["status"] == "partial"
+    assert response["assigned"] == 2 and response["failed"] == 10
+    results = {r["sitter_id"]: r for r in response["results"]}
+    assert [r["sitter_id"] for r in response["results"]] == sitter_ids
+    assert all(results[sid] == {"sitter_id": sid, "status": "failed", "error": "Failed to assign number"} for sid in sitter_ids[:10])
+    assert results["recSitter10"] == {"sitter_id": "recSitter10", "status": "success", "new_number": "+15550000010", "proxy_phone_sid": "PN10"}
+    assert results["recSitter11"]["old_number"] == "+15550000099" and "release_error" not in results["recSitter11"]
+
+    # Only the reserved numbers were written, attached and announced
+    rows = base.table("Number Inventory").records
+    assert [rid for rid, r in rows.items() if r["fields"].get("Assigned Sitter")] == ["recInv10", "recInv11"]
+    assert rows["recInv11"]["fields"]["Attach Status"] == "Ready" and rows["recInv11"]["fields"]["Proxy Phone SID"] == "PN11"
+    assert rows[old["id"]]["fields"]["Assigned Sitter"] == []
+    assert [c.args[0] for c in directory.add.call_args_list] == ["+15550000010", "+15550000011"]
+    print("SUCCESS: 2 attached, 10 failed with the chunk that did not reach Airtable.")
+
+if __name__ == "__main__":
+    test_bulk_plan_has_no_collisions()
+    test_attach_numbers_reports_failed_chunk()
@@ -0,0 +1,64 @@
+import json
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+# Add the project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import airtable_client
+from services.airtable_client import _LazyTable
+from services.audit import AuditRollup
+from simulators.fake_airtable import FakeBase
+from utils.logger import log_info, log_error
+
+def fake_audit_log():
+    base = FakeBase()
+    audit = _LazyTable("Audit Log")
+    audit._table = base.table("Audit Log")
+    return base, audit
+
+def test_routine_events_are_rolled_up():
+    print("Testing audit rollups...")
+    base, audit = fake_audit_log()
+    rollup = AuditRollup()
+    with patch.multiple(airtable_client, audit_table=audit, audit_rollup=rollup):
+        for i in range(200):
+            log_info("Intercept Triggered", f"From: +1555000{i:04d}")
+            rollup.record("WEBHOOK", "POST /intercept 200", duration_ms=float(i % 100))
+        log_error("Failed to forward", "timeout")
+        assert base.calls.total() == 0   # nothing on the request path
+        assert rollup.pending() == 401
+
+        airtable_client.log_event("NUMBER_ASSIGNED", "Assigned +15550001111 to Client Ann", "Client ID: recAnn")
+        assert base.calls.snapshot() == {"airtable.Audit Log.create": 1}
+
+        assert rollup.flush() == 3
+        assert rollup.pending() == 0
+        assert rollup.flush() == 0
+
+    rows = {r["fields"]["Description"].split(":")[0]: r["fields"] for r in base.table("Audit Log").records.values()}
+    assert rows["Assigned +15550001111 to Client Ann"]["Event"] == "NUMBER_ASSIGNED"
+    info = json.loads(rows["INFO"]["Details"])
+    assert info["count"] == 200 and info["top"] == {"Intercept Triggered": 200}
+    webhook = json.loads(rows["WEBHOOK"]["Details"])
+    assert webhook["latency_ms"]["max"] == 99.0 and 45 <= webhook["latency_ms"]["p50"] <= 55
+    assert json.loads(rows["ERROR"]["Details"])["count"] == 1
+    assert base.calls.snapshot()["airtable.Audit Log.create"] == 2   # one row, then 3 rollups in one request
+    print("SUCCESS: 401 routine events became 3 rollup rows; the business event kept its own row.")
+
+def test_failed_audit_write_does_not_recurse():
+    print("\nTesting a failing Audit Log...")
+    audit = MagicMock(**{"create.side_effect": RuntimeError("503"), "batch_create.side_effect": RuntimeError("503")})
+    rollup = AuditRollup()
+    with patch.multiple(airtable_client, audit_table=audit, audit_rollup=rollup):
+        airtable_client.log_event("POOL_EXHAUSTED", "No Ready numbers found in Inventory")
+        log_info("Still routing")
+        assert rollup.flush() == 0
+    assert audit.create.call_count == 1
+    assert rollup.pending() == 0
+    print("SUCCESS: Audit write failures are logged locally only.")
+
+if __name__ == "__main__":
+    test_routine_events_are_rolled_up()
+    test_failed_audit_write_does_not_recurse()
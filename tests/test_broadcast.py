@@ -0,0 +1,133 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from unittest.mock import AsyncMock, patch
+
+# Add the project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi import BackgroundTasks, HTTPException
+from routers import broadcast as broadcast_router
+from services import airtable_client, broadcast
+from services.airtable_client import _LazyTable
+from simulators.fake_airtable import FakeBase
+
+SITTER = {"id": "recSitter", "fields": {"Full Name": "Sam Sitter", "twilio-number": "+15550000001"}}
+CLIENTS = [{"id": f"recClient{i:02d}", "fields": {"phone-number": f"+1555010{i:04d}"}} for i in range(25)]
+
+class FakeScheduler:
+    """ Completes sends on worker threads; records the most sends outstanding at once. """
+
+    def __init__(self, failing: set = ()):
+        self.failing = set(failing)
+        self.pool = ThreadPoolExecutor(max_workers=32)
+        self.lock = threading.Lock()
+        self.outstanding = self.max_outstanding = 0
+        self.sent = []
+
+    def _send(self, future, to_number):
+        time.sleep(0.005)
+        with self.lock:
+            self.outstanding -= 1
+        if to_number in self.failing:
+            future.set_exception(Exception("HTTP 400 code 21610: unsubscribed recipient"))
+        else:
+            self.sent.append(to_number)
+            future.set_result(f"SM{to_number[-4:]}")
+
+    def submit(self, from_number, to_number, body):
+        future = Future()
+        with self.lock:
+            self.outstanding += 1
+            self.max_outstanding = max(self.max_outstanding, self.outstanding)
+        self.pool.submit(self._send, future, to_number)
+        return future
+
+def run_delivery(scheduler, fail_chunk: int = None):
+    base = FakeBase()
+    messages = _LazyTable("Messages")
+    messages._table = base.table("Messages")
+    batch_create = messages._table.batch_create
+    chunks = []
+
+    def create(records, **kwargs):
+        chunks.append(len(records))
+        if len(chunks) - 1 == fail_chunk:
+            raise Exception("503 Service Unavailable")
+        return batch_create(records, **kwargs)
+
+    with patch.object(airtable_client, "messages_table", messages), \
+         patch.object(messages._table, "batch_create", create), \
+         patch.object(broadcast, "scheduler", scheduler), \
+         patch.object(broadcast, "log_event"), patch.object(broadcast, "log_info"), patch.object(broadcast, "log_error"), \
+         patch("utils.logger.log_error"):
+        summary = broadcast.deliver_broadcast(SITTER, CLIENTS, "Running 15 minutes late today")
+    return base, chunks, summary
+
+def test_deliver_broadcast_batches_and_bounds_sends():
+    print("Testing broadcast delivery...")
+    scheduler = FakeScheduler(failing={"+15550100003", "+15550100017"})
+    base, chunks, summary = run_delivery(scheduler)
+
+    assert summary == {"sent": 23, "failed": 2}
+    assert chunks == [10, 10, 5]   # Messages rows logged 10 per create
+    assert scheduler.max_outstanding == broadcast.BROADCAST_CONCURRENCY
+    calls = base.calls.snapshot()
+    assert calls["airtable.Messages.create"] == 3 and calls["airtable.Messages.update"] == 3   # statuses 10 per update
+
+    rows = {r["fields"]["To"]: r["fields"] for r in base.table("Messages").records.values()}
+    assert len(rows) == 25 and all(row["From"] == "+15550000001" for row in rows.values())
+    assert {to for to, row in rows.items() if row["Status"] == "Failed"} == {"+15550100003", "+15550100017"}
+    assert sum(row["Status"] == "Sent" for row in rows.values()) == 23
+    print(f"SUCCESS: 25 sends, at most {scheduler.max_outstanding} outstanding; rows and statuses in batches of 10.")
+
+def test_unlogged_chunk_is_still_sent():
+    print("\nTesting a Messages chunk that failed to log...")
+    scheduler = FakeScheduler()
+    base, chunks, summary = run_delivery(scheduler, fail_chunk=1)
+
+    assert summary == {"sent": 25, "failed": 0}
+    assert len(scheduler.sent) == 25
+    rows = base.table("Messages").records.values()
+    assert len(rows) == 15 and all(r["fields"]["Status"] == "Sent" for r in rows)
+    assert base.calls.snapshot()["airtable.Messages.update"] == 2   # no update for the None IDs
+    print("SUCCESS: Every client got the message; only the logged rows were marked Sent.")
+
+def test_broadcast_endpoint_returns_202():
+    print("\nTesting POST /broadcast...")
+    payload = {"sitter_id": " recSitter ", "body": "Running late"}
+    no_number = {"id": "recSitter", "fields": {"Full Name": "Sam Sitter"}}
+
+    def call(prepared):
+        tasks = BackgroundTasks()
+        with patch.object(broadcast_router, "parse_incoming_payload", AsyncMock(return_value=payload)), \
+             patch.object(broadcast_router, "prepare_broadcast", return_value=prepared) as prepare, \
+             patch.object(broadcast_router, "log_info"):
+            response = asyncio.run(broadcast_router.broadcast(None, tasks))
+        prepare.assert_called_once_with("recSitter")
+        return response, tasks
+
+    response, tasks = call((SITTER, CLIENTS))
+    assert response.status_code == 202
+    assert json.loads(response.body) == {"status": "queued", "sitter_id": "recSitter", "recipients": 25}
+    assert [(task.func, task.args) for task in tasks.tasks] == [(broadcast_router.deliver_broadcast, (SITTER, CLIENTS, "Running late"))]
+
+    response, tasks = call((SITTER, []))
+    assert json.loads(response.body)["recipients"] == 0 and tasks.tasks == []
+
+    for prepared, status_code in (((None, []), 404), ((no_number, CLIENTS), 422)):
+        try:
+            call(prepared)
+            raise AssertionError("expected an error")
+        except HTTPException as e:
+            assert e.status_code == status_code
+    print("SUCCESS: 202 with delivery handed to a background task; 404/422 for unknown or numberless sitters.")
+
+if __name__ == "__main__":
+    test_deliver_broadcast_batches_and_bounds_sends()
+    test_unlogged_chunk_is_still_sent()
+    test_broadcast_endpoint_returns_202()
@@ -0,0 +1,102 @@
+import asyncio
+import os
+import sys
+from unittest.mock import patch
+
+# Add the project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from routers import clients as clients_router
+from services import airtable_client
+from services.airtable_client import _LazyTable
+from simulators.fake_airtable import FakeBase
+
+class FakeRequest:
+    def __init__(self, body):
+        self.body = body
+
+    async def json(self):
+        return self.body
+
+def fake_clients():
+    base = FakeBase()
+    clients = _LazyTable("Clients")
+    clients._table = base.table("Clients")
+    clients._table.seed({"Name": "Stored national", "phone-number": "(555) 010-0001"}, "recNational")
+    clients._table.seed({"Name": "Stored E.164", "phone-number": "+15550100002"}, "recCanonical")
+    return base, clients
+
+ROSTER = {"clients": [
+    {"phone": "555-010-0001", "full_name": "Ada", "Email": "ada@example.com"},
+    {"phoneNumber": "+1 555 010 0002", "name": "Grace"},
+    {"phone_number": "5550100003", "Name": "Linus (old)"},
+    {"Phone": "(555) 010-0003", "fullName": "Linus", "preferred_contact_method": "SMS"},
+    {"phone": "not a number", "name": "Nobody"},
+    {"name": "No phone"},
+]}
+
+def run_bulk(phone_key_fields: bool):
+    base, clients = fake_clients()
+    with patch.object(airtable_client, "clients_table", clients), \
+         patch.object(airtable_client.settings, "AIRTABLE_PHONE_KEY_FIELDS", phone_key_fields), \
+         patch.object(clients_router, "log_event"), patch.object(clients_router, "log_info"):
+        if phone_key_fields:
+            airtable_client.backfill_phone_keys("clients")
+            base.calls.reset()
+        result = asyncio.run(clients_router.bulk_upsert_clients(FakeRequest(ROSTER)))
+    return base, result
+
+def test_bulk_upsert_maps_dedupes_and_skips():
+    print("Testing the bulk client upsert...")
+    base, result = run_bulk(phone_key_fields=False)
+
+    assert result["status"] == "success" and result["received"] == 6
+    assert (result["created"], result["updated"], result["failed"]) == (1, 2, [])
+    assert result["skipped"] == [{"phone": "not a number", "name": "Nobody"}, {"name": "No phone"}]
+
+    records = {r["fields"]["phone-number"]: r for r in base.table("Clients").records.values()}
+    assert len(records) == 3
+    assert records["+15550100001"]["id"] == "recNational"   # matched despite its stored format
+    assert records["+15550100001"]["fields"]["Name"] == "Ada"
+    assert records["+15550100001"]["fields"]["Email"] == "ada@example.com"
+    assert records["+15550100001"]["fields"]["Client Phone (raw)"] == "555-010-0001"
+    assert records["+15550100002"]["id"] == "recCanonical"
+    linus = records["+15550100003"]["fields"]
+    assert linus["Name"] == "Linus" and linus["Preferred Contact Method"] == "SMS"   # last occurrence wins
+    assert "Last Active" not in linus
+    print("SUCCESS: Aliases mapped, duplicates merged, invalid rows skipped, existing Clients matched by national key.")
+
+def test_bulk_upsert_on_phone_keys():
+    print("\nTesting the bulk client upsert on stored phone keys...")
+    base, result = run_bulk(phone_key_fields=True)
+
+    assert (result["created"], result["updated"], result["failed"]) == (1, 2, [])
+    records = base.table("Clients").records
+    assert len(records) == 3 and records["recNational"]["fields"]["Name"] == "Ada"
+    assert all(r["fields"]["phone-key"] == r["fields"]["phone-number"][-10:] for r in records.values())
+    assert base.calls.snapshot() == {"airtable.Clients.upsert": 1}   # no read first
+    print("SUCCESS: One upsert keyed on phone-key, no read first.")
+
+def test_bulk_upsert_reports_failed_chunks():
+    print("\nTesting a failed bulk chunk...")
+    base, clients = fake_clients()
+
+    def fail(*args, **kwargs):
+        raise Exception("422 INVALID_RECORDS")
+
+    with patch.object(airtable_client, "clients_table", clients), \
+         patch.object(airtable_client.settings, "AIRTABLE_PHONE_KEY_FIELDS", False), \
+         patch.object(clients._table, "batch_upsert", fail), \
+         patch("utils.logger.log_error"), \
+         patch.object(clients_router, "log_event"), patch.object(clients_router, "log_info"):
+        result = asyncio.run(clients_router.bulk_upsert_clients(FakeRequest(ROSTER["clients"])))
+
+    assert result["status"] == "partial"
+    assert (result["created"], result["updated"]) == (0, 2)
+    assert result["failed"] == ["+15550100003"]
+    print("SUCCESS: Phones of the failed chunk are reported; the rest are written.")
+
+if __name__ == "__main__":
+    test_bulk_upsert_maps_dedupes_and_skips()
+    test_bulk_upsert_on_phone_keys()
+    test_bulk_upsert_reports_failed_chunks()
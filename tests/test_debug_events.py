@@ -0,0 +1,81 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+from unittest.mock import patch
+
+# Add the project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from routers import debug
+from utils.events import EventBuffer
+
+def test_ring_buffer_pages():
+    print("Testing the recent events buffer...")
+    buffer = EventBuffer(100)
+    for i in range(250):
+        buffer.record("ERROR" if i % 10 == 0 else "INFO", f"event {i}")
+
+    with patch.object(debug, "recent_events", buffer):
+        first = asyncio.run(debug.list_events(before=None, limit=40, type=None))
+        second = asyncio.run(debug.list_events(before=first["next_before"], limit=40, type=None))
+        last = asyncio.run(debug.list_events(before=second["next_before"], limit=40, type=None))
+        errors = asyncio.run(debug.list_events(before=None, limit=50, type="ERROR"))
+
+    assert first["latest"] == 250
+    ids = [e["id"] for e in first["events"] + second["events"] + last["events"]]
+    assert ids == list(range(250, 150, -1))   # only the last 100 are kept
+    assert last["next_before"] is None
+    assert [e["message"] for e in errors["events"]] == [f"event {i}" for i in range(240, 140, -10)][:10]
+
+    events, missed = buffer.since(120)
+    assert missed == 30 and events[0]["id"] == 151
+    assert buffer.since(250) == ([], 0)
+    print("SUCCESS: Paged newest first through the last 100 of 250 events.")
+
+class FakeRequest:
+    def __init__(self, chunks: list, until: int):
+        self.chunks, self.until = chunks, until
+
+    async def is_disconnected(self):
+        return len(self.chunks) >= self.until
+
+def test_stream_delivers_live_events():
+    print("\nTesting the live event stream...")
+    buffer = EventBuffer(100)
+    buffer.record("INFO", "already seen")
+    buffer.record("INFO", "missed while reconnecting")
+
+    async def consume():
+        chunks = []
+        request = FakeRequest(chunks, until=4)
+        # Events recorded from a worker thread, as log_info calls in run_in_threadpool are
+        threading.Timer(0.05, buffer.record, args=("NUMBER_ASSIGNED", "Assigned +15550001111")).start()
+        threading.Timer(0.10, buffer.record, args=("WEBHOOK", "POST /intercept 200")).start()
+        async for chunk in debug._stream(request, cursor=1):
+            chunks.append(chunk)
+        return chunks
+
+    with patch.object(debug, "recent_events", buffer), \
+         patch.object(debug.settings, "EVENT_STREAM_HEARTBEAT_SECONDS", 0.5):
+        chunks = asyncio.run(asyncio.wait_for(consume(), 5))
+
+    assert chunks[0] == "retry: 2000\n\n"
+    data = [json.loads(chunk.split("data: ", 1)[1]) for chunk in chunks if chunk.startswith("id: ")]
+    assert [e["message"] for e in data] == ["missed while reconnecting", "Assigned +15550001111", "POST /intercept 200"]
+    assert chunks[2].startswith("id: 3\n") and chunks[-1] == ": heartbeat\n\n"
+    print("SUCCESS: The stream resumed after its cursor and pushed events recorded on other threads.")
+
+def test_endpoints_require_admin_token():
+    print("\nTesting the debug endpoints are gated...")
+    from routers.profiler import require_admin_token
+    gated = {route.path: [d.call for d in route.dependant.dependencies] for route in debug.router.routes}
+    assert set(gated) == {"/debug/events", "/debug/events/stream"}
+    assert all(require_admin_token in calls for calls in gated.values())
+    print("SUCCESS: Both endpoints depend on the admin token.")
+
+if __name__ == "__main__":
+    test_ring_buffer_pages()
+    test_stream_delivers_live_events()
+    test_endpoints_require_admin_token()
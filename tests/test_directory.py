@@ -0,0 +1,147 @@
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+# Add the project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import directory as directory_module
+from services.directory import PhoneDirectory
+
+def build_directory():
+    directory = PhoneDirectory(negative_ttl=60)
+    directory.load({
+        "sitters": [{"id": "recSitter", "fields": {"phone-number": "+15550000001", "twilio-number": "+15550000002"}}],
+        "clients": [{"id": "recClient", "fields": {"phone-number": "+15550000003", "twilio-number": "+15550000004"}}],
+        "inventory": [{"id": "recPool", "fields": {"phone-number": "+15550000005"}}],
+    })
+    return directory
+
+def test_nothing_rejected_before_first_load():
+    print("Testing cold directory...")
+    directory = PhoneDirectory()
+    assert not directory.should_reject("+19990000000", "+19990000001")
+    print("SUCCESS: Cold directory lets all traffic through.")
+
+def test_unknown_traffic_is_rejected():
+    print("\nTesting Bloom filter rejection...")
+    directory = build_directory()
+
+    # Spam between two unknown numbers
+    assert directory.should_reject("+19990000000", "+19990000001")
+    # New client texting a Sitter entry point (formats differ but keys match)
+    assert not directory.should_reject("+19990000000", "15550000002")
+    # Sitter replying to a pool number
+    assert not directory.should_reject("+15550000001", "+15550000005")
+    print("SUCCESS: Only traffic between unknown numbers is rejected.")
+
+def test_negative_cache_and_refresh():
+    print("\nTesting negative cache...")
+    directory = build_directory()
+
+    # In the Bloom filter (a false positive, or a record deleted since the
+    # refresh) but every lookup came back empty: cached for the TTL
+    directory.mark_unknown("+15550000003")
+    directory.mark_unknown("+15550000004")
+    assert directory.should_reject("+15550000003", "+15550000004")
+    assert set(directory._unknown) == {"5550000003", "5550000004"}
+
+    # Numbers the Bloom filter already rules out need no entry
+    directory.mark_unknown("+19990000000")
+    assert directory.is_unknown("+19990000000") and "9990000000" not in directory._unknown
+
+    # Registering a number (e.g. just assigned) drops it from the cache
+    directory.add("+15550000003")
+    assert not directory.should_reject("+15550000003", "+15550000004")
+
+    # Entries expire
+    directory.negative_ttl = 0.01
+    directory.mark_unknown("+15550000001")
+    time.sleep(0.02)
+    assert not directory.is_unknown("+15550000001")
+
+    # A rebuild clears the negative cache
+    directory.negative_ttl = 60
+    directory.mark_unknown("+15550000002")
+    directory.load({"clients": [{"id": "recClient", "fields": {"phone-number": "+15550000002"}}]})
+    assert not directory.is_unknown("+15550000002") and not directory._unknown
+    print("SUCCESS: Bloom false positives cached for the TTL, dropped on add, expiry and refresh.")
+
+def test_failed_lookup_is_not_cached():
+    print("\nTesting negative caching after an Airtable error...")
+    from routers import intercept
+    from services import airtable_client
+    directory = build_directory()
+    # Both in the Bloom filter; the lookups decide whether they get cached
+    sender, recipient = "+15550000003", "+15550000004"
+    sitters = MagicMock(**{"all.side_effect": RuntimeError("503 Service Unavailable")})
+    with patch.object(intercept, "directory", directory), \
+         patch.object(airtable_client, "sitters_table", sitters), \
+         patch("utils.logger.log_info"), patch("utils.logger.log_error"):
+        assert intercept._route_message_in_unit_of_work(sender, recipient, "hi") == {"status": "ignored"}
+        assert directory._unknown == {} and not directory.should_reject(sender, recipient)
+
+        sitters.all.side_effect = None
+        sitters.all.return_value = []
+        intercept._route_message_in_unit_of_work(sender, recipient, "hi")
+        assert set(directory._unknown) == {"5550000003", "5550000004"}
+        assert directory.should_reject(sender, recipient)
+    assert airtable_client.failed_lookups() == set()
+    print("SUCCESS: Numbers are only negative-cached after lookups that succeeded.")
+
+def test_warm_start_from_snapshot():
+    print("\nTesting warm restart from a snapshot...")
+    with tempfile.TemporaryDirectory() as tmp, \
+         patch.object(directory_module.settings, "DIRECTORY_SNAPSHOT_PATH", os.path.join(tmp, "directory.snap")):
+        # Previous process: full load, snapshot written an hour ago
+        taken_at = datetime.now(timezone.utc) - timedelta(hours=1)
+        with patch.object(directory_module, "log_info"):
+            previous = build_directory()
+            previous.loaded_at = taken_at
+            previous.save_snapshot()
+
+        # New process: snapshot plus one Client created since
+        calls = []
+        def changed_records(name, modified_since=None):
+            calls.append((name, modified_since))
+            if name == "clients":
+                return [{"id": "recNew", "fields": {"phone-number": "+15550000009"}}]
+            return []
+
+        restarted = PhoneDirectory()
+        with patch.object(directory_module, "get_directory_records", side_effect=changed_records), \
+             patch.object(directory_module, "log_info"):
+            restarted.warm_start()
+
+    assert sorted(name for name, _ in calls) == ["clients", "inventory", "sitters"]
+    assert all(since is not None and since <= taken_at for _, since in calls)
+    assert not restarted.is_unknown("+15550000001")    # from the snapshot
+    assert not restarted.is_unknown("+15550000009")    # changed since
+    assert restarted.should_reject("+19990000000", "+19990000001")
+    print("SUCCESS: Snapshot loaded and only changes since it fetched.")
+
+def test_incompatible_snapshot_ignored():
+    print("\nTesting snapshot compatibility checks...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "directory.snap")
+        directory_module.write_snapshot(path, {"sitters": {}}, datetime.now(timezone.utc))
+        assert directory_module.read_snapshot(path) is not None
+        with patch.object(directory_module.settings, "AIRTABLE_BASE_ID", "appOther"):
+            assert directory_module.read_snapshot(path) is None
+        with patch.object(directory_module.settings, "DIRECTORY_SNAPSHOT_MAX_AGE_SECONDS", -1):
+            assert directory_module.read_snapshot(path) is None
+        with open(path, "w") as f:
+            f.write("not a snapshot")
+        assert directory_module.read_snapshot(path) is None
+    print("SUCCESS: Other bases, stale and corrupt snapshots fall back to a full load.")
+
+if __name__ == "__main__":
+    test_nothing_rejected_before_first_load()
+    test_unknown_traffic_is_rejected()
+    test_negative_cache_and_refresh()
+    test_failed_lookup_is_not_cached()
+    test_warm_start_from_snapshot()
+    test_incompatible_snapshot_ignored()
@@ -0,0 +1,66 @@
+import os
+import sys
+import threading
+from unittest.mock import patch
+
+# Add the project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import airtable_client
+from services.airtable_client import _LazyTable
+from services.error_counts import ErrorCounts
+from simulators.fake_airtable import FakeBase
+
+def fake_clients():
+    base = FakeBase()
+    clients = _LazyTable("Clients")
+    clients._table = base.table("Clients")
+    for i in range(25):
+        clients._table.seed({"Name": f"Client {i}", "Twilio-Error-Count": "2"}, f"recClient{i:02d}")
+    return base, clients
+
+def test_increments_are_coalesced():
+    print("Testing coalesced error counts...")
+    base, clients = fake_clients()
+    counts = ErrorCounts()
+    with patch.multiple(airtable_client, clients_table=clients, error_counts=counts):
+        # A failure spike: 8 threads x 100 increments over 25 clients
+        def fail(worker):
+            for i in range(100):
+                airtable_client.increment_client_error_count(f"recClient{(worker + i) % 25:02d}")
+        threads = [threading.Thread(target=fail, args=(w,)) for w in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert base.calls.total() == 0   # nothing on the request path
+
+        assert counts.flush() == 25
+        assert counts.pending() == 0
+    totals = sum(int(r["fields"]["Twilio-Error-Count"]) for r in base.table("Clients").records.values())
+    assert totals == 25 * 2 + 800, totals
+    # One read (25 IDs < 50 per request) and three batch updates
+    assert base.calls.snapshot() == {"airtable.Clients.list": 1, "airtable.Clients.update": 3}, base.calls.snapshot()
+    print("SUCCESS: 800 increments written with 4 requests, none lost.")
+
+def test_failed_flush_keeps_deltas():
+    print("\nTesting a failed flush...")
+    base, clients = fake_clients()
+    counts = ErrorCounts()
+    with patch.multiple(airtable_client, clients_table=clients, error_counts=counts), \
+         patch("services.error_counts.log_error"), patch("services.airtable_client.get_client_error_counts", side_effect=RuntimeError("503")):
+        airtable_client.increment_client_error_count("recClient00")
+        assert counts.flush() == 0
+        assert counts.pending() == 1
+
+    # Reset in Airtable meanwhile: the next flush adds to the value it reads
+    base.table("Clients").update("recClient00", {"Twilio-Error-Count": "0"})
+    with patch.multiple(airtable_client, clients_table=clients, error_counts=counts):
+        airtable_client.increment_client_error_count("recClient00")
+        assert counts.flush() == 1
+    assert base.table("Clients").records["recClient00"]["fields"]["Twilio-Error-Count"] == "2"
+    print("SUCCESS: Increments survive a failed flush and merge with the current value.")
+
+if __name__ == "__main__":
+    test_increments_are_coalesced()
+    test_failed_flush_keeps_deltas()
@@ -26,12 +26,12 @@ class MockRequest:
 @patch('routers.intercept.update_client_linked_sitter')
 @patch('routers.intercept.update_message_status')
 @patch('routers.intercept.save_message')
-@patch('routers.intercept.send_sms')
+@patch('routers.intercept.queue_sms')
 @patch('routers.intercept.find_client_by_twilio_number')
 @patch('routers.intercept.find_client_by_phone')
 @patch('routers.intercept.find_sitter_by_twilio_number')
 async def test_inbound_flow(mock_find_sitter, mock_find_client, mock_find_client_pool,
-                            mock_send_sms, mock_save_msg, mock_update_status,
+                            mock_queue_sms, mock_save_msg, mock_update_status,
                             mock_link_sitter, mock_assign_num, mock_get_pool,
                             mock_log_event, mock_update_last_active):
     """Test Client -> Sitter routing with suffix."""
@@ -52,8 +52,8 @@ async def test_inbound_flow(mock_find_sitter, mock_find_client, mock_find_client
     payload = {"From": "+1client", "To": "+1sitter_twilio", "Body": "Hello there"}
     await intercept(MockRequest(payload))
     
-    mock_send_sms.assert_called_once()
-    _, kwargs = mock_send_sms.call_args
+    mock_queue_sms.assert_called_once()
+    _, kwargs = mock_queue_sms.call_args
     assert kwargs['from_number'] == "+1pool"
     assert kwargs['to_number'] == "+1sitter_real"
     assert kwargs['body'] == "Hello there"
@@ -70,12 +70,12 @@ async def test_inbound_flow(mock_find_sitter, mock_find_client, mock_find_client
 @patch('routers.intercept.update_client_linked_sitter')
 @patch('routers.intercept.update_message_status')
 @patch('routers.intercept.save_message')
-@patch('routers.intercept.send_sms')
+@patch('routers.intercept.queue_sms')
 @patch('routers.intercept.find_client_by_twilio_number')
 @patch('routers.intercept.find_client_by_phone')
 @patch('routers.intercept.find_sitter_by_twilio_number')
 async def test_outbound_flow(mock_find_sitter, mock_find_client, mock_find_client_pool,
-                             mock_send_sms, mock_save_msg, mock_update_status,
+                             mock_queue_sms, mock_save_msg, mock_update_status,
                              mock_link_sitter, mock_assign_num, mock_get_pool,
                              mock_log_event, mock_update_last_active):
     """Test Sitter -> Client routing."""
@@ -96,8 +96,8 @@ async def test_outbound_flow(mock_find_sitter, mock_find_client, mock_find_clien
     payload = {"From": "+1sitter_real", "To": "+1pool", "Body": "I'm on my way"}
     await intercept(MockRequest(payload))
     
-    mock_send_sms.assert_called_once()
-    _, kwargs = mock_send_sms.call_args
+    mock_queue_sms.assert_called_once()
+    _, kwargs = mock_queue_sms.call_args
     assert kwargs['from_number'] == "+1sitter_twilio"
     assert kwargs['to_number'] == "+1client"
     assert kwargs['body'] == "I'm on my way"
@@ -113,12 +113,12 @@ async def test_outbound_flow(mock_find_sitter, mock_find_client, mock_find_clien
 @patch('routers.intercept.update_client_linked_sitter')
 @patch('routers.intercept.update_message_status')
 @patch('routers.intercept.save_message')
-@patch('routers.intercept.send_sms')
+@patch('routers.intercept.queue_sms')
 @patch('routers.intercept.find_client_by_twilio_number')
 @patch('routers.intercept.find_client_by_phone')
 @patch('routers.intercept.find_sitter_by_twilio_number')
 async def test_assignment_updates_timestamp(mock_find_sitter, mock_find_client, mock_find_client_pool,
-                                            mock_send_sms, mock_save_msg, mock_update_status,
+                                            mock_queue_sms, mock_save_msg, mock_update_status,
                                             mock_link_sitter, mock_assign_num, mock_get_pool,
                                             mock_log_event, mock_update_last_active, mock_upsert):
     """Test that a new client triggers assignment and updates timestamp."""
@@ -149,10 +149,54 @@ async def test_assignment_updates_timestamp(mock_find_sitter, mock_find_client,
     mock_assign_num.assert_called_once()
     
     # Verify suffix was appended for new assignment
-    _, kwargs = mock_send_sms.call_args
+    _, kwargs = mock_queue_sms.call_args
     assert "From John :" in kwargs['body']
     print("SUCCESS: New client assignment triggered and suffix verified.")
 
+def test_concurrent_first_contacts():
+    print("\nTesting concurrent first contacts...")
+    from services import airtable_client
+    from services.airtable_client import _LazyTable
+    from simulators.fake_airtable import FakeBase, Latency
+    import routers.intercept as intercept_module
+
+    base = FakeBase(Latency(20))
+    tables = {}
+    for attribute, name in (("sitters_table", "Sitters"), ("clients_table", "Clients"),
+                            ("inventory_table", "Number Inventory"), ("messages_table", "Messages")):
+        tables[attribute] = _LazyTable(name)
+        tables[attribute]._table = base.table(name)
+    base.table("Sitters").seed({"Full Name": "Sam Sitter", "phone-number": "+15550001000", "twilio-number": "+15550002000"})
+    for i in range(5):
+        base.table("Number Inventory").seed({"phone-number": f"+1555400{i:04d}", "Lifecycle": "Pool", "Status": "Ready"})
+
+    senders = ["+15553000001", "+15553000002", "+15553000003", "+15553000004", "+15559999999", "+15559999999"]
+
+    async def send_all():
+        return await asyncio.gather(*(
+            intercept(MockRequest({"From": sender, "To": "+15550002000", "Body": "Hi"})) for sender in senders
+        ))
+
+    directory = MagicMock()
+    directory.should_reject.return_value = False
+    with patch.multiple(airtable_client, log_event=MagicMock(), **tables), \
+         patch.object(intercept_module, "directory", directory), \
+         patch.object(intercept_module, "log_event"), \
+         patch.object(intercept_module, "queue_sms") as mock_queue_sms:
+        responses = asyncio.run(send_all())
+
+    assert [r.status_code for r in responses] == [403] * 6
+    clients = list(base.table("Clients").records.values())
+    assert sorted(c["fields"]["phone-number"] for c in clients) == sorted(set(senders))   # one Client per handset
+    pool_numbers = [c["fields"]["twilio-number"] for c in clients]
+    assert len(set(pool_numbers)) == 5   # never the same number twice
+    inventory = base.table("Number Inventory").records.values()
+    assert all(r["fields"]["Status"] == "Assigned" for r in inventory)
+    assert sorted(kwargs["from_number"] for _, kwargs in mock_queue_sms.call_args_list) == sorted(
+        pool_numbers + [c["fields"]["twilio-number"] for c in clients if c["fields"]["phone-number"] == "+15559999999"]
+    )
+    print("SUCCESS: 5 handsets got 5 Clients and 5 different pool numbers; the repeat sender reused its number.")
+
 async def run_all():
     await test_inbound_flow()
     await test_outbound_flow()
@@ -160,3 +204,4 @@ async def run_all():
 
 if __name__ == "__main__":
     asyncio.run(run_all())
+    test_concurrent_first_contacts()
@@ -0,0 +1,38 @@
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.keyed_lock import KeyedLock
+
+def test_one_holder_per_key():
+    print("Testing per-key locks...")
+    locks = KeyedLock()
+    active, peak = {}, {}
+    guard = threading.Lock()
+
+    def critical(key):
+        with locks.hold(key):
+            with guard:
+                active[key] = active.get(key, 0) + 1
+                peak[key] = max(peak.get(key, 0), active[key])
+                overlap = sum(active.values())
+            time.sleep(0.02)
+            with guard:
+                active[key] -= 1
+            return overlap
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        overlaps = list(pool.map(critical, ["a", "b"] * 4))
+
+    assert peak == {"a": 1, "b": 1}   # never two holders of one key
+    assert max(overlaps) == 2   # different keys run side by side
+    assert len(locks) == 0   # released keys are dropped
+    print("SUCCESS: One holder per key, different keys in parallel, nothing left behind.")
+
+if __name__ == "__main__":
+    test_one_holder_per_key()
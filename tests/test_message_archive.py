@@ -0,0 +1,122 @@
+import gzip
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+# Add the project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import airtable_client
+from services.airtable_client import _LazyTable
+from services.message_archive import MessageArchiver
+from simulators.fake_airtable import FakeBase
+
+NOW = datetime(2024, 6, 1, 12, 0)
+
+def fake_messages():
+    base = FakeBase()
+    messages = _LazyTable("Messages")
+    messages._table = base.table("Messages")
+    # 250 messages over 5 days, 100+ days old, plus 10 recent ones
+    for i in range(250):
+        sent = NOW - timedelta(days=100 + i % 5, minutes=i)
+        messages._table.seed({"From": "+15550000001", "Body": f"old {i}", "Timestamp": sent.isoformat()}, f"recOld{i:03d}")
+    for i in range(10):
+        messages._table.seed({"From": "+15550000001", "Body": f"new {i}", "Timestamp": (NOW - timedelta(days=1)).isoformat()}, f"recNew{i:03d}")
+    return base, messages
+
+def read_archive(directory: str) -> dict:
+    """ {file name: records} of every archive file. """
+    files = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".jsonl.gz"):
+            with gzip.open(os.path.join(directory, name), "rt") as f:
+                files[name] = [json.loads(line) for line in f]
+    return files
+
+def test_archives_old_messages_by_day():
+    print("Testing message archival...")
+    base, messages = fake_messages()
+    with tempfile.TemporaryDirectory() as tmp, patch.object(airtable_client, "messages_table", messages):
+        archiver = MessageArchiver(tmp, after_days=90)
+        assert archiver.run(now=NOW, max_records=120) == {"archived": 120, "deleted": 120, "failed": 0}
+        assert archiver.run(now=NOW, max_records=1000) == {"archived": 130, "deleted": 130, "failed": 0}
+
+        files = read_archive(tmp)
+        assert len(files) == 5
+        for name, records in files.items():
+            assert all(name == f"messages-{r['fields']['Timestamp'][:10]}.jsonl.gz" for r in records)
+        assert sorted(r["id"] for records in files.values() for r in records) == [f"recOld{i:03d}" for i in range(250)]
+        assert sorted(base.table("Messages").records) == [f"recNew{i:03d}" for i in range(10)]
+        # Pages of 100 + 20, then 100 + 30 + an empty page; deletes of 10
+        assert base.calls.snapshot() == {"airtable.Messages.list": 5, "airtable.Messages.delete": 25}, base.calls.snapshot()
+    print("SUCCESS: Old messages moved to one gzip file per day, recent ones kept.")
+
+def test_resumes_after_interruption():
+    print("\nTesting resumption...")
+    base, messages = fake_messages()
+    with tempfile.TemporaryDirectory() as tmp, patch.object(airtable_client, "messages_table", messages), \
+         patch("services.airtable_client.log_event"):
+        archiver = MessageArchiver(tmp, after_days=90)
+        archiver.run(now=NOW, max_records=100)
+
+        # Crash while appending the next page: the files are rolled back
+        page = airtable_client.get_messages_before(NOW - timedelta(days=90))
+        with patch("gzip.GzipFile.write", side_effect=OSError("disk full")):
+            try:
+                archiver._append(page)
+            except OSError:
+                pass
+        # Airtable down while deleting a page: the IDs wait in the checkpoint
+        with patch.object(messages._table, "batch_delete", side_effect=RuntimeError("503")):
+            assert archiver.run(now=NOW, max_records=100)["failed"] == 100
+
+        assert archiver.run(now=NOW, max_records=1000) == {"archived": 50, "deleted": 150, "failed": 0}
+        ids = [r["id"] for records in read_archive(tmp).values() for r in records]
+        assert len(ids) == len(set(ids)) == 250
+        assert len(base.table("Messages").records) == 10
+    print("SUCCESS: Interrupted writes are rolled back and pending deletes finished, with no duplicates.")
+
+def test_resumes_after_partial_delete():
+    print("\nTesting resumption after a partly applied delete...")
+    base, messages = fake_messages()
+    batch_delete = messages._table.batch_delete
+    requests_made = []
+
+    def delete_then_drop_connection(record_ids):
+        # Airtable applied the delete, but the response never arrived
+        requests_made.append(record_ids)
+        batch_delete(record_ids)
+        if len(requests_made) == 3:
+            raise ConnectionError("Connection reset by peer")
+
+    with tempfile.TemporaryDirectory() as tmp, patch.object(airtable_client, "messages_table", messages), \
+         patch("utils.logger.log_error"):
+        archiver = MessageArchiver(tmp, after_days=90)
+        with patch.object(messages._table, "batch_delete", delete_then_drop_connection):
+            assert archiver.run(now=NOW, max_records=100) == {"archived": 100, "deleted": 90, "failed": 10}
+        assert len(archiver._load_checkpoint()["ids"]) == 10   # only the unconfirmed request
+        # Those 10 are gone from Airtable already: the retry is not stuck on the 404
+        assert archiver.run(now=NOW, max_records=0) == {"archived": 0, "deleted": 10, "failed": 0}
+
+        # A crash after some requests went through: the checkpoint still lists them
+        page = airtable_client.get_messages_before(NOW - timedelta(days=90), 100)
+        archiver._append(page)
+        ids = [record["id"] for record in page]
+        batch_delete(ids[:40])
+        archiver._save_checkpoint({"state": "deleting", "ids": ids})
+
+        assert archiver.run(now=NOW, max_records=1000) == {"archived": 50, "deleted": 150, "failed": 0}
+        assert archiver._load_checkpoint() == {}
+        archived = [r["id"] for records in read_archive(tmp).values() for r in records]
+        assert len(archived) == len(set(archived)) == 250
+        assert len(base.table("Messages").records) == 10
+    print("SUCCESS: Records already deleted count as deleted, so archiving carries on.")
+
+if __name__ == "__main__":
+    test_archives_old_messages_by_day()
+    test_resumes_after_interruption()
+    test_resumes_after_partial_delete()
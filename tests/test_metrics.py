@@ -0,0 +1,56 @@
+import os
+import sys
+
+# Add the project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import metrics
+
+def test_histogram_exposition():
+    print("Testing histogram exposition...")
+    histogram = metrics.Histogram("test_latency_seconds", "Test.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.5, route="/a")
+    histogram.observe(5.0, route="/a")
+
+    lines = histogram.collect()
+    assert 'test_latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'test_latency_seconds_bucket{route="/a",le="1.0"} 2' in lines
+    assert 'test_latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'test_latency_seconds_count{route="/a"} 3' in lines
+    print("SUCCESS: Cumulative buckets, sum and count rendered.")
+
+def test_instrumented_outcomes():
+    print("\nTesting instrumented call outcomes...")
+
+    @metrics.instrumented("test")
+    def rate_limited_then_ok():
+        metrics.record_response("test", 429)
+        metrics.record_response("test", 200)
+
+    @metrics.instrumented("test")
+    def swallowed_error():
+        try:
+            metrics.record_response("test", 500)
+            raise RuntimeError("boom")
+        except RuntimeError:
+            return None
+
+    @metrics.instrumented("test")
+    def ok():
+        metrics.record_response("test", 200)
+
+    rate_limited_then_ok()
+    swallowed_error()
+    ok()
+
+    text = metrics.render()
+    assert 'external_call_duration_seconds_count{service="test",function="rate_limited_then_ok",outcome="rate_limited"} 1' in text
+    assert 'external_call_duration_seconds_count{service="test",function="swallowed_error",outcome="error"} 1' in text
+    assert 'external_call_duration_seconds_count{service="test",function="ok",outcome="ok"} 1' in text
+    assert 'external_requests_total{service="test",status="429"} 1' in text
+    print("SUCCESS: 429s and swallowed errors are attributed to the calling function.")
+
+if __name__ == "__main__":
+    test_histogram_exposition()
+    test_instrumented_outcomes()
@@ -0,0 +1,88 @@
+import os
+import sys
+from unittest.mock import patch
+
+# Add the project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import phone
+from services import airtable_client, airtable_schema
+from services.airtable_client import _LazyTable, _phone_match_formula
+from services.replica import Replica
+from simulators.fake_airtable import FakeBase
+
+SAMPLES = [
+    "+15551234567", "(555) 123-4567", "1-555-123-4567", "555.123.4567", " 15551234567",
+    "+44 20 7946 0958", 15551234567, "12345", "", None, "no digits", "+1 555\n123 4567",
+]
+
+def test_canonical_forms():
+    print("Testing E.164 and national keys...")
+    assert phone.e164("(555) 123-4567") == "+15551234567"
+    assert phone.e164("1-555-123-4567") == "+15551234567"
+    assert phone.e164(" 15551234567") == "+15551234567"   # '+' decoded as a space
+    assert phone.e164("+44 20 7946 0958") == "+442079460958"
+    assert phone.e164("12345") is None and phone.e164(None) is None
+    assert phone.national_key("+1 (555) 123-4567") == "5551234567"
+    assert phone.national_key("12345") == "12345"
+    assert phone.national_key(None) == ""
+    print("SUCCESS: Every format maps to the same E.164 number and key.")
+
+def test_batch_matches_single():
+    print("\nTesting the batch API...")
+    phone.e164.cache_clear()
+    assert phone.e164_batch(SAMPLES) == [phone.e164(number) for number in SAMPLES]
+    assert phone.national_keys(SAMPLES) == [phone.national_key(number) for number in SAMPLES]
+    assert phone.e164_batch([]) == [] and phone.national_keys(iter([])) == []
+
+    # Batches leave the per-number cache alone
+    before = phone.e164.cache_info().currsize
+    phone.e164_batch([f"555{i:07d}" for i in range(1000)])
+    assert phone.e164.cache_info().currsize == before
+    print("SUCCESS: Batch results equal the per-number results.")
+
+def test_query_formula_uses_canonical_values():
+    print("\nTesting Airtable phone formulas...")
+    formula = _phone_match_formula("(555) 123-4567", ("phone-number",))
+    assert formula == "OR(SEARCH('5551234567', {phone-number}), {phone-number} = '+15551234567')"
+    # Nothing but digits reaches the formula
+    assert _phone_match_formula("555') , TRUE(), ('1234567", ("phone-number",)) == formula
+    assert _phone_match_formula("no digits", ("phone-number",)) is None
+    print("SUCCESS: Formulas only quote the normalized number.")
+
+def test_stored_phone_keys():
+    print("\nTesting stored phone key fields...")
+    base = FakeBase()
+    tables = {}
+    for attribute, name in (("sitters_table", "Sitters"), ("clients_table", "Clients"), ("inventory_table", "Number Inventory")):
+        tables[attribute] = _LazyTable(name)
+        tables[attribute]._table = base.table(name)
+    base.table("Sitters").seed({"Full Name": "Sam Sitter", "phone-number": "(555) 000-0001", "twilio-number": "+15550000002", "Notes": "long"}, "recSitter")
+    base.table("Clients").seed({"Name": "Old Client", "phone-number": "+15550000003", "phone-key": "5550000003", "twilio-key": ""}, "recClient")
+    base.table("Number Inventory").seed({"phone-number": "+15550000008", "Status": "Ready"}, "recPool")
+
+    with patch.object(airtable_client.settings, "AIRTABLE_PHONE_KEY_FIELDS", True), \
+         patch.multiple(airtable_client, replica=Replica(), log_event=lambda *args: None, **tables):
+        assert airtable_client.find_sitter_by_twilio_number("+15550000002") is None   # not backfilled yet
+
+        assert airtable_client.backfill_phone_keys("sitters") == 1
+        assert airtable_client.backfill_phone_keys("clients") == 0   # already up to date
+        assert airtable_client.backfill_phone_keys("sitters") == 0
+        assert base.calls.total("airtable.Clients.update") == 0
+
+        sitter = airtable_client.find_sitter_by_twilio_number("5550000002")
+        assert sitter["id"] == "recSitter"
+        assert set(sitter["fields"]) <= set(airtable_schema.fields("sitters", "lookup"))   # projected
+
+        # Writes keep the keys in step
+        created = airtable_client.create_client("+15550000007", "New Client")
+        assert created["fields"]["phone-key"] == "5550000007"
+        airtable_client.assign_pool_number_to_client(created["id"], "recPool", "+15550000008")
+        assert airtable_client.find_client_by_twilio_number("(555) 000-0008")["id"] == created["id"]
+    print("SUCCESS: Exact key lookups find backfilled and newly written records.")
+
+if __name__ == "__main__":
+    test_canonical_forms()
+    test_batch_matches_single()
+    test_query_formula_uses_canonical_values()
+    test_stored_phone_keys()
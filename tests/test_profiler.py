@@ -0,0 +1,87 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+# Add the project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import profiler, tracing
+
+def busy_airtable_lookup(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+def test_session_collects_collapsed_stacks():
+    print("Testing whole-process profiling session...")
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_airtable_lookup, args=(stop,), name="sms-+15550001000")
+    worker.start()
+    with tempfile.TemporaryDirectory() as tmp, \
+         patch.object(profiler.settings, "PROFILE_OUTPUT_DIR", tmp), \
+         patch.object(profiler.settings, "PROFILE_INTERVAL_MS", 1.0):
+        assert profiler.start_session()
+        assert not profiler.start_session()
+        time.sleep(0.2)
+        summary = profiler.stop_session()
+        stop.set()
+        worker.join()
+
+        assert summary["samples"] > 0
+        assert os.path.exists(summary["path"])
+    collapsed = profiler.session_collapsed()
+    line = next(l for l in collapsed.splitlines() if "busy_airtable_lookup" in l)
+    assert line.startswith("sms-N;")
+    assert int(line.rsplit(" ", 1)[1]) > 0
+    print("SUCCESS: Busy frames sampled as collapsed stacks, thread names scrubbed.")
+
+def test_slow_request_written_with_timeline():
+    print("\nTesting slow request capture...")
+    with tempfile.TemporaryDirectory() as tmp, \
+         patch.object(profiler.settings, "PROFILE_OUTPUT_DIR", tmp), \
+         patch.object(profiler.settings, "PROFILE_INTERVAL_MS", 1.0), \
+         patch.object(profiler.settings, "PROFILE_SLOW_REQUEST_MS", 20.0), \
+         patch.object(profiler.settings, "PROFILE_REQUEST_SAMPLE_RATE", 0.0):
+        for delay in (0.0, 0.05):
+            trace = tracing.start_trace("POST /intercept", force=True)
+            with profiler.profile_request(trace), trace:
+                with tracing.span("airtable.find_sitter_by_twilio_number", kind="client"):
+                    time.sleep(delay)
+        profiler._writer.submit(lambda: None).result()
+
+        files = sorted(os.listdir(tmp))
+        assert len(files) == 2, files
+        timeline_file = next(f for f in files if f.endswith(".timeline.json"))
+        with open(os.path.join(tmp, timeline_file)) as f:
+            timeline = json.load(f)
+    assert timeline["reason"] == "slow"
+    assert [s["name"] for s in timeline["trace"]["spans"]][-1] == "airtable.find_sitter_by_twilio_number"
+    print("SUCCESS: Only the slow request was written, with its external-call timeline.")
+
+def test_admin_endpoints_need_token():
+    print("\nTesting profiler admin endpoints...")
+    from fastapi import HTTPException
+    from routers.profiler import require_admin_token
+
+    with patch.object(profiler.settings, "PROFILER_ADMIN_TOKEN", ""):
+        try:
+            require_admin_token("anything")
+            assert False, "expected 404"
+        except HTTPException as e:
+            assert e.status_code == 404
+    with patch.object(profiler.settings, "PROFILER_ADMIN_TOKEN", "s3cret"):
+        try:
+            require_admin_token("wrong")
+            assert False, "expected 403"
+        except HTTPException as e:
+            assert e.status_code == 403
+        require_admin_token("s3cret")
+    print("SUCCESS: Disabled without a token, forbidden with the wrong one.")
+
+if __name__ == "__main__":
+    test_session_collects_collapsed_stacks()
+    test_slow_request_written_with_timeline()
+    test_admin_endpoints_need_token()
@@ -0,0 +1,61 @@
+import os
+import sys
+import time
+from unittest.mock import patch
+
+# Add the project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import rate_limiter
+from utils.rate_limiter import KeyedRateLimiter, RateLimiter
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+def test_token_bucket_burst_and_refill():
+    print("Testing the token bucket...")
+    clock = FakeClock()
+    with patch.object(rate_limiter, "time", clock):
+        limiter = RateLimiter(rate=5, burst=3)
+        assert [limiter.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert abs(limiter.try_acquire() - 0.2) < 1e-9   # one token every 1/5 s
+
+        clock.now += 0.1
+        assert abs(limiter.try_acquire() - 0.1) < 1e-9
+        clock.now += 10
+        assert [limiter.try_acquire() for _ in range(4)][-1] > 0   # refill is capped at the burst
+
+    # acquire() blocks the thread until the bucket refills
+    limiter = RateLimiter(rate=50, burst=1)
+    started = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    assert 0.1 * 0.9 <= time.monotonic() - started < 0.5
+
+    assert RateLimiter(rate=4.5).capacity == 4   # default burst: the whole-number rate
+    assert RateLimiter(rate=0.5).capacity == 1
+    print("SUCCESS: Bursts up to the capacity, then paced at the rate.")
+
+def test_keyed_buckets_are_independent_and_bounded():
+    print("\nTesting keyed token buckets...")
+    clock = FakeClock()
+    with patch.object(rate_limiter, "time", clock):
+        limiter = KeyedRateLimiter(rate=1, burst=2, max_keys=3)
+        assert [limiter.try_acquire("+15550000001") for _ in range(2)] == [0.0, 0.0]
+        assert limiter.try_acquire("+15550000001") == 1.0
+        assert limiter.try_acquire("+15550000002") == 0.0   # its own budget
+
+        limiter.try_acquire("+15550000003")
+        limiter.try_acquire("+15550000001")   # most recently used again
+        limiter.try_acquire("+15550000004")   # evicts +15550000002
+        assert list(limiter._buckets) == ["+15550000003", "+15550000001", "+15550000004"]
+        assert limiter.try_acquire("+15550000001") > 0   # kept its drained bucket
+    print("SUCCESS: One bucket per key, least recently used dropped past max_keys.")
+
+if __name__ == "__main__":
+    test_token_bucket_burst_and_refill()
+    test_keyed_buckets_are_independent_and_bounded()
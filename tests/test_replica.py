@@ -0,0 +1,131 @@
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from contextlib import contextmanager
+from unittest.mock import patch
+
+# Add the project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import airtable_client
+from services.airtable_client import _LazyTable
+from services.replica import Replica
+from simulators.fake_airtable import FakeBase
+
+@contextmanager
+def replicated_base(path=":memory:"):
+    """
+    Fake Sitters/Clients/Number Inventory tables behind the client's lazy
+    tables, with a fresh replica at `path`.
+    """
+    base = FakeBase()
+    tables = {}
+    for attribute, name in (("sitters_table", "Sitters"), ("clients_table", "Clients"), ("inventory_table", "Number Inventory")):
+        tables[attribute] = _LazyTable(name)
+        tables[attribute]._table = base.table(name)
+    an_hour_ago = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+    base.table("Sitters").seed({"Full Name": "Sam Sitter", "phone-number": "+15550000001", "twilio-number": "+15550000002"}, "recSitter", an_hour_ago)
+    base.table("Clients").seed({"Name": "Cara Client", "phone-number": "(555) 000-0003", "twilio-number": "+15550000004", "Linked Sitter": ["recSitter"]}, "recClient", an_hour_ago)
+    base.table("Number Inventory").seed({"phone-number": "+15550000004", "Status": "Assigned", "Assigned Sitter": ["recSitter"]}, "recPool", an_hour_ago)
+
+    replica = Replica(path)
+    with patch.multiple(airtable_client, replica=replica, log_event=lambda *args: None, **tables):
+        yield base, replica
+    replica.close()
+
+def test_finders_answer_from_replica():
+    print("Testing lookups against the replica...")
+    with replicated_base() as (base, replica):
+        assert airtable_client.find_client_by_twilio_number("+15550000004") is not None   # not ready: Airtable answers
+        replica.sync()
+        assert replica.is_ready
+        base.calls.reset()
+
+        assert airtable_client.find_sitter_by_twilio_number("5550000002")["id"] == "recSitter"
+        # Stored as "(555) 000-0003", which SEARCH('5550000003', ...) never matched
+        assert airtable_client.find_client_by_phone("+1 555 000 0003")["fields"]["Name"] == "Cara Client"
+        assert airtable_client.find_client_by_twilio_number("+15550000004")["id"] == "recClient"
+        assert airtable_client.find_inventory_record_by_number("+15550000004")["id"] == "recPool"
+        assert airtable_client.find_number_assigned_to_sitter("recSitter")["id"] == "recPool"
+        assert base.calls.total() == 0, base.calls.snapshot()
+
+        # A miss still asks Airtable (the record may be newer than the last sync)
+        assert airtable_client.find_client_by_twilio_number("+15559999999") is None
+        assert base.calls.total("airtable.Clients.list") == 1
+    print("SUCCESS: All five finders answered locally; a miss falls back to Airtable.")
+
+def test_writes_go_through_to_replica():
+    print("\nTesting write-through...")
+    with replicated_base() as (base, replica):
+        replica.sync()
+
+        airtable_client.deallocate_client("recClient", "recPool")
+        base.calls.reset()
+        assert airtable_client.find_client_by_twilio_number("+15550000004") is None
+        assert base.calls.total("airtable.Clients.list") == 1   # miss, confirmed by Airtable
+
+        airtable_client.assign_pool_number_to_client("recClient", "recPool", "+15550000006")
+        created = airtable_client.create_client("+15550000007", "New Client")
+        base.calls.reset()
+        assert airtable_client.find_client_by_twilio_number("+15550000006")["id"] == "recClient"
+        assert airtable_client.find_client_by_phone("+15550000007")["id"] == created["id"]
+        assert base.calls.total() == 0
+    print("SUCCESS: Lookups right after a write see it without asking Airtable.")
+
+def test_incremental_sync_and_restart():
+    print("\nTesting incremental sync and restart...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "replica.db")
+        with replicated_base(path) as (base, replica):
+            assert all(full for _, full in replica.sync().values())
+
+            # Edited in Airtable by someone else
+            base.table("Sitters").update("recSitter", {"twilio-number": "+15550000009"})
+            base.table("Number Inventory").delete("recPool")
+            changes = replica.sync()
+            assert changes["sitters"] == (1, False) and changes["clients"] == (0, False)
+            assert airtable_client.find_sitter_by_twilio_number("+15550000009")["id"] == "recSitter"
+
+            # Deletions are only seen by a full read
+            assert replica.find_by_phone("inventory", "+15550000004", ("phone_key",)) is not None
+            replica.sync(full=True)
+            assert replica.find_by_phone("inventory", "+15550000004", ("phone_key",)) is None
+
+            replica.close()
+            replica.open()
+            assert not replica.is_ready   # stored copy may be stale until this process syncs
+            assert not any(full for _, full in replica.sync().values())
+            assert replica.is_ready
+    print("SUCCESS: Only changed records are read, and a restart resumes incrementally.")
+
+def test_stale_read_keeps_newer_writes():
+    print("\nTesting a sync read that started before a write...")
+    with replicated_base() as (base, replica):
+        replica.sync()
+        as_of = datetime.now(timezone.utc)
+        stale = {name: airtable_client.get_replica_records(name) for name in ("clients", "sitters")}
+
+        # Written through while the read was in flight
+        airtable_client.assign_pool_number_to_client("recClient", "recPool", "+15550000006")
+        new_sitter = airtable_client.sitters_table.create({"Full Name": "Nia New", "twilio-number": "+15550000010"})
+        airtable_client.sitters_table.delete("recSitter")
+
+        replica.store("clients", stale["clients"], as_of, full=False)
+        replica.store("sitters", stale["sitters"], as_of, full=True)
+        assert replica.find_by_phone("clients", "+15550000006", ("twilio_key",))["id"] == "recClient"
+        assert replica.find_by_phone("clients", "+15550000004", ("twilio_key",)) is None
+        assert replica.find_by_phone("sitters", "+15550000010", ("twilio_key",))["id"] == new_sitter["id"]
+        assert replica.find_by_phone("sitters", "+15550000002", ("twilio_key",)) is None   # stays deleted
+
+        # A read started after the writes applies as usual
+        base.table("Clients").update("recClient", {"twilio-number": "+15550000011"})
+        replica.sync()
+        assert replica.find_by_phone("clients", "+15550000011", ("twilio_key",))["id"] == "recClient"
+    print("SUCCESS: An older read neither overwrote, dropped nor revived written-through records.")
+
+if __name__ == "__main__":
+    test_finders_answer_from_replica()
+    test_writes_go_through_to_replica()
+    test_incremental_sync_and_restart()
+    test_stale_read_keeps_newer_writes()
@@ -0,0 +1,86 @@
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add the project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import airtable_client, twilio_proxy
+from services.airtable_client import _LazyTable
+from services.session_reaper import SessionReaper
+from simulators.fake_airtable import FakeBase
+from simulators.fake_twilio import FakeTwilioClient
+
+NOW = datetime(2024, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+def session(sid: str, status: str = "open", age: timedelta = timedelta(days=3), expiry: timedelta = timedelta(days=11)):
+    created = NOW - age
+    return SimpleNamespace(sid=sid, status=status, date_created=created, date_updated=created, date_expiry=NOW + expiry)
+
+def fake_service():
+    base = FakeBase()
+    clients = _LazyTable("Clients")
+    clients._table = base.table("Clients")
+    twilio = FakeTwilioClient()
+
+    def client(record_id, session_sid, inactive_days):
+        last_active = (NOW - timedelta(days=inactive_days)).isoformat()
+        clients._table.seed({"Name": record_id, "Session SID": session_sid, "Last Active": last_active}, record_id)
+
+    # 150 active sessions, each linked to a recently active client
+    for i in range(150):
+        twilio.sessions[f"KCactive{i:03d}"] = session(f"KCactive{i:03d}")
+        client(f"recActive{i:03d}", f"KCactive{i:03d}", inactive_days=1)
+    # 120 whose clients went quiet over 14 days ago
+    for i in range(120):
+        twilio.sessions[f"KCidle{i:03d}"] = session(f"KCidle{i:03d}", age=timedelta(days=20), expiry=timedelta(days=-6 if i < 20 else 1))
+        client(f"recIdle{i:03d}", f"KCidle{i:03d}", inactive_days=15)
+    # 40 nobody references, 5 of them just created
+    for i in range(40):
+        twilio.sessions[f"KCorphan{i:03d}"] = session(f"KCorphan{i:03d}", age=timedelta(minutes=5) if i < 5 else timedelta(days=2))
+    # 10 closed but still linked, and 10 links to sessions Twilio no longer has
+    for i in range(10):
+        twilio.sessions[f"KCclosed{i:03d}"] = session(f"KCclosed{i:03d}", status="closed")
+        client(f"recClosed{i:03d}", f"KCclosed{i:03d}", inactive_days=1)
+        client(f"recGone{i:03d}", f"KCgone{i:03d}", inactive_days=1)
+    client("recNoSession", "", inactive_days=1)
+    return base, clients, twilio
+
+def test_reaps_expired_and_orphaned_sessions():
+    print("Testing the Proxy session reaper...")
+    base, clients, twilio = fake_service()
+    with patch.object(airtable_client, "clients_table", clients), patch.object(twilio_proxy, "client", twilio):
+        preview = SessionReaper(concurrency=8).run(now=NOW, dry_run=True)
+        assert twilio.calls.total("twilio.proxy.sessions.update") == 0
+        summary = SessionReaper(concurrency=8).run(now=NOW)
+
+    expected = {"scanned": 320, "expired": 120, "orphaned": 35, "failed": 0, "unlinked": 140}
+    assert preview == expected and summary == expected
+    calls = twilio.calls.snapshot()
+    assert calls["twilio.proxy.sessions.update"] == 155
+    assert "twilio.proxy.sessions.fetch" not in calls   # status comes from the listing
+    assert calls["twilio.proxy.sessions.list"] == 2 * 4   # 100 per page, per run
+
+    closed = {sid for sid, s in twilio.sessions.items() if s.status == "closed"}
+    assert len(closed) == 155 + 10
+    assert not any(sid.startswith("KCactive") for sid in closed)
+    assert {f"KCorphan{i:03d}" for i in range(5)}.isdisjoint(closed)
+
+    linked = {r["id"] for r in base.table("Clients").records.values() if r["fields"].get("Session SID")}
+    assert linked == {f"recActive{i:03d}" for i in range(150)}
+    assert base.calls.total("airtable.Clients.update") == 14   # 140 links cleared 10 per request
+    print(f"SUCCESS: Closed 155 sessions in {calls['twilio.proxy.sessions.update']} requests and cleared 140 links in 14.")
+
+def test_partial_scan_keeps_unseen_links():
+    print("\nTesting a capped reaper run...")
+    base, clients, twilio = fake_service()
+    with patch.object(airtable_client, "clients_table", clients), patch.object(twilio_proxy, "client", twilio):
+        summary = SessionReaper(concurrency=4).run(now=NOW, max_sessions=100, dry_run=True)
+    assert summary["scanned"] == 100 and summary["unlinked"] == 0
+    print("SUCCESS: Links to sessions the run did not reach are left alone.")
+
+if __name__ == "__main__":
+    test_reaps_expired_and_orphaned_sessions()
+    test_partial_scan_keeps_unseen_links()
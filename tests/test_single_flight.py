@@ -0,0 +1,47 @@
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.single_flight import SingleFlight
+
+def test_concurrent_identical_lookups_coalesce():
+    print("Testing Single-Flight coalescing...")
+
+    group = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def slow_lookup(number):
+        calls.append(number)
+        started.set()
+        time.sleep(0.2)
+        return {"id": "recSitter", "fields": {"twilio-number": number}}
+
+    def lookup():
+        return group.do(("find_sitter", "+15551234567"), slow_lookup, "+15551234567")
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        leader = pool.submit(lookup)
+        started.wait()
+        followers = [pool.submit(lookup) for _ in range(4)]
+        results = [leader.result()] + [f.result() for f in followers]
+
+    assert len(calls) == 1
+    assert group.coalesced == 4
+    assert all(r == results[0] for r in results)
+    # Followers get their own copy of the record
+    assert all(r is not results[0] for r in results[1:])
+
+    # Once finished, the next call runs again (no caching)
+    lookup()
+    assert len(calls) == 2
+
+    print("SUCCESS: Concurrent lookups shared one query.")
+
+if __name__ == "__main__":
+    test_concurrent_identical_lookups_coalesce()
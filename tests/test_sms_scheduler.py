@@ -0,0 +1,109 @@
+import os
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+# Add the project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import sms_scheduler
+from services.sms_scheduler import OutboundScheduler
+
+class TwilioError(Exception):
+    def __init__(self, status=None, code=None):
+        super().__init__(f"HTTP {status} code {code}")
+        self.status, self.code = status, code
+
+class FakeSender:
+    """ Records (time, from, to, body) per send; fails the first attempts listed in `errors`. """
+
+    def __init__(self, errors: dict = None):
+        self.sent = []
+        self.errors = errors or {}   # body -> list of exceptions to raise first
+        self.lock = threading.Lock()
+
+    def __call__(self, from_number, to_number, body):
+        with self.lock:
+            pending = self.errors.get(body)
+            if pending:
+                raise pending.pop(0)
+            self.sent.append((time.monotonic(), from_number, to_number, body))
+            return f"SM{len(self.sent):04d}"
+
+def test_fifo_order_and_pacing_per_number():
+    print("Testing per-number order and pacing...")
+    sender = FakeSender()
+    scheduler = OutboundScheduler(rate_per_number=20, max_retries=0, backoff_seconds=0.01)
+    with patch.object(sms_scheduler.twilio_proxy, "send_sms", sender):
+        futures = [scheduler.submit(from_number, "+15550009999", f"{from_number} #{i}")
+                   for i in range(5) for from_number in ("+15550000001", "+15550000002")]
+        assert [f.result(timeout=5) for f in futures]
+        assert scheduler.wait_idle(5) and scheduler.queue_depths() == {}
+
+    for from_number in ("+15550000001", "+15550000002"):
+        sends = [(t, body) for t, sender_number, _, body in sender.sent if sender_number == from_number]
+        assert [body for _, body in sends] == [f"{from_number} #{i}" for i in range(5)]
+        gaps = [b[0] - a[0] for a, b in zip(sends, sends[1:])]
+        assert min(gaps) >= 0.05 * 0.9, gaps   # 20 messages/s per number
+    # The two numbers are paced independently, not one after the other
+    assert sender.sent[-1][0] - sender.sent[0][0] < 0.05 * 9
+    print("SUCCESS: Each number sends in order at its own pace.")
+
+def test_throttling_is_retried_other_errors_fail():
+    print("\nTesting throttle retries...")
+    sender = FakeSender({
+        "throttled": [TwilioError(status=429), TwilioError(code=14107)],
+        "queue full": [TwilioError(code=30001)] * 5,
+        "bad number": [TwilioError(status=400, code=21211)],
+    })
+    scheduler = OutboundScheduler(rate_per_number=100, max_retries=3, backoff_seconds=0.01)
+    with patch.object(sms_scheduler.twilio_proxy, "send_sms", sender), patch.object(sms_scheduler, "log_info"):
+        throttled = scheduler.submit("+15550000001", "+15550009999", "throttled")
+        behind = scheduler.submit("+15550000001", "+15550009999", "behind")
+        gives_up = scheduler.submit("+15550000002", "+15550009999", "queue full")
+        bad = scheduler.submit("+15550000003", "+15550009999", "bad number")
+
+        assert throttled.result(timeout=5).startswith("SM")
+        assert behind.result(timeout=5).startswith("SM")
+        assert gives_up.exception(timeout=5).code == 30001
+        assert bad.exception(timeout=5).code == 21211
+
+    # The retried message kept its place ahead of the next one
+    assert [body for *_, body in sender.sent] == ["throttled", "behind"]
+    assert len(sender.errors["queue full"]) == 1   # first attempt plus max_retries
+    assert sender.errors["bad number"] == []   # one attempt only
+    print("SUCCESS: 429/14107/30001 are retried with backoff; other errors fail at once.")
+
+def test_queue_sms_returns_before_sending():
+    print("\nTesting queue_sms callbacks...")
+    release = threading.Event()
+    sender = FakeSender({"fails": [TwilioError(status=400, code=21610)]})
+
+    def slow_send(**kwargs):
+        release.wait(5)
+        return sender(**kwargs)
+
+    scheduler = OutboundScheduler(rate_per_number=100, max_retries=0, backoff_seconds=0.01)
+    failures = []
+    with patch.object(sms_scheduler, "scheduler", scheduler), \
+         patch.object(sms_scheduler.twilio_proxy, "send_sms", slow_send), \
+         patch.object(sms_scheduler, "log_error"), \
+         patch("services.airtable_client.update_message_status") as update_status:
+        started = time.monotonic()
+        sent = sms_scheduler.queue_sms("+15550000001", "+15550009999", "hello", message_id="recMsg1")
+        failed = sms_scheduler.queue_sms("+15550000001", "+15550009999", "fails", message_id="recMsg2", on_failure=failures.append)
+        assert time.monotonic() - started < 0.5 and not sent.done()
+
+        release.set()
+        assert scheduler.wait_idle(5)
+        failed.exception(timeout=5)
+
+    update_status.assert_called_once_with("recMsg1", "Sent")
+    assert len(failures) == 1 and failures[0].code == 21610
+    print("SUCCESS: The webhook returns at once; Sent status and failures are settled by callbacks.")
+
+if __name__ == "__main__":
+    test_fifo_order_and_pacing_per_number()
+    test_throttling_is_retried_other_errors_fail()
+    test_queue_sms_returns_before_sending()
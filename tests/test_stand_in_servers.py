@@ -0,0 +1,87 @@
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+from urllib.parse import quote
+
+# Add the project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from simulators.airtable_server import AirtableServer
+from simulators.stand_in import Faults
+from simulators.twilio_server import TwilioServer
+
+def call(method, url, payload=None, form=False):
+    data, headers = None, {"Authorization": "Bearer patTest"}
+    if payload is not None and form:
+        data = "&".join(f"{k}={quote(str(v))}" for k, v in payload.items()).encode()
+        headers["Content-Type"] = "application/x-www-form-urlencoded"
+    elif payload is not None:
+        data = json.dumps(payload).encode()
+        headers["Content-Type"] = "application/json"
+    request = urllib.request.Request(url, data=data, method=method, headers=headers)
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read() or b"{}")
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"{}")
+
+def test_airtable_stand_in_records():
+    print("Testing Airtable stand-in CRUD and formulas...")
+    server = AirtableServer(("127.0.0.1", 0), Faults(), base_rate=0, token_rate=0)
+    server.start()
+    server.seed({"Clients": [{"phone-number": "+15550000001"}, {"phone-number": "+15550000002"}]})
+    url = f"{server.url}/v0/appTest/Clients"
+
+    formula = quote("{phone-number} = '+15550000002'")
+    status, body = call("GET", f"{url}?filterByFormula={formula}")
+    assert status == 200 and len(body["records"]) == 1
+
+    status, body = call("GET", f"{url}?pageSize=1")
+    assert len(body["records"]) == 1 and body["offset"]
+
+    status, body = call("POST", url, {"records": [{"fields": {"phone-number": str(i)}} for i in range(11)]})
+    assert status == 422, "Batches are capped at 10 records"
+
+    status, body = call("GET", f"{url}/recMissing")
+    assert status == 404 and body == {"error": "NOT_FOUND"}
+
+    assert server.stats()["calls"]["airtable.Clients.list"] == 2
+    server.shutdown()
+    print("SUCCESS: Airtable stand-in serves the REST subset.")
+
+def test_airtable_stand_in_rate_limit():
+    print("\nTesting Airtable stand-in quota...")
+    server = AirtableServer(("127.0.0.1", 0), Faults(), base_rate=5, penalty_seconds=30)
+    server.start()
+    statuses = [call("GET", f"{server.url}/v0/appTest/Clients")[0] for _ in range(7)]
+
+    assert statuses[:5] == [200] * 5
+    assert statuses[5:] == [429, 429], "Locked out after exceeding 5 requests/second"
+    server.shutdown()
+    print("SUCCESS: 429 after Airtable's per-base quota.")
+
+def test_twilio_stand_in():
+    print("\nTesting Twilio stand-in...")
+    server = TwilioServer(("127.0.0.1", 0), Faults())
+    server.start()
+
+    status, message = call("POST", f"{server.url}/2010-04-01/Accounts/ACtest/Messages.json",
+                           {"From": "+15550000001", "To": "+15550000002", "Body": "hi"}, form=True)
+    assert status == 201 and message["sid"].startswith("SM")
+
+    status, session = call("POST", f"{server.url}/v1/Services/KStest/Sessions", {"UniqueName": "s"}, form=True)
+    assert status == 201
+    status, session = call("POST", f"{server.url}/v1/Services/KStest/Sessions/{session['sid']}", {"Status": "closed"}, form=True)
+    assert session["status"] == "closed"
+
+    status, error = call("GET", f"{server.url}/v1/Services/KStest/Sessions/KCmissing")
+    assert status == 404 and error["code"] == 20404
+    server.shutdown()
+    print("SUCCESS: Twilio stand-in serves Messages and Proxy.")
+
+if __name__ == "__main__":
+    test_airtable_stand_in_records()
+    test_airtable_stand_in_rate_limit()
+    test_twilio_stand_in()
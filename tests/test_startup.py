@@ -0,0 +1,103 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+# Add the project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import startup
+from services.airtable_client import _LazyTable
+
+def test_warm_up_runs_steps_concurrently():
+    print("Testing concurrent warm-up...")
+    with patch.object(startup.directory, "warm_start", side_effect=lambda: time.sleep(0.2)), \
+         patch.object(startup.twilio_proxy, "warm_up", side_effect=lambda: time.sleep(0.2)):
+        start = time.perf_counter()
+        startup.warm_up()
+        elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.35, elapsed
+    assert set(startup.readiness.steps) == {"directory", "twilio"}
+    print(f"SUCCESS: Two 200ms steps finished in {elapsed * 1000:.0f}ms.")
+
+def test_not_ready_until_warm_up_succeeds():
+    print("\nTesting readiness gating...")
+    readiness = startup.Readiness()
+    attempts = []
+
+    def flaky_refresh():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("Airtable unreachable")
+
+    async def run():
+        task = asyncio.create_task(startup.async_warm_up())
+        while not readiness.ready:
+            await asyncio.sleep(0.01)
+        await task
+
+    with patch.object(startup, "readiness", readiness), \
+         patch.object(startup, "WARM_UP_RETRY_SECONDS", 0.05), \
+         patch.object(startup.directory, "warm_start", side_effect=flaky_refresh), \
+         patch.object(startup.twilio_proxy, "warm_up"), \
+         patch.object(startup, "log_info"), patch.object(startup, "log_error"), \
+         patch.object(startup, "async_run_refresher", new=AsyncMock()) as refresher, \
+         patch.object(startup, "async_run_error_count_flusher", new=AsyncMock()) as flusher, \
+         patch.object(startup, "async_run_audit_rollups", new=AsyncMock()) as rollups, \
+         patch("services.deallocate_worker.async_run_worker", new=AsyncMock()) as worker:
+        assert readiness.status()["ready"] is False
+        asyncio.run(run())
+        refresher.assert_called_once()
+        flusher.assert_called_once()
+        rollups.assert_called_once()
+        worker.assert_called_once()
+
+    status = readiness.status()
+    assert status["ready"] is True and status["attempts"] == 2
+    assert "last_error" not in status
+    print("SUCCESS: /ready stays false through a failed attempt; background jobs start once ready.")
+
+def test_lazy_table_defers_client():
+    print("\nTesting lazy Airtable tables...")
+    table = _LazyTable("Clients")
+    assert table.name == "Clients"
+    assert table._table is None
+    print("SUCCESS: The table name is known without building the Airtable client.")
+
+def test_sdks_not_imported_at_startup():
+    print("\nTesting the Twilio and Airtable SDKs load lazily...")
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    check = "import sys, main; print(sorted(m for m in ('twilio.rest', 'twilio.http.http_client', 'pyairtable') if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", check], cwd=project_root, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]", result.stdout
+
+    from services import twilio_proxy
+    with patch.object(twilio_proxy, "_build_client") as build:
+        lazy = twilio_proxy._LazyClient()
+        build.assert_not_called()
+        lazy.messages
+        build.assert_called_once()
+
+    # Webhooks racing on a cold client build it once
+    def slow_build():
+        time.sleep(0.05)
+        return SimpleNamespace(messages="messages")
+
+    with patch.object(twilio_proxy, "_build_client", side_effect=slow_build) as build:
+        lazy = twilio_proxy._LazyClient()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            assert list(pool.map(lambda _: lazy.messages, range(8))) == ["messages"] * 8
+        build.assert_called_once()
+    print("SUCCESS: Importing the app loads neither SDK; the Twilio client is built once, on first use.")
+
+if __name__ == "__main__":
+    test_warm_up_runs_steps_concurrently()
+    test_not_ready_until_warm_up_succeeds()
+    test_lazy_table_defers_client()
+    test_sdks_not_imported_at_startup()
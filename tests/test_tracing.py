@@ -0,0 +1,95 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+# Add the project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.concurrency import run_in_threadpool
+from utils import metrics, tracing
+
+def test_spans_follow_request_into_threadpool():
+    print("Testing span nesting across run_in_threadpool...")
+
+    @metrics.instrumented("airtable")
+    def find_sitter():
+        return {"id": "rec1"}
+
+    def route():
+        with tracing.span("route_message"):
+            find_sitter()
+
+    async def handler():
+        with tracing.start_trace("POST /intercept") as root:
+            with tracing.span("parse_payload"):
+                tracing.set_trace_attribute("twilio.message_sid", "SM123")
+            await run_in_threadpool(route)
+        return root
+
+    with patch.object(tracing.settings, "TRACE_EXPORT_PATH", "unused"), \
+         patch.object(tracing, "_enqueue") as enqueue:
+        root = asyncio.run(handler())
+
+    trace = tracing.trace_to_dict(enqueue.call_args[0][0])
+    names = [s["name"] for s in trace["spans"]]
+    assert names == ["POST /intercept", "parse_payload", "route_message", "airtable.find_sitter"]
+    assert trace["attributes"]["twilio.message_sid"] == "SM123"
+
+    by_name = {s["name"]: s for s in trace["spans"]}
+    assert by_name["route_message"]["parent_id"] == root.span_id
+    assert by_name["airtable.find_sitter"]["parent_id"] == by_name["route_message"]["span_id"]
+    assert by_name["airtable.find_sitter"]["attributes"]["outcome"] == "ok"
+    print("SUCCESS: Service calls nest under the router stage that made them.")
+
+def test_disabled_and_untraced_are_noops():
+    print("\nTesting no-op spans...")
+    with patch.object(tracing.settings, "TRACE_EXPORT_PATH", ""), \
+         patch.object(tracing.settings, "TRACE_OTLP_ENDPOINT", ""):
+        assert tracing.start_trace("POST /intercept") is tracing.NOOP_SPAN
+    # Background jobs run outside any trace
+    assert tracing.span("airtable.find_sitter") is tracing.NOOP_SPAN
+    print("SUCCESS: Nothing is recorded without an export target or an open trace.")
+
+def test_jsonl_export_and_otlp_round_trip():
+    print("\nTesting JSONL and OTLP export...")
+    from simulators.otlp_collector import traces_from_otlp
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "traces.jsonl")
+        with patch.object(tracing.settings, "TRACE_EXPORT_PATH", path), \
+             patch.object(tracing.settings, "TRACE_OTLP_ENDPOINT", ""):
+            with tracing.start_trace("POST /intercept", **{"twilio.message_sid": "SM9"}):
+                with tracing.span("airtable.save_message", kind="client") as span:
+                    span.mark_error()
+
+            deadline = time.time() + 5
+            while time.time() < deadline and not os.path.exists(path):
+                time.sleep(0.01)
+            time.sleep(0.05)
+            with open(path) as f:
+                written = [json.loads(line) for line in f]
+
+    assert len(written) == 1
+    assert written[0]["attributes"]["twilio.message_sid"] == "SM9"
+    assert written[0]["spans"][1]["error"] is True
+
+    # The collector stand-in rebuilds the same shape from OTLP JSON
+    fake_trace = tracing._Trace()
+    with patch.object(tracing, "_enqueue"):
+        with tracing.Span(fake_trace, "POST /intercept", None, "server", {"twilio.message_sid": "SM9"}):
+            with tracing.span("send_sms"):
+                pass
+    rebuilt = traces_from_otlp(tracing.to_otlp([fake_trace]))[0]
+    assert rebuilt["attributes"]["twilio.message_sid"] == "SM9"
+    assert [s["name"] for s in rebuilt["spans"]] == ["POST /intercept", "send_sms"]
+    assert rebuilt["spans"][1]["parent_id"] == rebuilt["spans"][0]["span_id"]
+    print("SUCCESS: Traces export as JSON lines and survive an OTLP round trip.")
+
+if __name__ == "__main__":
+    test_spans_follow_request_into_threadpool()
+    test_disabled_and_untraced_are_noops()
+    test_jsonl_export_and_otlp_round_trip()
@@ -0,0 +1,84 @@
+import os
+import sys
+from unittest.mock import ANY, patch
+
+# Add the project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import airtable_client
+from services.error_counts import ErrorCounts
+from services.unit_of_work import unit_of_work
+
+@patch('services.airtable_client.error_counts', new_callable=ErrorCounts)
+@patch('services.airtable_client.inventory_table')
+@patch('services.airtable_client.clients_table')
+def test_client_writes_are_merged(mock_clients, mock_inventory, error_counts):
+    print("Testing Unit of Work merge...")
+
+    mock_clients.name = "Clients"
+    mock_clients.all.return_value = [
+        {"id": "recClient", "fields": {"Name": "John Client", "Twilio-Error-Count": "2"}}
+    ]
+
+    with unit_of_work():
+        airtable_client.find_client_by_phone("+15551234567")
+        airtable_client.assign_pool_number_to_client("recClient", "recPool", "+15550000001")
+        # The pool number is written at once, Client first, so a failure is seen by the caller
+        assert mock_clients.update.call_args_list[0][0] == ("recClient", {"twilio-number": "+15550000001", "Last Active": ANY})
+
+        airtable_client.update_client_linked_sitter("recClient", "Jane Sitter")
+        airtable_client.update_client_last_active("recClient")
+        airtable_client.increment_client_error_count("recClient")
+
+        # Nothing else is written to the Client until the unit of work ends
+        assert mock_clients.update.call_count == 1
+
+    mock_inventory.update.assert_called_once_with("recPool", {"Status": "Assigned"})
+
+    # One more PATCH for the Client; the error count waits for the periodic flush
+    mock_clients.get.assert_not_called()
+    assert mock_clients.update.call_count == 2
+    record_id, fields = mock_clients.update.call_args[0]
+    assert record_id == "recClient"
+    assert fields["Linked-Sitter"] == "Jane Sitter"
+    assert "Twilio-Error-Count" not in fields
+    assert "Last Active" in fields
+    assert error_counts.pending() == 1
+
+    print("SUCCESS: Remaining Client writes merged into a single update.")
+
+@patch('services.airtable_client.inventory_table')
+@patch('services.airtable_client.clients_table')
+def test_failed_pool_assignment_is_reported(mock_clients, mock_inventory):
+    print("\nTesting a failed pool assignment...")
+    mock_clients.name = "Clients"
+
+    # Client write fails: the number is never marked Assigned
+    mock_clients.update.side_effect = RuntimeError("422 INVALID_VALUE_FOR_COLUMN")
+    with unit_of_work():
+        assert airtable_client.assign_pool_number_to_client("recClient", "recPool", "+15550000001") is False
+    mock_inventory.update.assert_not_called()
+
+    # Inventory write fails: the Client's number is cleared again
+    mock_clients.update.side_effect = None
+    mock_clients.update.reset_mock()
+    mock_inventory.update.side_effect = RuntimeError("503")
+    with unit_of_work():
+        assert airtable_client.assign_pool_number_to_client("recClient", "recPool", "+15550000001") is False
+    assert mock_clients.update.call_args_list[-1][0] == ("recClient", {"twilio-number": ""})
+
+    print("SUCCESS: Failed assignments return False and leave no number half-assigned.")
+
+@patch('services.airtable_client.clients_table')
+def test_writes_outside_unit_of_work_are_immediate(mock_clients):
+    print("\nTesting writes without a Unit of Work...")
+
+    airtable_client.update_client_last_active("recClient")
+    mock_clients.update.assert_called_once()
+
+    print("SUCCESS: Background callers still write immediately.")
+
+if __name__ == "__main__":
+    test_client_writes_are_merged()
+    test_failed_pool_assignment_is_reported()
+    test_writes_outside_unit_of_work_are_immediate()
@@ -0,0 +1,49 @@
+import json
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+# Add the project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import webhook_capture
+
+def test_redaction():
+    print("Testing webhook redaction...")
+    redacted = webhook_capture.redact({
+        "From": "+13035551234", "To": "(720) 555-9876", "Body": "Door code is 1234",
+        "FromCity": "DENVER", "MessageSid": "SM123", "Name": "Jane Doe",
+    })
+
+    assert redacted["From"].startswith("+1555") and "3035551234" not in redacted["From"]
+    assert redacted["Body"] == "x" * len("Door code is 1234")
+    assert "FromCity" not in redacted
+    assert redacted["MessageSid"] == "SM123"
+    assert "Jane" not in redacted["Name"]
+
+    # Same person, same pseudonym regardless of formatting
+    assert webhook_capture.pseudonymize_number("13035551234") == redacted["From"]
+    print("SUCCESS: Numbers pseudonymized, bodies masked, location dropped.")
+
+def test_capture_appends_lines():
+    print("\nTesting webhook capture file...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "webhooks.jsonl")
+        with patch.object(webhook_capture.settings, "WEBHOOK_CAPTURE_PATH", path), \
+             patch.object(webhook_capture, "_file", None):
+            webhook_capture.capture_webhook("/intercept", "form", {"From": "+13035551234", "Body": "hi"})
+            webhook_capture.capture_webhook("/intercept", "form", {"From": "+13035551234", "Body": "again"})
+            webhook_capture._file.close()
+
+        with open(path) as f:
+            lines = [json.loads(line) for line in f]
+    assert len(lines) == 2
+    assert lines[0]["p"] == "/intercept" and lines[0]["e"] == "form"
+    assert lines[0]["d"]["From"] == lines[1]["d"]["From"]
+    assert lines[0]["t"] <= lines[1]["t"]
+    print("SUCCESS: One redacted JSON line per webhook.")
+
+if __name__ == "__main__":
+    test_redaction()
+    test_capture_appends_lines()
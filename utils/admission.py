@@ -0,0 +1,85 @@
+import math
+from fastapi import HTTPException, Request
+from config import settings
+from utils.rate_limiter import KeyedRateLimiter
+from utils.logger import logger
+from utils.metrics import Counter, Gauge
+from utils import tracing
+from utils.phone import national_key
+
+sender_limiter = KeyedRateLimiter(settings.WEBHOOK_SENDER_RATE, settings.WEBHOOK_SENDER_BURST)
+recipient_limiter = KeyedRateLimiter(settings.WEBHOOK_RECIPIENT_RATE, settings.WEBHOOK_RECIPIENT_BURST)
+
+_in_flight = 0
+
+Gauge("webhooks_in_flight", "Webhooks admitted and still being handled.", lambda: _in_flight)
+webhooks_shed = Counter("webhooks_shed_total", "Webhooks rejected by admission control.", ("status",))
+
+
+async def _read_numbers(request: Request):
+    """
+    Extracts From/To from the webhook body without the full payload parser.
+    Starlette caches the parsed body, so the handler does not read it twice.
+    """
+    data = {}
+    if "application/json" in request.headers.get("content-type", "").lower():
+        try:
+            data = await request.json()
+        except Exception:
+            data = {}
+    if not data:
+        try:
+            data = await request.form()
+        except Exception:
+            data = {}
+    return (
+        data.get("From") or request.query_params.get("From"),
+        data.get("To") or request.query_params.get("To"),
+    )
+
+
+def _reject(status_code: int, retry_after: float, reason: str):
+    logger.warning(f"Webhook shed ({status_code}): {reason}")
+    webhooks_shed.inc(status=str(status_code))
+    raise HTTPException(
+        status_code=status_code,
+        detail=reason,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+async def webhook_admission(request: Request):
+    """
+    FastAPI dependency guarding the webhook routers.
+
+    Checks, cheapest first:
+    1. Global in-flight cap -> 503 when the service is already saturated.
+    2. Per-From token bucket -> 429 for a single flooding handset.
+    3. Per-To token bucket -> 429 for a burst aimed at one entry number.
+
+    Rejections happen before any Airtable or Twilio work and only write to stdout.
+    """
+    global _in_flight
+    with tracing.span("admission"):
+        if _in_flight >= settings.WEBHOOK_MAX_IN_FLIGHT:
+            _reject(503, 1, f"{_in_flight} webhooks already in flight")
+
+        from_number, to_number = await _read_numbers(request)
+
+        from_key = national_key(from_number)
+        if from_key:
+            wait = sender_limiter.try_acquire(from_key)
+            if wait:
+                _reject(429, wait, f"sender {from_number} over budget")
+
+        to_key = national_key(to_number)
+        if to_key:
+            wait = recipient_limiter.try_acquire(to_key)
+            if wait:
+                _reject(429, wait, f"recipient {to_number} over budget")
+
+    _in_flight += 1
+    try:
+        yield
+    finally:
+        _in_flight -= 1
@@ -0,0 +1,136 @@
+"""
+Recent Events
+=============
+A fixed-size, in-process ring buffer of the latest routing decisions and
+events, for live debugging without browsing the Airtable Audit Log.
+
+Key Functionality:
+- `recent_events.record(event_type, message, details)`: called for every
+  `airtable_client.log_event` (so every log_info/log_error line, each routing
+  step and each business event) and by the HTTP middleware for each webhook.
+  Costs a lock and a deque append; no I/O.
+- Keeps the last EVENT_BUFFER_SIZE events. Each event gets a sequence number
+  (`id`) that increases by one per event, which is the pagination cursor and
+  the server-sent-events ID.
+- `page(before, limit, event_type)`: newest first, for GET /debug/events.
+- `since(after)` / `wait(after, timeout)`: events after a cursor, for the
+  /debug/events/stream live stream. Waiting streams are woken on their own
+  event loop when an event is recorded from any thread.
+- Events recorded inside a trace carry its `trace_id` (see utils/tracing.py).
+"""
+
+import asyncio
+import itertools
+import threading
+from collections import deque
+from datetime import datetime
+from config import settings
+from utils import tracing
+
+class EventBuffer:
+    """
+    The last `size` events, oldest first. Thread-safe.
+    """
+
+    def __init__(self, size: int):
+        self._events = deque(maxlen=size)
+        self._last_id = 0
+        self._lock = threading.Lock()
+        self._waiters = set()   # (loop, asyncio.Event) per waiting stream
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def record(self, event_type: str, message: str, details=""):
+        event = {
+            "time": datetime.utcnow().isoformat(),
+            "type": event_type,
+            "message": message,
+            "details": details,
+        }
+        trace = getattr(tracing.current_span(), "trace", None)
+        if trace is not None:
+            event["trace_id"] = trace.trace_id
+        with self._lock:
+            self._last_id += 1
+            event["id"] = self._last_id
+            self._events.append(event)
+            waiters = list(self._waiters)
+        for loop, wakeup in waiters:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                # The stream's loop is closed; it will not wait again
+                pass
+
+    def _after(self, after: int) -> list:
+        # Ids are consecutive, so the first event after the cursor is found by offset
+        first_id = self._last_id - len(self._events) + 1
+        return list(itertools.islice(self._events, max(0, after + 1 - first_id), None))
+
+    def since(self, after: int) -> tuple:
+        """
+        Events recorded after a cursor.
+
+        Args:
+            after (int): Last event id already seen.
+
+        Returns:
+            tuple: (events oldest first, number of events missed because they
+            already left the buffer)
+        """
+        with self._lock:
+            events = self._after(after)
+        first_id = events[0]["id"] if events else self._last_id + 1
+        return events, max(0, first_id - after - 1)
+
+    def page(self, before: int = None, limit: int = 50, event_type: str = None) -> list:
+        """
+        Events older than a cursor, newest first.
+
+        Args:
+            before (int): Only events with a smaller id (default: the newest event).
+            limit (int): Maximum number of events.
+            event_type (str): Only events of this type (e.g. "ERROR", "WEBHOOK").
+
+        Returns:
+            list: Up to `limit` events.
+        """
+        with self._lock:
+            events = list(self._events)
+        page = []
+        for event in reversed(events):
+            if before is not None and event["id"] >= before:
+                continue
+            if event_type and event["type"] != event_type:
+                continue
+            page.append(event)
+            if len(page) >= limit:
+                break
+        return page
+
+    async def wait(self, after: int, timeout: float) -> bool:
+        """
+        Waits until an event after the cursor is recorded.
+
+        Returns:
+            bool: False on timeout.
+        """
+        wakeup = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), wakeup)
+        with self._lock:
+            if self._last_id > after:
+                return True
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(wakeup.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+# Process-wide buffer behind airtable_client.log_event and /debug/events
+recent_events = EventBuffer(settings.EVENT_BUFFER_SIZE)
@@ -0,0 +1,43 @@
+import threading
+from contextlib import contextmanager
+
+
+class _Entry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.holders = 0
+
+
+class KeyedLock:
+    """
+    One mutex per key (e.g. per normalized phone number).
+
+    Unlike SingleFlight, every caller runs its own critical section, one at a
+    time per key, so a caller that waited sees what the previous one wrote.
+    A key's lock is dropped once nobody holds or waits for it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    @contextmanager
+    def hold(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _Entry()
+                self._entries[key] = entry
+            entry.holders += 1
+        try:
+            with entry.lock:
+                yield
+        finally:
+            with self._lock:
+                entry.holders -= 1
+                if not entry.holders:
+                    del self._entries[key]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
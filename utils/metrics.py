@@ -0,0 +1,221 @@
+"""
+Metrics
+=======
+Minimal in-process Prometheus metrics, rendered in the text exposition
+format at GET /metrics.
+
+Key Functionality:
+- Counter, Histogram and callback Gauge primitives with labels.
+- `instrumented(service)` decorator timing every airtable_client/twilio_proxy
+  function by outcome: "ok", "rate_limited" (a 429 was seen, even if a retry
+  then succeeded), "error" (raised, or swallowed an HTTP error) or "local"
+  (answered from the local read replica, see `record_local_read()`).
+- `record_response(service, status)` for the HTTP layer of each client, so
+  429s and errors count even when the calling function catches them.
+- Each instrumented call is also a client span in the request's trace
+  (see `utils/tracing.py`), tagged with its outcome.
+
+Recording is a dict lookup plus a lock-protected add; gauges are only
+evaluated when /metrics is scraped.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from utils import tracing
+
+# Seconds; covers in-memory hits through slow Airtable pages
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry = []
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}   # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def time(self, **labels):
+        """
+        Context manager observing the duration of the block.
+        """
+        return _Timer(self, labels)
+
+    def collect(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._values.items()]
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: dict):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+class Gauge:
+    """
+    A gauge whose value is read from `function` at scrape time.
+    """
+
+    def __init__(self, name: str, documentation: str, function):
+        self.name = name
+        self.documentation = documentation
+        self.function = function
+        _registry.append(self)
+
+    def collect(self):
+        try:
+            value = self.function()
+        except Exception:
+            return []
+        if value is None:
+            return []
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge", f"{self.name} {value}"]
+
+def render() -> str:
+    """
+    All registered metrics in the Prometheus text format.
+    """
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
+
+# -- HTTP and external-call metrics ---------------------------------------
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "Inbound request latency by route and response status.",
+    ("route", "method", "status"),
+)
+external_call_duration = Histogram(
+    "external_call_duration_seconds",
+    "Airtable/Twilio client function latency by outcome (_count is the call counter).",
+    ("service", "function", "outcome"),
+)
+external_requests = Counter(
+    "external_requests_total", "HTTP requests sent to Airtable/Twilio by response status, including retries.",
+    ("service", "status"),
+)
+
+_active_calls = threading.local()
+
+def record_response(service: str, status: int):
+    """
+    Counts one HTTP response from an external service and flags the
+    instrumented calls in progress on this thread.
+    """
+    external_requests.inc(service=service, status=str(status))
+    if status < 400:
+        return
+    for call in getattr(_active_calls, "stack", ()):
+        call["rate_limited" if status == 429 else "error"] = True
+
+def record_local_read():
+    """
+    Flags the instrumented call in progress on this thread as answered locally.
+    """
+    stack = getattr(_active_calls, "stack", None)
+    if stack:
+        stack[-1]["local"] = True
+
+def instrumented(service: str):
+    """
+    Decorator recording `external_call_duration_seconds` for a client function.
+    """
+    def decorator(func):
+        name = func.__name__
+        span_name = f"{service}.{name}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            stack = getattr(_active_calls, "stack", None)
+            if stack is None:
+                stack = _active_calls.stack = []
+            call = {"rate_limited": False, "error": False}
+            stack.append(call)
+            with tracing.span(span_name, kind="client") as span:
+                start = time.perf_counter()
+                try:
+                    result = func(*args, **kwargs)
+                except Exception:
+                    call["error"] = True
+                    raise
+                finally:
+                    stack.pop()
+                    outcome = (
+                        "rate_limited" if call["rate_limited"] else "error" if call["error"]
+                        else "local" if call.get("local") else "ok"
+                    )
+                    external_call_duration.observe(time.perf_counter() - start, service=service, function=name, outcome=outcome)
+                    span.set_attribute("outcome", outcome)
+                    if call["error"]:
+                        span.mark_error()
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,92 @@
+"""
+Phone Numbers
+=============
+The one place phone numbers are canonicalized. Every index (phone directory,
+read replica, admission buckets, webhook capture) and every Airtable phone
+query derives its keys from here.
+
+Key Functionality:
+- `e164(number)`: canonical E.164 form ('+15551234567'), or None when the
+  input has too few digits to be a phone number.
+    - '(555) 123-4567' -> '+15551234567' (bare national numbers get DEFAULT_COUNTRY_CODE)
+    - '1-555-123-4567' -> '+15551234567'
+    - '+44 20 7946 0958' -> '+442079460958'
+- `national_key(number)`: the last 10 digits ('5551234567'), the comparison
+  key between numbers stored in different formats. For NANP numbers this is
+  the national number.
+- Both are memoized: webhooks keep hitting the same Sitter, Client and pool
+  numbers.
+- `e164_batch(numbers)` / `national_keys(numbers)`: the same results for a
+  whole list at once (bulk imports, directory and replica builds). One regex
+  pass over all numbers instead of one per number, and the per-number
+  caches are left alone so a bulk load doesn't evict the hot numbers.
+"""
+
+import re
+from functools import lru_cache
+
+DEFAULT_COUNTRY_CODE = "1"
+NATIONAL_DIGITS = 10
+MIN_DIGITS = 10
+
+_NON_DIGITS = re.compile(r"[^0-9]")
+# Batch mode keeps the newline separating the numbers
+_NON_DIGITS_OR_NEWLINE = re.compile(r"[^0-9\n]")
+
+def _e164_from_digits(raw: str, digits: str):
+    if len(digits) < MIN_DIGITS:
+        return None
+    # Explicit international prefix: trust the digits as given
+    if raw.startswith("+"):
+        return f"+{digits}"
+    # Bare national number (NANP default)
+    if len(digits) == NATIONAL_DIGITS:
+        return f"+{DEFAULT_COUNTRY_CODE}{digits}"
+    return f"+{digits}"
+
+@lru_cache(maxsize=8192)
+def e164(number) -> str:
+    """
+    Canonical E.164 form of a phone number.
+
+    Args:
+        number (str): Any format ('+15551234567', '(555) 123-4567', 15551234567, ...).
+
+    Returns:
+        str: '+15551234567', or None if there are fewer than 10 digits.
+    """
+    if not number:
+        return None
+    raw = str(number).strip()
+    return _e164_from_digits(raw, _NON_DIGITS.sub("", raw))
+
+@lru_cache(maxsize=8192)
+def national_key(number) -> str:
+    """
+    Comparison key of a phone number: its last 10 digits ('' for no digits).
+    """
+    if not number:
+        return ""
+    return _NON_DIGITS.sub("", str(number))[-NATIONAL_DIGITS:]
+
+def _digits_batch(raws: list) -> list:
+    if not raws:
+        return []
+    return _NON_DIGITS_OR_NEWLINE.sub("", "\n".join(raws)).split("\n")
+
+def _raw(number) -> str:
+    # Embedded newlines would shift the batch split
+    return str(number).strip().replace("\n", " ") if number else ""
+
+def e164_batch(numbers) -> list:
+    """
+    `e164()` of every number, in order (None for invalid ones).
+    """
+    raws = [_raw(number) for number in numbers]
+    return [_e164_from_digits(raw, digits) for raw, digits in zip(raws, _digits_batch(raws))]
+
+def national_keys(numbers) -> list:
+    """
+    `national_key()` of every number, in order.
+    """
+    return [digits[-NATIONAL_DIGITS:] for digits in _digits_batch([_raw(number) for number in numbers])]
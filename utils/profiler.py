@@ -0,0 +1,251 @@
+"""
+Profiler
+========
+Opt-in statistical (wall-clock) sampling profiler for finding hot Python
+frames in production.
+
+Key Functionality:
+- One sampler thread reads every thread's stack (`sys._current_frames()`)
+  each PROFILE_INTERVAL_MS and counts them as collapsed stacks
+  ("thread;module:function;... count"), the input format of flamegraph.pl
+  and speedscope. Threads parked in an idle wait (empty worker pools, the
+  event loop's select) are skipped.
+- Request capture: a PROFILE_REQUEST_SAMPLE_RATE fraction of webhooks, plus
+  any webhook slower than PROFILE_SLOW_REQUEST_MS, is written to
+  PROFILE_OUTPUT_DIR as `<stem>.collapsed` (stacks sampled while it ran) and
+  `<stem>.timeline.json` (its trace: every Airtable/Twilio call with offsets).
+- Whole-process sessions started and stopped from the admin endpoints
+  (`routers/profiler.py`); the stacks are kept for download and written to disk.
+
+Samples taken during a request include every busy thread in the process, so
+under heavy concurrency a request profile also shows its neighbours' work;
+the timeline is specific to the request.
+
+The sampler only runs while a session is open or requests are being captured.
+"""
+
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from config import settings
+from utils import tracing
+
+# Leaf frames of threads that are waiting for work, not doing it
+IDLE_FRAMES = {
+    ("threading", "wait"),
+    ("selectors", "select"),
+    ("queue", "get"),
+    ("threading", "_wait_for_tstate_lock"),
+    ("thread", "_worker"),   # concurrent.futures worker blocked on its C-level queue
+}
+MAX_CAPTURES_PER_MINUTE = 30
+
+_lock = threading.Lock()
+_windows = set()          # _RequestProfile objects currently recording
+_session = None           # Counter while a whole-process session is open
+_session_started = 0.0
+_last_session = None      # {"stacks": Counter, "seconds": float, "path": str}
+_sampler = None
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="profile-writer")
+_capture_times = []
+
+def _frame_name(code) -> str:
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{code.co_name}"
+
+def _thread_label(name: str) -> str:
+    # Per-number SMS workers are named after the number; keep profiles free of it
+    return re.sub(r"[+\d]+", "N", name).replace(" ", "_")
+
+def _collapse(frame, thread_name: str):
+    """
+    Root-first "thread;frame;frame" string for one stack, or None if idle.
+    """
+    leaf = frame.f_code
+    module = os.path.splitext(os.path.basename(leaf.co_filename))[0]
+    if (module, leaf.co_name) in IDLE_FRAMES:
+        return None
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame.f_code))
+        frame = frame.f_back
+    names.append(_thread_label(thread_name))
+    return ";".join(reversed(names))
+
+def _sample_once(own_ident: int) -> list:
+    names = {t.ident: t.name for t in threading.enumerate()}
+    stacks = []
+    for ident, frame in sys._current_frames().items():
+        if ident == own_ident:
+            continue
+        stack = _collapse(frame, names.get(ident, "thread"))
+        if stack:
+            stacks.append(stack)
+    return stacks
+
+def _run_sampler():
+    global _sampler
+    own_ident = threading.get_ident()
+    interval = settings.PROFILE_INTERVAL_MS / 1000
+    while True:
+        with _lock:
+            if _session is None and not _windows:
+                # Nothing to record: retire, the next session/capture restarts it
+                _sampler = None
+                return
+        stacks = _sample_once(own_ident)
+        with _lock:
+            targets = [w.stacks for w in _windows]
+            if _session is not None:
+                targets.append(_session)
+            for counter in targets:
+                counter.update(stacks)
+        time.sleep(interval)
+
+def _ensure_sampler():
+    # Caller holds _lock
+    global _sampler
+    if _sampler is None:
+        _sampler = threading.Thread(target=_run_sampler, name="profiler-sampler", daemon=True)
+        _sampler.start()
+
+def format_collapsed(stacks: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+# -- Request capture --------------------------------------------------------
+
+def request_profiling_enabled() -> bool:
+    return settings.PROFILE_REQUEST_SAMPLE_RATE > 0 or settings.PROFILE_SLOW_REQUEST_MS > 0
+
+class _RequestProfile:
+    def __init__(self, trace, sampled: bool):
+        self.trace = trace
+        self.sampled = sampled
+        self.stacks = Counter()
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        with _lock:
+            _windows.add(self)
+            _ensure_sampler()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed_ms = (time.perf_counter() - self.start) * 1000
+        with _lock:
+            _windows.discard(self)
+        slow = settings.PROFILE_SLOW_REQUEST_MS > 0 and elapsed_ms >= settings.PROFILE_SLOW_REQUEST_MS
+        if (self.sampled or slow) and _capture_allowed():
+            timeline = tracing.trace_to_dict(self.trace.trace) if isinstance(self.trace, tracing.Span) else None
+            _writer.submit(_write_capture, "slow" if slow else "sampled", elapsed_ms, self.stacks, timeline)
+        return False
+
+def profile_request(trace):
+    """
+    Context manager recording samples while one request runs; pass the
+    request's root span so its timeline is saved alongside.
+    """
+    if not request_profiling_enabled():
+        return tracing.NOOP_SPAN
+    sampled = random.random() < settings.PROFILE_REQUEST_SAMPLE_RATE
+    if not sampled and settings.PROFILE_SLOW_REQUEST_MS <= 0:
+        return tracing.NOOP_SPAN
+    return _RequestProfile(trace, sampled)
+
+def _capture_allowed() -> bool:
+    # A slowdown makes every request slow; don't fill the disk with them
+    now = time.monotonic()
+    with _lock:
+        _capture_times[:] = [t for t in _capture_times if now - t < 60]
+        if len(_capture_times) >= MAX_CAPTURES_PER_MINUTE:
+            return False
+        _capture_times.append(now)
+    return True
+
+def _write_capture(reason: str, elapsed_ms: float, stacks: Counter, timeline: dict):
+    try:
+        os.makedirs(settings.PROFILE_OUTPUT_DIR, exist_ok=True)
+        route = re.sub(r"\W+", "_", timeline["name"]).strip("_") if timeline else "request"
+        stem = os.path.join(
+            settings.PROFILE_OUTPUT_DIR,
+            f"{time.strftime('%Y%m%d-%H%M%S')}-{route}-{int(elapsed_ms)}ms-{os.urandom(3).hex()}",
+        )
+        with open(stem + ".collapsed", "w") as f:
+            f.write(format_collapsed(stacks))
+        with open(stem + ".timeline.json", "w") as f:
+            json.dump({"reason": reason, "duration_ms": round(elapsed_ms, 3), "trace": timeline}, f, default=str)
+    except Exception as e:
+        from utils.logger import logger
+        logger.warning(f"Failed to write request profile: {e}")
+
+# -- Whole-process sessions -------------------------------------------------
+
+def start_session() -> bool:
+    """
+    Starts sampling every thread. Returns False if a session is already open.
+    """
+    global _session, _session_started
+    with _lock:
+        if _session is not None:
+            return False
+        _session = Counter()
+        _session_started = time.monotonic()
+        _ensure_sampler()
+    return True
+
+def stop_session():
+    """
+    Stops the open session and writes its collapsed stacks to disk.
+
+    Returns:
+        dict: Session summary, or None if no session was open.
+    """
+    global _session, _last_session
+    with _lock:
+        if _session is None:
+            return None
+        stacks, _session = _session, None
+        seconds = time.monotonic() - _session_started
+
+    path = os.path.join(settings.PROFILE_OUTPUT_DIR, f"session-{time.strftime('%Y%m%d-%H%M%S')}.collapsed")
+    try:
+        os.makedirs(settings.PROFILE_OUTPUT_DIR, exist_ok=True)
+        with open(path, "w") as f:
+            f.write(format_collapsed(stacks))
+    except Exception as e:
+        from utils.logger import logger
+        logger.warning(f"Failed to write profiling session: {e}")
+        path = None
+
+    _last_session = {"stacks": stacks, "seconds": seconds, "path": path}
+    return session_status()
+
+def session_status() -> dict:
+    with _lock:
+        if _session is not None:
+            return {"running": True, "seconds": round(time.monotonic() - _session_started, 1), "samples": sum(_session.values())}
+    if _last_session is None:
+        return {"running": False}
+    return {
+        "running": False,
+        "seconds": round(_last_session["seconds"], 1),
+        "samples": sum(_last_session["stacks"].values()),
+        "path": _last_session["path"],
+    }
+
+def session_collapsed():
+    """
+    Collapsed stacks of the open session (so far) or the last finished one.
+    """
+    with _lock:
+        if _session is not None:
+            return format_collapsed(Counter(_session))
+    if _last_session is None:
+        return None
+    return format_collapsed(_last_session["stacks"])
@@ -1,5 +1,8 @@
 from typing import Iterable, Dict, Any, Optional
 from fastapi import Request, HTTPException
+from config import settings
+from utils.webhook_capture import capture_webhook
+from utils import tracing
 
 
 async def parse_incoming_payload(
@@ -14,7 +17,40 @@ async def parse_incoming_payload(
     accepts all supported formats and enforces required fields with a clear
     error message instead of the generic "Field required" validation error.
     """
+    with tracing.span("parse_payload"):
+        data, encoding = await _read_payload(request)
+
+    # Correlates the trace with Twilio's logs and the Messages table
+    if data.get("MessageSid"):
+        tracing.set_trace_attribute("twilio.message_sid", data["MessageSid"])
+
+    # Debug log the extracted data before filtering (stdout only: this runs on
+    # every webhook, including ones rejected before any Airtable work)
+    from utils.logger import logger
+    logger.info(f"Raw parsed data: {data}")
+
+    # Redacted copy for traffic replay
+    if settings.WEBHOOK_CAPTURE_PATH:
+        capture_webhook(request.url.path, encoding, data)
+
+    missing = [field for field in required_fields if not data.get(field)]
+    if missing:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Missing required field(s): {', '.join(missing)}",
+        )
+
+    # Limit output to only the fields we expect if optional_fields provided
+    if optional_fields is not None:
+        allowed = set(required_fields) | set(optional_fields)
+        return {k: v for k, v in data.items() if k in allowed}
+
+    return data
+
+
+async def _read_payload(request: Request):
     data: Dict[str, Any] = {}
+    encoding = "form"
 
     content_type = request.headers.get("content-type", "").lower()
 
@@ -22,6 +58,8 @@ async def parse_incoming_payload(
     if "application/json" in content_type:
         try:
             data = await request.json()
+            if data:
+                encoding = "json"
         except Exception:
             data = {}
 
@@ -37,21 +75,5 @@ async def parse_incoming_payload(
     for key, value in request.query_params.items():
         data.setdefault(key, value)
 
-    # Debug log the extracted data before filtering
-    from utils.logger import log_info
-    log_info(f"Raw parsed data: {data}")
-
-    missing = [field for field in required_fields if not data.get(field)]
-    if missing:
-        raise HTTPException(
-            status_code=422,
-            detail=f"Missing required field(s): {', '.join(missing)}",
-        )
-
-    # Limit output to only the fields we expect if optional_fields provided
-    if optional_fields is not None:
-        allowed = set(required_fields) | set(optional_fields)
-        return {k: v for k, v in data.items() if k in allowed}
-
-    return data
+    return data, encoding
 
@@ -0,0 +1,69 @@
+import copy
+import functools
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Shares one in-flight call among all concurrent callers with the same key.
+
+    The first caller (the leader) runs the function; callers arriving while it
+    is still running wait for the leader and receive a copy of its result (or
+    its exception). Nothing is cached: once the call finishes the next caller
+    starts a fresh one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.coalesced = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            # Callers may mutate the record they get back; never hand out the leader's object
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+# Process-wide group for Airtable reads
+lookups = SingleFlight()
+
+
+def coalesce(fn):
+    """
+    Decorator: concurrent calls with identical arguments share one execution.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = (fn.__qualname__, args, tuple(sorted(kwargs.items())))
+        return lookups.do(key, fn, *args, **kwargs)
+    return wrapper
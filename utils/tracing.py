@@ -0,0 +1,268 @@
+"""
+Tracing
+=======
+Lightweight per-webhook trace spans, so a slow request can be read as a
+waterfall: parse, admission, directory check, every Airtable/Twilio call
+(lookups, pool allocation, writes, audit log entries, the SMS send) and the
+unit-of-work commit.
+
+Key Functionality:
+- `start_trace(name)` opens the root span for one inbound request (sampled by
+  TRACE_SAMPLE_RATE); `span(name)` opens a child of whatever span is current.
+- The current span lives in a context variable, so it follows the request into
+  `run_in_threadpool` and (via the SMS scheduler) into the sending thread.
+- Completed traces go to a bounded queue drained by one background thread:
+    - TRACE_EXPORT_PATH: one JSON line per trace, span offsets relative to
+      the start of the request.
+    - TRACE_OTLP_ENDPOINT: OTLP/HTTP JSON (e.g. http://collector:4318/v1/traces).
+- The Twilio MessageSid is a trace attribute (`twilio.message_sid`) for
+  correlating with Twilio's logs and the Messages table.
+
+Disabled unless an export target is set; outside a trace `span()` returns a
+shared no-op object, so instrumented code pays one context-variable lookup.
+"""
+
+import json
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextvars import ContextVar
+from config import settings
+
+SERVICE_NAME = "phone-masking"
+EXPORT_QUEUE_SIZE = 1000
+OTLP_BATCH_SIZE = 50
+
+# OTLP span kinds / status codes
+_KINDS = {"internal": 1, "server": 2, "client": 3}
+_STATUS_OK, _STATUS_ERROR = 1, 2
+
+_current = ContextVar("trace_span", default=None)
+_queue = queue.Queue(maxsize=EXPORT_QUEUE_SIZE)
+_exporter = None
+_exporter_lock = threading.Lock()
+dropped_traces = 0
+
+class _Trace:
+    def __init__(self, export: bool = True):
+        self.trace_id = os.urandom(16).hex()
+        self.export = export
+        self.root = None
+        self.spans = []
+
+class Span:
+    """
+    One timed operation; use as a context manager.
+    """
+
+    def __init__(self, trace: _Trace, name: str, parent_id, kind: str, attributes: dict):
+        self.trace = trace
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = attributes
+        self.error = False
+        self.start_ns = self.end_ns = 0
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def mark_error(self):
+        """
+        Flags a failure the code caught rather than raised.
+        """
+        self.error = True
+
+    def set_trace_attribute(self, key: str, value):
+        """
+        Sets an attribute on the root span of this trace.
+        """
+        self.trace.root.attributes[key] = value
+
+    def __enter__(self):
+        self.start_ns = time.time_ns()
+        self._token = _current.set(self)
+        if self.parent_id is None:
+            self.trace.root = self
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.time_ns()
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.error = True
+            self.attributes.setdefault("exception.type", exc_type.__name__)
+        self.trace.spans.append(self)
+        if self.parent_id is None and self.trace.export:
+            _enqueue(self.trace)
+        return False
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set_attribute(self, key: str, value):
+        pass
+
+    def mark_error(self):
+        pass
+
+    def set_trace_attribute(self, key: str, value):
+        pass
+
+NOOP_SPAN = _NoopSpan()
+
+def enabled() -> bool:
+    return bool(settings.TRACE_EXPORT_PATH or settings.TRACE_OTLP_ENDPOINT)
+
+def start_trace(name: str, force: bool = False, **attributes):
+    """
+    Root span for one inbound request, or a no-op when tracing is disabled
+    or the request is not sampled.
+
+    `force` records the trace regardless (e.g. for the profiler's request
+    timelines); it is still only exported if it was sampled.
+    """
+    export = enabled() and random.random() < settings.TRACE_SAMPLE_RATE
+    if not export and not force:
+        return NOOP_SPAN
+    return Span(_Trace(export), name, None, "server", attributes)
+
+def span(name: str, kind: str = "internal", **attributes):
+    """
+    Child of the current span, or a no-op outside a trace.
+    """
+    parent = _current.get()
+    if parent is None:
+        return NOOP_SPAN
+    return Span(parent.trace, name, parent.span_id, kind, attributes)
+
+def current_span():
+    """
+    The innermost open span in this context (no-op outside a trace).
+    """
+    return _current.get() or NOOP_SPAN
+
+def set_trace_attribute(key: str, value):
+    """
+    Tags the current request's trace, e.g. with the Twilio MessageSid.
+    """
+    current_span().set_trace_attribute(key, value)
+
+# -- Export -----------------------------------------------------------------
+
+def _enqueue(trace: _Trace):
+    global _exporter, dropped_traces
+    try:
+        _queue.put_nowait(trace)
+    except queue.Full:
+        # Never slow down a webhook for its trace
+        dropped_traces += 1
+        return
+    if _exporter is None:
+        with _exporter_lock:
+            if _exporter is None:
+                _exporter = threading.Thread(target=_export_loop, name="trace-exporter", daemon=True)
+                _exporter.start()
+
+def trace_to_dict(trace: _Trace) -> dict:
+    """
+    One trace as a JSON line: root attributes plus spans with start offsets
+    (ms since the request started), in start order.
+    """
+    root = trace.root
+    spans = sorted(trace.spans, key=lambda s: s.start_ns)
+    return {
+        "trace_id": trace.trace_id,
+        "name": root.name,
+        "start": root.start_ns / 1e9,
+        "duration_ms": round((root.end_ns - root.start_ns) / 1e6, 3),
+        "attributes": root.attributes,
+        "spans": [
+            {
+                "name": s.name,
+                "span_id": s.span_id,
+                "parent_id": s.parent_id,
+                "kind": s.kind,
+                "offset_ms": round((s.start_ns - root.start_ns) / 1e6, 3),
+                "duration_ms": round((s.end_ns - s.start_ns) / 1e6, 3),
+                "error": s.error,
+                "attributes": s.attributes,
+            }
+            for s in spans
+        ],
+    }
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def to_otlp(traces: list) -> dict:
+    """
+    OTLP/HTTP JSON `ExportTraceServiceRequest` for a batch of traces.
+    """
+    spans = []
+    for trace in traces:
+        for s in trace.spans:
+            otlp_span = {
+                "traceId": trace.trace_id,
+                "spanId": s.span_id,
+                "name": s.name,
+                "kind": _KINDS.get(s.kind, 1),
+                "startTimeUnixNano": str(s.start_ns),
+                "endTimeUnixNano": str(s.end_ns),
+                "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items() if v is not None],
+                "status": {"code": _STATUS_ERROR if s.error else _STATUS_OK},
+            }
+            if s.parent_id:
+                otlp_span["parentSpanId"] = s.parent_id
+            spans.append(otlp_span)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+        }]
+    }
+
+def _write_jsonl(traces: list):
+    with open(settings.TRACE_EXPORT_PATH, "a") as f:
+        for trace in traces:
+            f.write(json.dumps(trace_to_dict(trace), separators=(",", ":"), default=str) + "\n")
+
+def _post_otlp(traces: list):
+    request = urllib.request.Request(
+        settings.TRACE_OTLP_ENDPOINT, data=json.dumps(to_otlp(traces), default=str).encode(),
+        method="POST", headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request, timeout=5):
+        pass
+
+def _export_loop():
+    while True:
+        traces = [_queue.get()]
+        while len(traces) < OTLP_BATCH_SIZE:
+            try:
+                traces.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+        for exporter, target in ((_write_jsonl, settings.TRACE_EXPORT_PATH), (_post_otlp, settings.TRACE_OTLP_ENDPOINT)):
+            if not target:
+                continue
+            try:
+                exporter(traces)
+            except Exception as e:
+                # stdout only: logging to Airtable here would trace itself
+                from utils.logger import logger
+                logger.warning(f"Trace export to {target} failed: {e}")
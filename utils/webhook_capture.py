@@ -0,0 +1,108 @@
+"""
+Webhook Capture
+===============
+Records the inbound webhook stream to a compact append-only file so real
+traffic shapes can be replayed against a test instance
+(`benchmarks/replay_webhooks.py`).
+
+Key Functionality:
+- One JSON line per webhook: arrival time, path, encoding and the parsed fields.
+- Redaction before anything touches disk:
+    - Phone numbers become stable pseudonyms (+1555xxxxxxx, keyed HMAC), so the
+      same person keeps the same number and conversations keep their shape.
+    - Names become stable pseudonyms too; message bodies are replaced by
+      same-length filler.
+    - Caller location fields (FromCity, ToZip, ...) are dropped.
+- Disabled unless WEBHOOK_CAPTURE_PATH is set.
+
+Set WEBHOOK_CAPTURE_SALT to get the same pseudonyms across restarts (and to
+match a pseudonymized seed exported for the stand-in Airtable).
+"""
+
+import hashlib
+import hmac
+import json
+import re
+import secrets
+import threading
+import time
+from config import settings
+from utils.phone import national_key
+
+PHONE_PATTERN = re.compile(r"^\+?[\d\s().-]{10,20}$")
+TEXT_FIELDS = {"body", "message"}
+NAME_FIELDS = {"name", "client_name", "sitter_name", "full name", "profilename", "linked-sitter"}
+DROPPED_SUFFIXES = ("city", "state", "zip", "country")
+
+_salt = (settings.WEBHOOK_CAPTURE_SALT or secrets.token_hex(16)).encode()
+_lock = threading.Lock()
+_file = None
+
+def _looks_like_phone(value: str) -> bool:
+    value = value.strip()
+    return bool(PHONE_PATTERN.match(value)) and 10 <= len(re.sub(r"\D", "", value)) <= 15
+
+def pseudonymize_number(number: str) -> str:
+    """
+    Maps a real phone number to a stable fake one in the 555 range.
+    """
+    digits = national_key(number)
+    digest = hmac.new(_salt, digits.encode(), hashlib.sha256).hexdigest()
+    return f"+1555{int(digest, 16) % 10_000_000:07d}"
+
+def pseudonymize_name(name: str) -> str:
+    """
+    Maps a name to a stable placeholder; Airtable record IDs pass through.
+    """
+    if name.startswith("rec"):
+        return name
+    digest = hmac.new(_salt, name.strip().lower().encode(), hashlib.sha256).hexdigest()
+    return f"Name {digest[:8]}"
+
+def redact(data: dict) -> dict:
+    """
+    Returns a copy of a webhook payload that is safe to write to disk.
+    """
+    redacted = {}
+    for key, value in data.items():
+        lowered = key.lower()
+        if lowered.endswith(DROPPED_SUFFIXES):
+            continue
+        if lowered in TEXT_FIELDS and isinstance(value, str):
+            redacted[key] = "x" * len(value)
+        elif lowered in NAME_FIELDS and isinstance(value, (str, list)):
+            redacted[key] = (
+                pseudonymize_name(value) if isinstance(value, str)
+                else [pseudonymize_name(v) if isinstance(v, str) else v for v in value]
+            )
+        elif isinstance(value, str) and _looks_like_phone(value):
+            redacted[key] = pseudonymize_number(value)
+        else:
+            redacted[key] = value
+    return redacted
+
+def capture_webhook(path: str, encoding: str, data: dict):
+    """
+    Appends one redacted webhook to the capture file (no-op when disabled).
+
+    Args:
+        path (str): Request path, e.g. "/intercept".
+        encoding (str): "form" or "json", so replay sends it the same way.
+        data (dict): Parsed payload fields.
+    """
+    global _file
+    if not settings.WEBHOOK_CAPTURE_PATH:
+        return
+    try:
+        line = json.dumps(
+            {"t": round(time.time(), 3), "p": path, "e": encoding, "d": redact(data)},
+            separators=(",", ":"), default=str,
+        )
+        with _lock:
+            if _file is None:
+                _file = open(settings.WEBHOOK_CAPTURE_PATH, "a", buffering=1)
+            _file.write(line + "\n")
+    except Exception as e:
+        # Capture must never break webhook handling
+        from utils.logger import logger
+        logger.error(f"Webhook capture failed: {e}")